@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Cold and warm start benchmark for TerraCost executables.
+
+Compares the onefile artifact (python/<platform>/terracost[.exe]) with the
+fast-start onedir build (python/<platform>/onedir/terracost/terracost[.exe]), or any
+commands given with --command. Each command is run for `--version` and for
+`plan` on a small sample workspace:
+
+  cold  the first launch. With --drop-caches (Linux, root) the page cache is
+        dropped first, so the bundle is read from disk as after a reboot.
+  warm  the median of the following launches.
+
+    python scripts/build_python.py --profile onefile
+    python scripts/build_python.py --profile fast
+    python scripts/benchmark_executable.py
+    python scripts/benchmark_executable.py --command "python -m terracost.main"
+"""
+
+import argparse
+import os
+import platform
+import shlex
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+SAMPLE_WORKSPACE = '''
+resource "google_compute_instance" "web" {
+  machine_type = "e2-medium"
+  zone         = "us-central1-a"
+}
+'''
+
+
+def default_commands():
+    """The built artifacts found under python/<platform>/"""
+    platform_name = platform.system().lower()
+    suffix = ".exe" if platform_name == "windows" else ""
+    build_dir = ROOT / "python" / platform_name
+    candidates = {
+        "onefile": build_dir / f"terracost{suffix}",
+        "onedir (fast)": build_dir / "onedir" / "terracost" / f"terracost{suffix}",
+    }
+    return {name: [str(path)] for name, path in candidates.items() if path.is_file()}
+
+
+def drop_caches():
+    subprocess.run(["sync"], check=False)
+    with open("/proc/sys/vm/drop_caches", "w") as f:
+        f.write("3\n")
+
+
+def time_command(argv, cwd):
+    start = time.perf_counter()
+    result = subprocess.run(argv, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    elapsed = (time.perf_counter() - start) * 1000
+    if result.returncode != 0:
+        raise RuntimeError(f"{' '.join(argv)} failed: {result.stderr.strip()[-500:]}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold and warm start of TerraCost executables")
+    parser.add_argument("--command", action="append", metavar="CMD",
+                        help="Command to benchmark instead of the built artifacts (repeatable)")
+    parser.add_argument("--runs", type=int, default=10, help="Warm runs per command. Default: 10")
+    parser.add_argument("--drop-caches", action="store_true",
+                        help="Drop the OS page cache before each cold run (Linux, needs root)")
+    args = parser.parse_args()
+
+    commands = ({command: shlex.split(command) for command in args.command}
+                if args.command else default_commands())
+    if not commands:
+        print("No executables found; build them with scripts/build_python.py or pass --command")
+        sys.exit(1)
+
+    workspace = tempfile.mkdtemp(prefix="terracost-bench-")
+    try:
+        with open(os.path.join(workspace, "main.tf"), "w") as f:
+            f.write(SAMPLE_WORKSPACE)
+        scenarios = {"--version": ["--version"], "plan": ["plan", "-f", workspace]}
+
+        print(f"{'Command':30} {'Scenario':10} {'Cold':>10} {'Warm':>10}")
+        for name, argv in commands.items():
+            for scenario, scenario_args in scenarios.items():
+                if args.drop_caches:
+                    drop_caches()
+                cold = time_command(argv + scenario_args, workspace)
+                warm = statistics.median(time_command(argv + scenario_args, workspace)
+                                         for _ in range(args.runs))
+                print(f"{name:30} {scenario:10} {cold:>8.0f}ms {warm:>8.0f}ms")
+    finally:
+        shutil.rmtree(workspace, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
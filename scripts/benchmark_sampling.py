@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Samples-to-tolerance benchmark for the uncertainty sampling strategies.
+
+For representative timeframes (at the volatility TerraCost uses for each),
+finds how many simulated paths each strategy (pseudo-random, antithetic,
+scrambled Sobol') needs before its confidence bounds are within a tolerance
+of the exact ones:
+
+  fixed     the smallest power of two whose root-mean-square band error
+            over --replicates seeds is within the tolerance. The lognormal
+            model is used because its bands have a closed form.
+  adaptive  the mean paths `plan --uncertainty-tolerance` simulates.
+
+    python scripts/benchmark_sampling.py
+    python scripts/benchmark_sampling.py --tolerance 0.001 --replicates 20
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from terracost.services.analytic_uncertainty import BAND_KEYS, analytic_uncertainty  # noqa: E402
+from terracost.services.base_cost_service import BaseCostService  # noqa: E402
+from terracost.services.monte_carlo import (  # noqa: E402
+    SAMPLING_STRATEGIES, simulate_adaptive, simulate_costs, summarize_costs
+)
+
+TIMEFRAMES = [1, 3, 6, 12, 24]
+BASE_COST = 1000.0
+
+
+def rms_band_error(exact, volatility, months, n_simulations, sampling, replicates):
+    """Largest root-mean-square error of a band over seeds, as a fraction of the base cost"""
+    errors = []
+    for seed in range(replicates):
+        bands = summarize_costs(simulate_costs(BASE_COST, volatility, months, n_simulations,
+                                               'lognormal', seed, sampling))
+        errors.append([bands[key] - exact[key] for key in BAND_KEYS])
+    return float(np.sqrt(np.mean(np.square(errors), axis=0)).max()) / BASE_COST
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare samples-to-tolerance of the sampling strategies")
+    parser.add_argument("--tolerance", type=float, default=0.005,
+                        help="Band error as a fraction of the cost. Default: 0.005")
+    parser.add_argument("--replicates", type=int, default=10, help="Seeds per measurement. Default: 10")
+    parser.add_argument("--max-simulations", type=int, default=1 << 20,
+                        help="Largest path count tried. Default: 1048576")
+    args = parser.parse_args()
+
+    print(f"{'Months':>6} {'Vol':>5} {'Sampling':12} {'Fixed':>10} {'Adaptive':>10} {'Time':>9}")
+    for months in TIMEFRAMES:
+        volatility = BaseCostService.timeframe_volatility(months)
+        exact, _ = analytic_uncertainty(BASE_COST, volatility, months, 'lognormal')
+        for sampling in SAMPLING_STRATEGIES:
+            n_simulations = 256
+            while (n_simulations <= args.max_simulations
+                   and rms_band_error(exact, volatility, months, n_simulations, sampling,
+                                      args.replicates) > args.tolerance):
+                n_simulations *= 2
+            fixed = f"{n_simulations:,}" if n_simulations <= args.max_simulations else f">{args.max_simulations:,}"
+
+            start = time.perf_counter()
+            used = [len(simulate_adaptive([BASE_COST], [volatility], [[1.0]], months, args.tolerance,
+                                          max_simulations=args.max_simulations, distribution='lognormal',
+                                          seed=seed, sampling=sampling)[0])
+                    for seed in range(args.replicates)]
+            elapsed = (time.perf_counter() - start) / args.replicates * 1000
+            print(f"{months:>6} {volatility:>5.2f} {sampling:12} {fixed:>10} {np.mean(used):>10,.0f} "
+                  f"{elapsed:>7.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Start-up time benchmark for the TerraCost CLI.
+
+Runs each scenario in a fresh interpreter with `python -X importtime`, sums
+the cumulative import time of the TerraCost modules it loads and compares
+the median against a budget. Heavy dependencies that a scenario must not
+load (the LLM client for `plan`, for example) are reported as failures too.
+Exits with status 1 when any scenario is over budget, so it can run in CI:
+
+    python scripts/benchmark_startup.py
+    python scripts/benchmark_startup.py --runs 10 --scale 1.5
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+# name -> (code run in a fresh interpreter, import budget in ms, modules it must not import)
+SCENARIOS = {
+    "cli": (
+        "import terracost.main",
+        60,
+        ["pydantic", "numpy", "requests", "langchain", "langchain_openai", "openai", "dotenv"],
+    ),
+    "plan": (
+        "import terracost.main\n"
+        "from terracost.services import cost_engine, cost_models, progress_indicator, terraform_file_parser",
+        250,
+        ["langchain", "langchain_openai", "openai", "dotenv"],
+    ),
+    "serve": (
+        "import terracost.main\n"
+        "from terracost.services import api_service, http_server, rpc_service",
+        250,
+        ["pydantic", "langchain", "langchain_openai", "openai", "dotenv"],
+    ),
+}
+
+
+def parse_importtime(stderr: str):
+    """Top-level import times (ms) and every imported module name from -X importtime output"""
+    top_level = {}
+    modules = set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        if not cumulative.strip().isdigit():
+            continue  # header line
+        module = name.strip()
+        modules.add(module)
+        # Top-level imports are the ones with a single space of indentation
+        if name.startswith(" ") and not name.startswith("  "):
+            top_level[module] = int(cumulative) / 1000
+    return top_level, modules
+
+
+def run_scenario(code: str):
+    env = dict(os.environ, PYTHONPATH=str(ROOT), PYTHONDONTWRITEBYTECODE="1")
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            capture_output=True, text=True, env=env, cwd=ROOT)
+    wall_ms = (time.perf_counter() - start) * 1000
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    top_level, modules = parse_importtime(result.stderr)
+    terracost_ms = sum(ms for module, ms in top_level.items() if module.split(".")[0] == "terracost")
+    return terracost_ms, wall_ms, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check TerraCost start-up import time against a budget")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per scenario; the median is compared. Default: 5")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="Multiply every budget (for slow CI machines). Default: 1.0")
+    parser.add_argument("scenarios", nargs="*",
+                        help=f"Scenarios to run ({', '.join(SCENARIOS)}). Default: all")
+    args = parser.parse_args()
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario: {', '.join(unknown)}")
+
+    failures = []
+    print(f"{'Scenario':10} {'Imports':>10} {'Budget':>10} {'Process':>10}")
+    for name in args.scenarios or SCENARIOS:
+        code, budget, forbidden = SCENARIOS[name]
+        budget *= args.scale
+        samples = [run_scenario(code) for _ in range(args.runs)]
+        import_ms = statistics.median(sample[0] for sample in samples)
+        wall_ms = statistics.median(sample[1] for sample in samples)
+        status = "ok" if import_ms <= budget else "OVER BUDGET"
+        print(f"{name:10} {import_ms:>8.1f}ms {budget:>8.0f}ms {wall_ms:>8.1f}ms  {status}")
+        if import_ms > budget:
+            failures.append(f"{name}: imports took {import_ms:.1f} ms, budget is {budget:.0f} ms")
+        loaded = sorted(module for module in forbidden
+                        if any(module in sample[2] for sample in samples))
+        if loaded:
+            failures.append(f"{name}: imports {', '.join(loaded)}, which it should load lazily")
+
+    if failures:
+        print("\nStart-up regressions:")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+    print("\nAll scenarios within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,8 +2,22 @@
 """
 Build script for creating standalone TerraCost executables using PyInstaller.
 This creates platform-specific executables that will be bundled with the VSCode extension.
+
+Profiles:
+  onefile  One self-extracting executable (python/<platform>/terracost[.exe]).
+           Every launch unpacks the whole bundle, LLM client included, to a
+           temp directory first.
+  fast     Start-up optimized: onedir layout (nothing to unpack), optimized
+           bytecode, unused modules excluded and the LLM client moved into a
+           separate terracost-ai component that is only started for
+           suggestions (python/<platform>/onedir/terracost/ and
+           python/<platform>/onedir/terracost-ai/). The extension prefers
+           this layout.
+
+Compare the two with scripts/benchmark_executable.py.
 """
 
+import argparse
 import os
 import sys
 import shutil
@@ -21,6 +35,76 @@ def install_pyinstaller():
         subprocess.run([sys.executable, "-m", "pip", "install", "pyinstaller"], check=True)
         print("✓ PyInstaller installed successfully")
 
+# Modules no TerraCost command uses; left out of the fast profile
+FAST_EXCLUDED_MODULES = [
+    "tkinter", "lib2to3", "idlelib", "pydoc",
+    "IPython", "matplotlib", "pytest", "setuptools", "pip",
+]
+
+# The LLM client; the fast profile ships it in the terracost-ai component only
+AI_MODULES = [
+    "langchain", "langchain_core", "langchain_openai", "langchain_text_splitters",
+    "langsmith", "openai", "tiktoken", "dotenv",
+]
+
+def run_pyinstaller(cmd, executable_path):
+    """Run PyInstaller and smoke-test the executable it produced"""
+    print(f"Running PyInstaller: {' '.join(cmd)}")
+    try:
+        subprocess.run(cmd, check=True, capture_output=True, text=True)
+    except subprocess.CalledProcessError as e:
+        print(f"❌ PyInstaller failed: {e}")
+        print("Stdout:", e.stdout)
+        print("Stderr:", e.stderr)
+        sys.exit(1)
+    print("✓ PyInstaller completed successfully")
+
+    if not executable_path.exists():
+        print(f"❌ Executable not found at {executable_path}")
+        sys.exit(1)
+    print(f"✓ Executable created: {executable_path}")
+    test_result = subprocess.run([str(executable_path), "--help"], capture_output=True, text=True, timeout=30)
+    if test_result.returncode == 0:
+        print("✓ Executable test passed")
+    else:
+        print(f"⚠ Executable test failed: {test_result.stderr}")
+
+def build_fast_executables():
+    """Build the start-up optimized onedir core and the separate AI component"""
+    platform_name = platform.system().lower()
+    suffix = ".exe" if platform_name == "windows" else ""
+    print(f"Building fast-start profile for platform: {platform_name} ({platform.machine()})")
+
+    script_dir = Path(__file__).parent.parent
+    os.chdir(script_dir)
+    build_dir = script_dir / "python" / platform_name / "onedir"
+    build_dir.mkdir(parents=True, exist_ok=True)
+
+    common = [
+        "pyinstaller",
+        "--onedir",
+        "--noconfirm",
+        "--noupx",  # UPX-compressed libraries have to be decompressed on every start
+        "--optimize", "1",  # PyInstaller >= 6.6: bundle bytecode compiled with -O
+        "--distpath", str(build_dir),
+        "--workpath", str(script_dir / "build"),
+        "--specpath", str(script_dir / "build"),
+        "--collect-submodules", "terracost.services",
+    ]
+    for module in FAST_EXCLUDED_MODULES:
+        common += ["--exclude-module", module]
+
+    # Core: everything except the LLM client
+    core = list(common)
+    for module in AI_MODULES:
+        core += ["--exclude-module", module]
+    core += ["--name", "terracost", "terracost/main.py"]
+    run_pyinstaller(core, build_dir / "terracost" / f"terracost{suffix}")
+
+    # AI component: the full CLI, started by the core for suggestions only
+    ai = common + ["--hidden-import", "langchain_openai", "--name", "terracost-ai", "terracost/main.py"]
+    run_pyinstaller(ai, build_dir / "terracost-ai" / f"terracost-ai{suffix}")
+
 def build_platform_executable():
     """Build TerraCost executable for current platform"""
     platform_name = platform.system().lower()
@@ -119,6 +203,11 @@ def clean_build_files():
 
 def main():
     """Main build process"""
+    parser = argparse.ArgumentParser(description="Build the TerraCost runtime for the VSCode extension")
+    parser.add_argument("--profile", choices=["onefile", "fast"], default="onefile",
+                        help="onefile (single executable) or fast (start-up optimized onedir). Default: onefile")
+    args = parser.parse_args()
+
     print("🚀 Building TerraCost Python Runtime for VSCode Extension")
     print("=" * 60)
     
@@ -127,7 +216,10 @@ def main():
         install_pyinstaller()
         
         # Build executable
-        build_platform_executable()
+        if args.profile == "fast":
+            build_fast_executables()
+        else:
+            build_platform_executable()
         
         # Clean up
         clean_build_files()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Behavior check of the static Terraform expression evaluator.
+
+Evaluates a table of expressions against variables read from a .tfvars
+file and a .tfvars.json file (so values arrive the way Terraform's loaders
+produce them), and compares each result with the value Terraform gives.
+'unresolved' marks expressions that depend on apply-time values, or that
+Terraform itself rejects, and must not be guessed.
+
+Exits with status 1 when any result differs, so it can run in CI:
+
+    python scripts/validate_expressions.py
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from terracost.services.expression_evaluator import (  # noqa: E402
+    ExpressionEvaluator, UNRESOLVED, parse_tfvars
+)
+
+TFVARS = '''
+instance_count = 3
+enabled        = true
+environment    = "prod"
+zones          = ["a", "b", "c", "a"]
+sizes          = { prod = "m5.large", dev = "t3.micro" }
+'''
+
+# Values from JSON (and -var on the command line) are often strings
+TFVARS_JSON = '{"enabled_text": "false", "count_text": "2", "zero": 0, "empty": ""}'
+
+LOCALS = {
+    'replicas': 'var.instance_count * 2',
+    'size': 'lookup(var.sizes, var.environment, "t3.small")',
+    'circular': 'local.circular + 1',
+}
+
+# (expression, expected value)
+CASES = [
+    # Literals and arithmetic
+    ('1 + 2 * 3', 7),
+    ('(1 + 2) * 3', 9),
+    ('7 / 2', 3.5),
+    ('7 % 4', 3),
+    ('-var.instance_count', -3),
+    ('"${var.environment}-web"', 'prod-web'),
+    ('var.count_text + 1', 3),
+    # Variables and locals
+    ('var.instance_count', 3),
+    ('local.replicas', 6),
+    ('local.size', 'm5.large'),
+    ('var.sizes["dev"]', 't3.micro'),
+    ('var.zones[1]', 'b'),
+    ('var.missing', UNRESOLVED),
+    ('local.circular', UNRESOLVED),
+    ('aws_instance.web.id', UNRESOLVED),
+    # Conditionals take bools or the strings "true"/"false", as in Terraform
+    ('var.enabled ? 1 : 0', 1),
+    ('var.enabled_text ? 1 : 0', 0),
+    ('"true" ? 1 : 0', 1),
+    ('var.zero ? 1 : 0', UNRESOLVED),
+    ('var.empty ? 1 : 0', UNRESOLVED),
+    ('var.environment ? 1 : 0', UNRESOLVED),
+    ('var.environment == "prod" ? var.instance_count : 1', 3),
+    ('var.environment != "prod" ? 1 : var.instance_count', 3),
+    ('var.instance_count > 2 && var.enabled', True),
+    ('var.enabled_text || var.instance_count < 2', False),
+    ('!var.enabled_text', True),
+    ('var.zero && true', UNRESOLVED),
+    ('var.enabled ? 1 : aws_instance.web.count', 1),
+    ('var.enabled ? aws_instance.web.count : 1', UNRESOLVED),
+    ('var.enabled ? (var.instance_count > 1 ? "many" : "one") : "none"', 'many'),
+    # Functions
+    ('length(var.zones)', 4),
+    ('length(distinct(var.zones))', 3),
+    ('length(toset(var.zones))', 3),
+    ('max(1, var.instance_count, 2)', 3),
+    ('min(var.count_text, 5)', 2),
+    ('ceil(7 / 2)', 4),
+    ('floor(7 / 2)', 3),
+    ('concat(["x"], var.zones)', ['x', 'a', 'b', 'c', 'a']),
+    ('element(var.zones, 5)', 'b'),
+    ('contains(var.zones, "c")', True),
+    ('keys(var.sizes)', ['dev', 'prod']),
+    ('merge(var.sizes, { dev = "t3.small" })["dev"]', 't3.small'),
+    ('lookup(var.sizes, "test", "t3.nano")', 't3.nano'),
+    ('coalesce(null, "", "x")', 'x'),
+    ('range(3)', [0, 1, 2]),
+    ('max(var.zones...)', UNRESOLVED),
+    ('tonumber("4")', 4),
+    ('tobool(var.enabled_text)', False),
+    ('tobool("yes")', UNRESOLVED),
+    ('try(aws_instance.web.count, 2)', 2),
+    ('format("%s", "x")', UNRESOLVED),
+    # for expressions are not evaluated
+    ('[for zone in var.zones : upper(zone)]', UNRESOLVED),
+    ('{ for name, size in var.sizes : name => size }', UNRESOLVED),
+    ('length([for zone in var.zones : zone])', UNRESOLVED),
+]
+
+# (count expression, for_each expression, expected instance count)
+INSTANCE_CASES = [
+    ('var.instance_count', None, 3),
+    ('var.enabled ? var.instance_count : 0', None, 3),
+    ('var.enabled_text ? 1 : 0', None, 0),
+    ('var.zero ? 1 : 0', None, None),
+    ('var.enabled', None, None),
+    (None, 'toset(var.zones)', 3),
+    (None, 'var.sizes', 2),
+    (None, '{ for zone in var.zones : zone => zone }', None),
+]
+
+
+def load_variables():
+    with tempfile.TemporaryDirectory() as directory:
+        tfvars = os.path.join(directory, 'terraform.tfvars')
+        tfvars_json = os.path.join(directory, 'extra.auto.tfvars.json')
+        with open(tfvars, 'w', encoding='utf-8') as f:
+            f.write(TFVARS)
+        with open(tfvars_json, 'w', encoding='utf-8') as f:
+            f.write(TFVARS_JSON)
+        return {**parse_tfvars(tfvars), **parse_tfvars(tfvars_json)}
+
+
+def show(value):
+    return 'unresolved' if value is UNRESOLVED else repr(value)
+
+
+def main():
+    evaluator = ExpressionEvaluator(load_variables(), LOCALS)
+    failures = []
+    for expression, expected in CASES:
+        value = evaluator.evaluate(expression)
+        ok = value is expected if expected is UNRESOLVED else (value is not UNRESOLVED and value == expected
+                                                                and type(value) is type(expected))
+        print(f"{'ok' if ok else 'FAIL':4} {expression:65} {show(value)}")
+        if not ok:
+            failures.append(f"{expression}: got {show(value)}, expected {show(expected)}")
+
+    for count, for_each, expected in INSTANCE_CASES:
+        value = evaluator.instance_count(count, for_each)
+        label = f"count = {count}" if count is not None else f"for_each = {for_each}"
+        print(f"{'ok' if value == expected else 'FAIL':4} {label:65} {value!r}")
+        if value != expected:
+            failures.append(f"{label}: got {value!r} instances, expected {expected!r}")
+
+    if failures:
+        print("\nExpressions evaluated differently from Terraform:")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+    print(f"\nAll {len(CASES) + len(INSTANCE_CASES)} expressions evaluated as Terraform does")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Accuracy check of the streaming t-digest against exact percentiles.
+
+Runs the uncertainty simulator at sizes small enough to keep, summarizes
+each run both exactly (np.percentile) and with the t-digest that large runs
+stream through (one digest fed chunk by chunk, and digests of separate
+slices merged, as parallel runs would), and reports for the confidence
+percentiles:
+
+  rank   how far the estimate's rank is from the requested one (0.0001 = 0.01%)
+  value  the relative difference from the exact percentile
+
+Exits with status 1 when a rank error is above --max-rank-error:
+
+    python scripts/validate_quantile_sketch.py
+    python scripts/validate_quantile_sketch.py --simulations 10000000
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from terracost.services.monte_carlo import CONFIDENCE_PERCENTILES, simulate_chunks  # noqa: E402
+from terracost.services.quantile_sketch import TDigest  # noqa: E402
+
+# name -> (group costs, volatilities, correlation, months, distribution)
+SCENARIOS = {
+    "1 month": ([1000.0], [0.05], [[1.0]], 1, "normal"),
+    "12 months": ([1000.0], [0.2], [[1.0]], 12, "normal"),
+    "36 months lognormal": ([1000.0], [0.2], [[1.0]], 36, "lognormal"),
+    "3 groups, 24 months": ([500.0, 300.0, 200.0], [0.1, 0.15, 0.3],
+                            [[1.0, 0.4, 0.2], [0.4, 1.0, 0.2], [0.2, 0.2, 1.0]], 24, "normal"),
+}
+SLICES = 8
+
+
+def errors(exact_sorted, estimate):
+    quantiles = np.asarray(CONFIDENCE_PERCENTILES) / 100
+    ranks = np.searchsorted(exact_sorted, estimate) / len(exact_sorted)
+    exact = np.percentile(exact_sorted, CONFIDENCE_PERCENTILES)
+    return float(np.abs(ranks - quantiles).max()), float(np.abs(estimate / exact - 1).max())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare t-digest percentiles with exact ones")
+    parser.add_argument("--simulations", type=int, default=2_000_000, help="Paths per scenario. Default: 2000000")
+    parser.add_argument("--max-rank-error", type=float, default=5e-4,
+                        help="Largest acceptable rank error. Default: 0.0005")
+    args = parser.parse_args()
+
+    quantiles = np.asarray(CONFIDENCE_PERCENTILES) / 100
+    failures = []
+    print(f"{'Scenario':22} {'Digest':8} {'Rank':>9} {'Value':>9} {'Centroids':>10}")
+    for name, (costs, volatilities, correlation, months, distribution) in SCENARIOS.items():
+        streamed = TDigest()
+        slices = [TDigest() for _ in range(SLICES)]
+        totals = []
+        for index, chunk in enumerate(simulate_chunks(costs, volatilities, correlation, months,
+                                                      args.simulations, distribution, seed=1)):
+            total = chunk.sum(axis=1)
+            totals.append(total)
+            streamed.update(total)
+            slices[index % SLICES].update(total)
+        merged = slices[0]
+        for digest in slices[1:]:
+            merged.merge(digest)
+        exact_sorted = np.sort(np.concatenate(totals))
+
+        for label, digest in (("streamed", streamed), ("merged", merged)):
+            rank, value = errors(exact_sorted, digest.quantile(quantiles))
+            print(f"{name:22} {label:8} {rank:>9.6f} {value:>8.4%} {len(digest.means):>10}")
+            if rank > args.max_rank_error:
+                failures.append(f"{name} ({label}): rank error {rank:.6f}")
+        std_error = abs(streamed.std() / np.std(exact_sorted) - 1)
+        if std_error > 1e-9:
+            failures.append(f"{name}: standard deviation off by {std_error:.2e}")
+
+    if failures:
+        print("\nt-digest estimates outside tolerance:")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+    print(f"\nEvery t-digest percentile is within {args.max_rank_error} in rank of the exact one")
+
+
+if __name__ == "__main__":
+    main()
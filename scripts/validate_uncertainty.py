@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Validation harness for the closed-form uncertainty bands.
+
+For a grid of volatilities and timeframes, compares the analytic bands
+(terracost.services.analytic_uncertainty) with a large vectorized simulation
+of the same random-walk model and reports, as a fraction of the base cost:
+
+  estimate  the error estimate the automatic switch uses
+  error     the largest difference between analytic and simulated bands
+  noise     the difference between two simulations with different seeds,
+            i.e. how much of `error` is Monte Carlo noise
+
+Exits with status 1 when 'auto' would keep closed-form bands whose measured
+error exceeds the tolerance by more than twice the noise (one pair of runs
+is a rough noise estimate, and long heavy-tailed timeframes are noisy), so
+it can run in CI:
+
+    python scripts/validate_uncertainty.py
+    python scripts/validate_uncertainty.py --simulations 200000 --distribution lognormal
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from terracost.services.analytic_uncertainty import (  # noqa: E402
+    ANALYTIC_TOLERANCE, BAND_KEYS, analytic_uncertainty, use_analytic
+)
+from terracost.services.monte_carlo import DISTRIBUTIONS, simulate_costs, summarize_costs  # noqa: E402
+
+VOLATILITIES = [0.02, 0.05, 0.1, 0.2, 0.3]
+TIMEFRAMES = [0.25, 1, 3, 6, 12, 24, 36]
+BASE_COST = 1000.0
+
+
+def band_difference(a, b):
+    return max(abs(a[key] - b[key]) for key in BAND_KEYS) / BASE_COST
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the closed-form uncertainty bands against simulation")
+    parser.add_argument("--simulations", type=int, default=1_000_000,
+                        help="Simulated paths per reference run. Default: 1000000")
+    parser.add_argument("--distribution", choices=DISTRIBUTIONS, action="append",
+                        help="Distribution to validate (repeatable). Default: all")
+    parser.add_argument("--seed", type=int, default=1, help="Seed of the reference simulation. Default: 1")
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'Distribution':12} {'Vol':>5} {'Months':>6} {'Estimate':>9} {'Error':>8} {'Noise':>8} "
+          f"{'Auto':>10} {'Closed form':>12} {'Simulation':>11}")
+    for distribution in args.distribution or DISTRIBUTIONS:
+        for volatility in VOLATILITIES:
+            for months in TIMEFRAMES:
+                start = time.perf_counter()
+                bands, estimate = analytic_uncertainty(BASE_COST, volatility, months, distribution)
+                analytic_ms = (time.perf_counter() - start) * 1000
+
+                start = time.perf_counter()
+                simulated = summarize_costs(simulate_costs(BASE_COST, volatility, months, args.simulations,
+                                                           distribution, args.seed))
+                simulation_ms = (time.perf_counter() - start) * 1000
+                repeat = summarize_costs(simulate_costs(BASE_COST, volatility, months, args.simulations,
+                                                        distribution, args.seed + 1))
+
+                error = band_difference(bands, simulated)
+                noise = band_difference(simulated, repeat)
+                auto = "analytic" if use_analytic("auto", estimate) else "simulation"
+                print(f"{distribution:12} {volatility:>5.2f} {months:>6g} {estimate:>8.2%} {error:>8.2%} "
+                      f"{noise:>8.2%} {auto:>10} {analytic_ms:>10.2f}ms {simulation_ms:>9.0f}ms")
+                if auto == "analytic" and error > ANALYTIC_TOLERANCE + 2 * noise:
+                    failures.append(f"{distribution}, volatility {volatility}, {months} months: "
+                                    f"error {error:.2%} with estimate {estimate:.2%}")
+
+    if failures:
+        print(f"\nClosed-form bands kept beyond the {ANALYTIC_TOLERANCE:.1%} tolerance:")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+    print(f"\nEvery closed-form band 'auto' keeps is within {ANALYTIC_TOLERANCE:.1%} of the simulation")
+
+
+if __name__ == "__main__":
+    main()
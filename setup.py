@@ -59,6 +59,10 @@ setup(
     include_package_data=True,
     python_requires=">=3.8",
     install_requires=read_requirements(),
+    extras_require={
+        "fast": ["orjson>=3.9.0"],
+        "qmc": ["scipy>=1.7.0"],
+    },
     entry_points={
         "console_scripts": [
             "terracost=terracost.main:main",
@@ -1,33 +1,23 @@
 import argparse
+import contextlib
+import json
+import os
 import sys
 import re
 import platform
-from typing import List
-from pydantic import BaseModel, Field
-from terracost.services.aws_cost_service import AwsCostService
-from terracost.services.azure_cost_service import AzureCostService
-from terracost.services.gcp_cost_service import GCPCostService
-from terracost.services.terraform_file_parser import TerraformFileParser
-from terracost.services.progress_indicator import CostCalculationProgress
-from terracost.services.suggest_progress import SuggestStepTracker
-from terracost.services.suggest_service import suggest_budget, suggest_savings, suggest_best_value
-from terracost.services.cicd_service import run_pipeline_check
+from typing import List, TYPE_CHECKING
+from terracost.services.defaults import (
+    DEFAULT_JOBS, DEFAULT_API_WORKERS, DEFAULT_HOST, DEFAULT_PORT, MIN_ADAPTIVE_SIMULATIONS
+)
 
-__version__ = "0.1.1"
-
-# =====================
-# Pydantic Models
-# =====================
+# Services, pydantic, numpy and the LLM client are imported inside the
+# commands that use them, so `terracost --version` and argument errors
+# return immediately and `plan` never loads langchain.
+# scripts/benchmark_startup.py guards the start-up time.
+if TYPE_CHECKING:
+    from terracost.services.cost_models import CostEstimate
 
-class ResourceCost(BaseModel):
-    name: str
-    monthly_cost: float = Field(ge=0, description="Cost per month in USD")
-
-class CostEstimate(BaseModel):
-    timeframe_months: float
-    total_cost: float
-    breakdown: List[ResourceCost]
-    uncertainty_analysis: dict = None
+__version__ = "0.1.1"
 
 # =====================
 # Helper Functions
@@ -52,7 +42,8 @@ def get_symbol(symbol_name: str) -> str:
             "checklist": "[CHECKLIST]",
             "tada": "[SUCCESS]",
             "warning": "[WARN]",
-            "chart": "[CHART]"
+            "chart": "[CHART]",
+            "clock": "[TIME]"
         }
         return symbols.get(symbol_name, "[INFO]")
     else:
@@ -71,7 +62,8 @@ def get_symbol(symbol_name: str) -> str:
             "clipboard": "📋",
             "checklist": "📋",
             "tada": "🎉",
-            "warning": "⚠️"
+            "warning": "⚠️",
+            "clock": "⏱️"
         }
         return symbols.get(symbol_name, "ℹ️")
 
@@ -94,20 +86,53 @@ def parse_timeframe(tf: str) -> float:
     else:
         raise ValueError(f"Invalid timeframe unit: {unit}")
 
-def estimate_cost_from_files(months: float, verbose: bool, working_dir: str) -> CostEstimate:
+def discovery_options_from_args(args) -> dict:
     """
-    Estimate costs by parsing Terraform files directly
+    Build TerraformFileParser discovery options from CLI arguments.
     """
+    return {
+        'include': args.include,
+        'exclude': args.exclude,
+        'use_git': args.git_files
+    }
+
+def estimate_cost_from_files(months: float, verbose: bool, working_dir: str,
+                             discovery_options: dict = None, plan_json: str = None,
+                             state_file: str = None, var_files: List[str] = None,
+                             n_simulations: int = None, uncertainty_method: str = 'auto',
+                             uncertainty_tolerance: float = None,
+                             uncertainty_sampling: str = 'random', uncertainty_seed: int = None,
+                             jobs: int = DEFAULT_JOBS) -> "CostEstimate":
+    """
+    Estimate costs by parsing Terraform files directly, from a
+    `terraform show -json` plan file when plan_json is given, or from
+    deployed state when state_file is given ('-' reads stdin)
+    """
+    from terracost.services.cost_engine import CostEngine
+    from terracost.services.cost_models import ResourceCost, CostEstimate
+    from terracost.services.progress_indicator import CostCalculationProgress
+    from terracost.services.terraform_file_parser import TerraformFileParser, PRICING_KINDS, PRICED_TYPE_PREFIXES
+
     progress = CostCalculationProgress()
     parser = None
     
     try:
         progress.start()
         
-        # Step 1: Parse Terraform files
+        # Step 1: Parse Terraform files (or the plan JSON / state)
         progress.next_step()
-        parser = TerraformFileParser(working_dir)
-        parse_result = parser.parse_terraform_files(show_progress=True)
+        if plan_json:
+            from terracost.services.terraform_plan_parser import TerraformPlanParser
+            parser = TerraformPlanParser(plan_json)
+            parse_result = parser.parse_plan(show_progress=True)
+        elif state_file:
+            from terracost.services.terraform_state_parser import TerraformStateParser
+            parser = TerraformStateParser(state_file)
+            parse_result = parser.parse_state(show_progress=True)
+        else:
+            parser = TerraformFileParser(working_dir, discovery_options, var_files=var_files)
+            parse_result = parser.parse_terraform_files(show_progress=True, kinds=PRICING_KINDS,
+                                                        type_prefixes=PRICED_TYPE_PREFIXES)
         
         # Step 2: Extract resource information
         progress.next_step()
@@ -119,44 +144,20 @@ def estimate_cost_from_files(months: float, verbose: bool, working_dir: str) ->
         # Step 4: Calculate cost estimates for all cloud providers
         progress.next_step()
         
-        all_costs = {}
-        total_monthly = 0.0
-        
-        # AWS costs
-        if resources.get('aws'):
-            aws_service = AwsCostService()
-            aws_costs = aws_service.build_costs(resources['aws'])
-            all_costs.update({f"aws.{k}": v for k, v in aws_costs.items()})
-            total_monthly += sum(aws_costs.values())
-        
-        # Azure costs
-        if resources.get('azure'):
-            azure_service = AzureCostService()
-            azure_costs = azure_service.build_costs(resources['azure'])
-            all_costs.update({f"azure.{k}": v for k, v in azure_costs.items()})
-            total_monthly += sum(azure_costs.values())
-        
-        # GCP costs
-        if resources.get('gcp'):
-            gcp_service = GCPCostService()
-            gcp_costs = gcp_service.build_costs(resources['gcp'])
-            all_costs.update({f"gcp.{k}": v for k, v in gcp_costs.items()})
-            total_monthly += sum(gcp_costs.values())
+        engine = CostEngine()
+        costs = engine.price(resources, on_progress=progress.provider_update)
+        total_monthly = costs.total_monthly
         
-        # Other/unknown resources
-        if resources.get('other'):
-            # Estimate costs for unknown resources
-            other_costs = {f"other.{k}": 10.0 for k in resources['other'].keys()}
-            all_costs.update(other_costs)
-            total_monthly += sum(other_costs.values())
-        
-        breakdown = [ResourceCost(name=r, monthly_cost=c) for r, c in all_costs.items()]
+        breakdown = [ResourceCost(name=r, monthly_cost=c) for r, c in costs.costs.items()]
         total_cost = total_monthly * months
         
-        # Step 5: Generate uncertainty analysis (use AWS service as default)
+        # Step 5: Generate uncertainty analysis (per provider and service category)
         progress.next_step()
-        service = AwsCostService()  # Default service for uncertainty calculation
-        uncertainty = service.estimate_uncertainty(total_monthly, months)
+        uncertainty = engine.estimate_breakdown_uncertainty(costs.costs, months, n_simulations,
+                                                            method=uncertainty_method,
+                                                            tolerance=uncertainty_tolerance,
+                                                            sampling=uncertainty_sampling,
+                                                            seed=uncertainty_seed, jobs=jobs)
         
         estimate = CostEstimate(
             timeframe_months=months,
@@ -180,7 +181,7 @@ def estimate_cost_from_files(months: float, verbose: bool, working_dir: str) ->
         progress.stop(False)
         raise e
 
-def _display_cost_estimate(estimate: CostEstimate, verbose: bool, plan_summary: dict):
+def _display_cost_estimate(estimate: "CostEstimate", verbose: bool, plan_summary: dict):
     """Display the cost estimate with uncertainty analysis"""
     print(f"\n{get_symbol('chart')} Cost Estimate for {estimate.timeframe_months:.1f} month(s)")
     print("=" * 50)
@@ -188,9 +189,20 @@ def _display_cost_estimate(estimate: CostEstimate, verbose: bool, plan_summary:
     # Display infrastructure summary
     if plan_summary:
         print(f"{get_symbol('checklist')} Infrastructure Summary:")
-        print(f"   {get_symbol('folder')} Total Terraform files: {plan_summary.get('modules_count', 0) + 1}")
-        print(f"   {get_symbol('wrench')} Total resources: {plan_summary.get('total_resources', 0)}")
+        print(f"   {get_symbol('folder')} Total Terraform files: {plan_summary.get('files_count', 0)}")
+        total_resources = plan_summary.get('total_resources', 0)
+        total_instances = plan_summary.get('total_instances', total_resources)
+        if total_instances != total_resources:
+            print(f"   {get_symbol('wrench')} Total resources: {total_resources} ({total_instances} instances)")
+        else:
+            print(f"   {get_symbol('wrench')} Total resources: {total_resources}")
+        if plan_summary.get('unresolved_counts'):
+            print(f"   {get_symbol('warning')} {plan_summary['unresolved_counts']} count/for_each expressions "
+                  f"could not be resolved and were priced as a single instance")
         print(f"   {get_symbol('package')} Modules: {plan_summary.get('modules_count', 0)}")
+        if 'discovery_time' in plan_summary:
+            print(f"   {get_symbol('clock')} Discovery: {plan_summary['discovery_time'] * 1000:.0f} ms "
+                  f"({plan_summary.get('discovery_method', 'scandir')})")
         
         # Show provider breakdown
         provider_counts = plan_summary.get('provider_counts', {})
@@ -216,7 +228,23 @@ def _display_cost_estimate(estimate: CostEstimate, verbose: bool, plan_summary:
         print(f"{get_symbol('chart')} Cost Uncertainty Analysis:")
         print(f"   {get_symbol('chart')} 68% Confidence: ${uncertainty['confidence_68_lower']:.2f} - ${uncertainty['confidence_68_upper']:.2f}")
         print(f"   {get_symbol('chart')} 95% Confidence: ${uncertainty['confidence_95_lower']:.2f} - ${uncertainty['confidence_95_upper']:.2f}")
-        print(f"   {get_symbol('chart')} Volatility: {uncertainty['volatility']*100:.1f}% monthly variation")
+        if uncertainty.get('method') == 'analytic':
+            method = f"closed form, estimated error {uncertainty['error_estimate']*100:.2f}%"
+        else:
+            sampling = uncertainty.get('sampling', 'random')
+            method = f"{uncertainty['n_simulations']:,} {'' if sampling == 'random' else sampling + ' '}simulations"
+            if 'standard_error' in uncertainty:
+                state = "converged" if uncertainty['converged'] else "not converged"
+                method += f", {state} to a standard error of {uncertainty['standard_error']*100:.2f}%"
+            if uncertainty.get('percentiles') == 't-digest':
+                method += ", streamed percentiles"
+        print(f"   {get_symbol('chart')} Volatility: {uncertainty['volatility']*100:.1f}% monthly variation "
+              f"({method})")
+        providers = uncertainty.get('providers', {})
+        if len(providers) > 1:
+            for provider, bands in providers.items():
+                print(f"   [{provider.upper()}] 95% Confidence: ${bands['confidence_95_lower']:.2f} - "
+                      f"${bands['confidence_95_upper']:.2f}/month")
         print()
     
     if verbose:
@@ -225,15 +253,204 @@ def _display_cost_estimate(estimate: CostEstimate, verbose: bool, plan_summary:
             print(f"   - {rc.name:40} ${rc.monthly_cost:.2f}/month")
         print()
 
+def watch_cost_estimate(months: float, verbose: bool, working_dir: str, discovery_options: dict = None,
+                        var_files: List[str] = None):
+    """
+    Estimate costs once, then watch the Terraform files and report the cost
+    delta of every change. Only changed files are re-parsed and re-priced.
+    """
+    from terracost.services.watch_service import IncrementalEstimator
+    from terracost.services.file_watcher import create_watcher
+
+    estimator = IncrementalEstimator(working_dir, discovery_options, var_files)
+    print(f"{get_symbol('search')} Estimating {estimator.working_dir}...")
+    estimator.load()
+
+    total = estimator.total_monthly
+    print(f"{get_symbol('wrench')} {estimator.total_resources} resources in {len(estimator.files)} files")
+    print(f"[COST] Total Cost: ${total * months:.2f} (${total:.2f}/month)")
+
+    watcher = create_watcher(estimator.watched_directories(), estimator.watched_files)
+    print(f"\n{get_symbol('clock')} Watching {len(estimator.watched_files())} files ({watcher.method}), press Ctrl+C to stop")
+
+    try:
+        while True:
+            changed = watcher.poll()
+            if not changed and not watcher.overflowed:
+                continue
+            rescan = watcher.overflowed
+            watcher.overflowed = False
+            result = estimator.apply_changes(changed, rescan=rescan)
+            # New directories may hold no Terraform files yet, so they are watched regardless;
+            # after an overflow, events about them may have been dropped
+            if result['directories_changed'] or rescan:
+                watcher.watch_directories(estimator.watched_directories(refresh=rescan))
+            if not result['files'] and not result['modules'] and not result['scope_changed']:
+                continue
+            _display_cost_delta(result, months, verbose, estimator.working_dir)
+    except KeyboardInterrupt:
+        print(f"\n{get_symbol('check')} Stopped watching")
+    finally:
+        watcher.close()
+
+def _display_cost_delta(result: dict, months: float, verbose: bool, working_dir: str):
+    """Display the cost change caused by a batch of file changes"""
+    names = [os.path.relpath(path, working_dir) for path in result['files'] + result['variable_files']]
+    names.extend(f"module.{name}" for name in result['modules'])
+    delta = result['delta']
+    sign = '+' if delta >= 0 else '-'
+    print(f"{get_symbol('wrench')} {', '.join(names)}: {sign}${abs(delta):.2f}/month "
+          f"-> ${result['total']:.2f}/month (${result['total'] * months:.2f} total, "
+          f"{result['elapsed'] * 1000:.0f} ms)")
+    if verbose:
+        for name, (old_cost, new_cost) in sorted(result['resource_changes'].items()):
+            print(f"   - {name:40} ${old_cost:.2f} -> ${new_cost:.2f}/month")
+
+def estimate_workspaces(spec: str, months: float, discovery_options: dict = None,
+                        var_files: List[str] = None, jobs: int = DEFAULT_JOBS,
+                        changed_since: str = None, report_file: str = None,
+                        n_simulations: int = None, uncertainty_seed: int = None,
+                        uncertainty_method: str = 'auto', uncertainty_tolerance: float = None,
+                        uncertainty_sampling: str = 'random') -> dict:
+    """
+    Estimate many root modules in one process and print per-workspace and
+    aggregate results as JSON. Progress and warnings go to stderr so stdout
+    stays machine readable.
+
+    With changed_since, only workspaces affected by the changes since that
+    git ref are estimated; the others reuse their costs from report_file.
+    The new report is written back to report_file.
+    """
+    from terracost.services.batch_service import BatchEstimator, resolve_workspaces, load_report, save_report
+
+    with contextlib.redirect_stdout(sys.stderr):
+        workspaces = resolve_workspaces(spec)
+        estimator = BatchEstimator(discovery_options, var_files, jobs, n_simulations, uncertainty_seed,
+                                   uncertainty_method, uncertainty_tolerance, uncertainty_sampling)
+        reuse = {}
+        if changed_since:
+            previous_report = load_report(report_file) if report_file else None
+            reuse = estimator.reusable_results(workspaces, changed_since, previous_report)
+            print(f"{get_symbol('search')} {len(workspaces) - len(reuse)} of {len(workspaces)} workspaces "
+                  f"affected by changes since {changed_since}")
+        print(f"{get_symbol('search')} Estimating {len(workspaces) - len(reuse)} workspaces with {jobs} workers...")
+        report = estimator.run(workspaces, months, reuse)
+        aggregate = report['aggregate']
+        cache = aggregate['parse_cache']
+        print(f"{get_symbol('check')} {aggregate['workspaces_count'] - aggregate['failed_count']} succeeded "
+              f"({aggregate['reused_count']} reused), {aggregate['failed_count']} failed "
+              f"in {aggregate['elapsed']:.1f}s (parse cache: {cache['hits']} hits, {cache['misses']} misses)")
+        for result in report['workspaces']:
+            if result['status'] != 'ok':
+                print(f"   {get_symbol('cross')} {result['workspace']}: {result['error']}")
+        if report_file:
+            save_report(report, report_file)
+    print(json.dumps(report, indent=2))
+    return report
+
+def diff_cost_estimate(base_ref: str, head_ref: str, months: float, working_dir: str,
+                       discovery_options: dict = None, as_json: bool = False) -> dict:
+    """
+    Compare the cost of a workspace at two git revisions, read from git
+    objects without checking either out
+    """
+    from terracost.services.diff_service import CostDiff
+
+    if as_json:
+        with contextlib.redirect_stdout(sys.stderr):
+            result = CostDiff(working_dir, discovery_options).compare(base_ref, head_ref)
+        print(json.dumps(result, indent=2))
+        return result
 
+    print(f"{get_symbol('search')} Comparing {base_ref} -> {head_ref}...")
+    result = CostDiff(working_dir, discovery_options).compare(base_ref, head_ref)
+    _display_cost_diff(result, months)
+    return result
 
+def _display_cost_diff(result: dict, months: float):
+    """Display the per-resource cost delta table and totals"""
+    print(f"\n{get_symbol('chart')} Cost Diff {result['base_ref']} -> {result['head_ref']}")
+    print("=" * 50)
+    print(f"   {result['added_count']} added, {result['removed_count']} removed, "
+          f"{result['changed_count']} changed, {result['unchanged_count']} unchanged "
+          f"({result['elapsed'] * 1000:.0f} ms)")
+    if result['resources']:
+        markers = {'added': '+', 'removed': '-', 'changed': '~'}
+        print(f"\n   {'Resource':42} {'Base':>12} {'Head':>12} {'Delta':>12}")
+        for entry in result['resources']:
+            delta = entry['delta']
+            base_cost = f"${entry['base_cost']:.2f}"
+            head_cost = f"${entry['head_cost']:.2f}"
+            delta_cost = f"{'+' if delta >= 0 else '-'}${abs(delta):.2f}"
+            print(f"   {markers[entry['status']]} {entry['resource']:40} {base_cost:>12} {head_cost:>12} {delta_cost:>12}")
+    delta = result['delta_monthly']
+    sign = '+' if delta >= 0 else '-'
+    change = f", {sign}{abs(delta) / result['base_monthly'] * 100:.1f}%" if result['base_monthly'] else ""
+    print(f"\n[COST] Monthly: ${result['base_monthly']:.2f} -> ${result['head_monthly']:.2f} "
+          f"({sign}${abs(delta):.2f}/month{change})")
+    if months != 1:
+        print(f"[COST] Over {months:.1f} month(s): {sign}${abs(delta) * months:.2f}")
+
+def serve_api(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, workers: int = DEFAULT_API_WORKERS,
+              verbose: bool = False):
+    """
+    Serve estimates over a local HTTP/JSON API. Workspaces stay parsed and
+    priced between requests, so repeated estimates of an unchanged or
+    slightly edited workspace return in milliseconds.
+    """
+    from terracost.services.api_service import CostApi
+    from terracost.services.http_server import ApiServer
+
+    api = CostApi(workers)
+    server = ApiServer((host, port), api, verbose)
+    print(f"{get_symbol('check')} TerraCost API listening on http://{host}:{server.server_address[1]} "
+          f"({api.workers} workers), press Ctrl+C to stop")
+    print("   POST /estimate      {\"path\": \"./infra\", \"months\": 1}")
+    print("   POST /estimate/hcl  {\"hcl\": \"resource ...\"}")
+    print("   POST /budget        {\"path\": \"./infra\", \"limit\": 100}")
+    print("   POST /invalidate    {\"file\": \"./infra/main.tf\"}")
+    print("   GET  /stats, GET /health")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n{get_symbol('check')} Stopped serving")
+    finally:
+        server.server_close()
+        api.close()
 
+def serve_rpc(workers: int = DEFAULT_API_WORKERS):
+    """
+    Answer line-delimited JSON-RPC on stdin/stdout for editor integrations.
+    stdout carries only protocol messages; everything else goes to stderr.
+    """
+    from terracost.services.api_service import CostApi
+    from terracost.services.rpc_service import RpcServer
 
+    api = CostApi(workers)
+    try:
+        RpcServer(api).serve()
+    finally:
+        api.close()
 
 # =====================
 # CLI Entrypoint
 # =====================
 
+def _add_discovery_arguments(subparser):
+    """Add Terraform file discovery options to a subcommand"""
+    subparser.add_argument(
+        "--include", action="append", metavar="GLOB",
+        help="Only scan files matching this glob (repeatable). Default: *.tf and *.tf.json"
+    )
+    subparser.add_argument(
+        "--exclude", action="append", metavar="GLOB",
+        help="Skip files and directories matching this glob (repeatable)"
+    )
+    subparser.add_argument(
+        "--git-files", action="store_true",
+        help="Read the file list from 'git ls-files' instead of scanning directories"
+    )
+
 def main():
     parser = argparse.ArgumentParser(
         prog="terracost",
@@ -262,6 +479,70 @@ def main():
         "-f", "--file", type=str, default=".",
         help="Folder location with your Terraform infrastructure (default: current directory)"
     )
+    _add_discovery_arguments(plan_parser)
+    plan_source_group = plan_parser.add_mutually_exclusive_group()
+    plan_source_group.add_argument(
+        "--plan-json", type=str, metavar="FILE",
+        help="Price a 'terraform show -json' plan file instead of parsing .tf sources"
+    )
+    plan_source_group.add_argument(
+        "--state", type=str, metavar="FILE",
+        help="Price deployed resources from a terraform.tfstate file ('-' reads stdin)"
+    )
+    plan_source_group.add_argument(
+        "--watch", action="store_true",
+        help="Keep running and report the cost delta whenever a .tf file changes"
+    )
+    plan_source_group.add_argument(
+        "--workspaces", type=str, metavar="GLOB|FILE",
+        help="Estimate many root modules in one run (a glob, or a file listing one directory per line) "
+             "and print the results as JSON"
+    )
+    plan_parser.add_argument(
+        "-j", "--jobs", type=int, default=DEFAULT_JOBS,
+        help=f"Workspaces estimated in parallel with --workspaces, and processes for large "
+             f"uncertainty simulations. Default: {DEFAULT_JOBS}"
+    )
+    plan_parser.add_argument(
+        "--changed-since", type=str, metavar="GIT_REF",
+        help="With --workspaces, only estimate workspaces affected by changes since this git ref "
+             "(including changes in local modules they use); others reuse costs from --report"
+    )
+    plan_parser.add_argument(
+        "--report", type=str, metavar="FILE",
+        help="With --workspaces, read the previous batch report from FILE and write the new one to it"
+    )
+    plan_parser.add_argument(
+        "--uncertainty-sims", type=int, metavar="N",
+        help="Monte Carlo simulations for the uncertainty analysis (the cap with "
+             f"--uncertainty-tolerance, at least {MIN_ADAPTIVE_SIMULATIONS}); implies "
+             "--uncertainty-method simulation. Default: 10000, or 1000000 with --uncertainty-tolerance"
+    )
+    plan_parser.add_argument(
+        "--uncertainty-tolerance", type=float, metavar="FRACTION",
+        help="Simulate in batches until the standard error of every confidence bound is within "
+             "FRACTION of the cost (e.g. 0.002), and accept closed-form bands only within it"
+    )
+    plan_parser.add_argument(
+        "--uncertainty-sampling", choices=["random", "antithetic", "sobol"], default="random",
+        help="How simulated shocks are drawn: pseudo-random, antithetic pairs, or scrambled "
+             "Sobol' points (needs scipy: pip install \"terracost[qmc]\"). Default: random"
+    )
+    plan_parser.add_argument(
+        "--uncertainty-seed", type=int, metavar="SEED",
+        help="Seed the uncertainty simulation; a seed gives the same bands whatever --jobs is"
+    )
+    plan_parser.add_argument(
+        "--uncertainty-method", choices=["auto", "analytic", "simulation"], default="auto",
+        help="How confidence bands are computed: 'auto' uses the closed form when its estimated "
+             "error is under 0.5%% of the cost and simulates otherwise, or always simulates "
+             "with --uncertainty-sims. Default: auto"
+    )
+    plan_parser.add_argument(
+        "--var-file", action="append", metavar="FILE",
+        help="Read variable values from a .tfvars file (repeatable). "
+             "terraform.tfvars and *.auto.tfvars are always read"
+    )
 
     # ---- suggest ----
     suggest_parser = subparsers.add_parser("suggest", help="Get LLM-based cost optimization suggestions")
@@ -285,6 +566,7 @@ def main():
         "--bestvalue", action="store_true",
         help="Suggest infrastructure that offers the best bang for your buck"
     )
+    _add_discovery_arguments(suggest_parser)
 
     budget_parser = subparsers.add_parser("budget", help="Generate a cost breakdown budget and check cost limit")
     budget_parser.add_argument(
@@ -295,6 +577,55 @@ def main():
         "-f", "--file", type=str, default=".", 
         help="Folder location with your infrastructure (default: current directory)"
     )
+    _add_discovery_arguments(budget_parser)
+
+    # ---- diff ----
+    diff_parser = subparsers.add_parser("diff", help="Compare the cost of two git revisions")
+    diff_parser.add_argument("base", help="Base git revision (e.g. origin/main)")
+    diff_parser.add_argument("head", nargs="?", default="HEAD", help="Head git revision. Default: HEAD")
+    diff_parser.add_argument(
+        "-t", "--timeframe", type=str, default="1m",
+        help="Timeframe for the total delta (Xd, Xm, Xy). Default: 1m"
+    )
+    diff_parser.add_argument(
+        "-f", "--file", type=str, default=".",
+        help="Folder location with your Terraform infrastructure (default: current directory)"
+    )
+    diff_parser.add_argument(
+        "--json", action="store_true",
+        help="Print the diff as JSON"
+    )
+    _add_discovery_arguments(diff_parser)
+
+    # ---- serve ----
+    serve_parser = subparsers.add_parser("serve", help="Serve estimates over a local HTTP/JSON API")
+    serve_parser.add_argument(
+        "--host", type=str, default=DEFAULT_HOST,
+        help=f"Address to listen on. Default: {DEFAULT_HOST}"
+    )
+    serve_parser.add_argument(
+        "--port", type=int, default=DEFAULT_PORT,
+        help=f"Port to listen on. Default: {DEFAULT_PORT}"
+    )
+    serve_parser.add_argument(
+        "-j", "--jobs", type=int, default=DEFAULT_API_WORKERS,
+        help=f"Requests processed in parallel. Default: {DEFAULT_API_WORKERS}"
+    )
+    serve_parser.add_argument(
+        "--verbose", action="store_true",
+        help="Log every request to stderr"
+    )
+
+    # ---- rpc ----
+    rpc_parser = subparsers.add_parser("rpc", help="Serve estimates as JSON-RPC for editor integrations")
+    rpc_parser.add_argument(
+        "--stdio", action="store_true", required=True,
+        help="Speak line-delimited JSON-RPC 2.0 on stdin/stdout"
+    )
+    rpc_parser.add_argument(
+        "-j", "--jobs", type=int, default=DEFAULT_API_WORKERS,
+        help=f"Requests processed in parallel. Default: {DEFAULT_API_WORKERS}"
+    )
 
     args = parser.parse_args()
 
@@ -305,12 +636,44 @@ def main():
 
     # ---- plan ----
     elif args.command == "plan":
+        if (args.changed_since or args.report) and not args.workspaces:
+            plan_parser.error("--changed-since and --report require --workspaces")
+        if args.uncertainty_tolerance is not None and args.uncertainty_tolerance <= 0:
+            plan_parser.error("--uncertainty-tolerance must be positive")
+        if (args.uncertainty_tolerance is not None and args.uncertainty_sims is not None
+                and args.uncertainty_sims < MIN_ADAPTIVE_SIMULATIONS):
+            plan_parser.error(f"--uncertainty-sims must be at least {MIN_ADAPTIVE_SIMULATIONS} "
+                              f"with --uncertainty-tolerance")
+        if args.uncertainty_sims is not None and args.uncertainty_method == 'analytic':
+            plan_parser.error("--uncertainty-sims cannot be used with --uncertainty-method analytic")
         months = parse_timeframe(args.timeframe)
         infrastructure_file = args.file
         
         try:
-            estimate_cost_from_files(months=months, verbose=args.verbose, 
-                                  working_dir=infrastructure_file)
+            if args.watch:
+                watch_cost_estimate(months, args.verbose, infrastructure_file,
+                                    discovery_options_from_args(args), args.var_file)
+            elif args.workspaces:
+                report = estimate_workspaces(args.workspaces, months, discovery_options_from_args(args),
+                                             args.var_file, args.jobs, args.changed_since, args.report,
+                                             args.uncertainty_sims, args.uncertainty_seed,
+                                             args.uncertainty_method, args.uncertainty_tolerance,
+                                             args.uncertainty_sampling)
+                if report['aggregate']['failed_count']:
+                    sys.exit(1)
+            else:
+                estimate_cost_from_files(months=months, verbose=args.verbose, 
+                                      working_dir=infrastructure_file,
+                                      discovery_options=discovery_options_from_args(args),
+                                      plan_json=args.plan_json,
+                                      state_file=args.state,
+                                      var_files=args.var_file,
+                                      n_simulations=args.uncertainty_sims,
+                                      uncertainty_method=args.uncertainty_method,
+                                      uncertainty_tolerance=args.uncertainty_tolerance,
+                                      uncertainty_sampling=args.uncertainty_sampling,
+                                      uncertainty_seed=args.uncertainty_seed,
+                                      jobs=args.jobs)
         except Exception as e:
             print(f"{get_symbol('cross')} Error: {str(e)}")
             print(f"\n{get_symbol('wrench')} Troubleshooting Tips:")
@@ -325,13 +688,25 @@ def main():
         infrastructure_file = args.file
         
         try:
+            from terracost.services.ai_component import llm_available, run_ai_command
+            if not llm_available():
+                # Fast-start builds ship the LLM client as a separate executable
+                sys.exit(run_ai_command(sys.argv[1:]))
+
+            from terracost.services.cost_engine import CostEngine
+            from terracost.services.terraform_file_parser import (TerraformFileParser, PRICING_KINDS,
+                                                                  PRICED_TYPE_PREFIXES)
+            from terracost.services.suggest_progress import SuggestStepTracker
+            from terracost.services.suggest_service import suggest_budget, suggest_savings, suggest_best_value
+
             # Initialize progress tracking
             progress_tracker = SuggestStepTracker()
             progress_tracker.start_analysis()
             
             # Parse infrastructure to get current resources
-            parser = TerraformFileParser(infrastructure_file)
-            parse_result = parser.parse_terraform_files(show_progress=False)
+            parser = TerraformFileParser(infrastructure_file, discovery_options_from_args(args))
+            parse_result = parser.parse_terraform_files(show_progress=False, kinds=PRICING_KINDS,
+                                                        type_prefixes=PRICED_TYPE_PREFIXES)
             all_resources = parse_result['resources']
             
             # Check if any cloud resources exist
@@ -345,36 +720,14 @@ def main():
             file_count = parse_result.get('summary', {}).get('modules_count', 0) + 1
             progress_tracker.infrastructure_parsed(file_count, total_resources)
             
-            # Get current cost estimate for all providers
-            all_costs = {}
-            current_total = 0.0
-            
-            # AWS costs
-            if all_resources.get('aws'):
-                aws_service = AwsCostService()
-                aws_costs = aws_service.build_costs(all_resources['aws'])
-                all_costs.update(aws_costs)
-                aws_total = sum(aws_costs.values())
-                current_total += aws_total
-                progress_tracker.provider_costs_calculated("AWS", len(all_resources['aws']), aws_total)
-            
-            # Azure costs
-            if all_resources.get('azure'):
-                azure_service = AzureCostService()
-                azure_costs = azure_service.build_costs(all_resources['azure'])
-                all_costs.update(azure_costs)
-                azure_total = sum(azure_costs.values())
-                current_total += azure_total
-                progress_tracker.provider_costs_calculated("Azure", len(all_resources['azure']), azure_total)
-            
-            # GCP costs
-            if all_resources.get('gcp'):
-                gcp_service = GCPCostService()
-                gcp_costs = gcp_service.build_costs(all_resources['gcp'])
-                all_costs.update(gcp_costs)
-                gcp_total = sum(gcp_costs.values())
-                current_total += gcp_total
-                progress_tracker.provider_costs_calculated("GCP", len(all_resources['gcp']), gcp_total)
+            # Price everything once; the suggestions reuse this breakdown
+            costs = CostEngine().price(all_resources)
+            provider_totals = costs.provider_totals
+            for provider, label in (('aws', "AWS"), ('azure', "Azure"), ('gcp', "GCP")):
+                if provider in provider_totals:
+                    progress_tracker.provider_costs_calculated(label, costs.resource_counts[provider],
+                                                               provider_totals[provider])
+            current_total = costs.total_monthly
             
             # Start AI generation phase (this is separate from cost calculation)
             progress_tracker.ai_generation_started()
@@ -405,13 +758,13 @@ def main():
             
             if args.budget:
                 progress_tracker.progress.update_message(f"Generating AI-powered budget optimization suggestions (target: ${args.budget}/month)...")
-                suggest_budget(args.budget, all_resources)
+                suggest_budget(args.budget, all_resources, costs)
             elif args.savings:
                 progress_tracker.progress.update_message("Generating AI-powered cost savings suggestions...")
-                suggest_savings(all_resources)
+                suggest_savings(all_resources, costs)
             elif args.bestvalue:
                 progress_tracker.progress.update_message("Generating AI-powered best value recommendations...")
-                suggest_best_value(all_resources)
+                suggest_best_value(all_resources, costs)
             else:
                 progress_tracker.progress.stop(False)
                 print(f"{get_symbol('warning')} Please provide one option: --budget, --savings, or --bestvalue")
@@ -434,15 +787,41 @@ def main():
             print("   • Make sure OPENAI_API_KEY is set for LLM suggestions")
             sys.exit(1)
 
+    elif args.command == "diff":
+        try:
+            diff_cost_estimate(args.base, args.head, parse_timeframe(args.timeframe), args.file,
+                               discovery_options_from_args(args), args.json)
+        except Exception as e:
+            print(f"{get_symbol('cross')} Error: {str(e)}")
+            sys.exit(1)
+
+    elif args.command == "serve":
+        try:
+            serve_api(args.host, args.port, args.jobs, args.verbose)
+        except Exception as e:
+            print(f"{get_symbol('cross')} Error: {str(e)}")
+            sys.exit(1)
+
+    elif args.command == "rpc":
+        try:
+            serve_rpc(args.jobs)
+        except KeyboardInterrupt:
+            pass
+
     elif args.command == "budget":
         infrastructure_file = args.file
         limit = args.limit
         try:
-            run_pipeline_check(infrastructure_file, limit)
+            from terracost.services.cicd_service import run_pipeline_check
+            run_pipeline_check(infrastructure_file, limit,
+                               discovery_options=discovery_options_from_args(args))
         except Exception as e:
             print(f"❌ Error: {str(e)}")      
     else:
         parser.print_help()
 
 if __name__ == "__main__":
+    # Lets frozen builds start the worker processes of parallel simulations
+    import multiprocessing
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1,97 @@
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import threading
+from typing import Dict, Any, List, Optional
+
+# The fast-start build ships the LLM client as a separate executable next to
+# the core one (scripts/build_python.py --profile fast)
+AI_EXECUTABLE = 'terracost-ai'
+
+# Modules suggestions need; the fast-start core build leaves them out
+LLM_MODULES = ('langchain', 'langchain_openai')
+
+
+class AiComponentError(Exception):
+    """An error reported by the AI component; status is the HTTP-style code it carried"""
+
+    def __init__(self, message: str, status: int = 500):
+        super().__init__(message)
+        self.status = status
+
+
+def llm_available() -> bool:
+    """Check whether the LLM client can be imported in this process"""
+    return all(importlib.util.find_spec(module) is not None for module in LLM_MODULES)
+
+
+def ai_component_path() -> Optional[str]:
+    """The separately built AI executable of a frozen fast-start build, if present"""
+    if not getattr(sys, 'frozen', False):
+        return None
+    name = AI_EXECUTABLE + ('.exe' if sys.platform == 'win32' else '')
+    install_dir = os.path.dirname(os.path.abspath(sys.executable))
+    # Both components are onedir builds: <dist>/terracost/ and <dist>/terracost-ai/
+    for directory in (install_dir, os.path.join(os.path.dirname(install_dir), AI_EXECUTABLE)):
+        path = os.path.join(directory, name)
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def run_ai_command(argv: List[str]) -> int:
+    """Run a CLI command in the AI component, passing the terminal through"""
+    path = ai_component_path()
+    if path is None:
+        raise Exception("LLM support is not installed (the terracost-ai component was not found)")
+    return subprocess.call([path] + argv)
+
+
+class AiComponentClient:
+    """
+    JSON-RPC connection to the AI component (terracost-ai rpc --stdio),
+    started on the first suggestion request so the core process never loads
+    the LLM client
+    """
+
+    def __init__(self):
+        self._process = None
+        self._lock = threading.Lock()
+        self._next_id = 1
+
+    def request(self, method: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            process = self._ensure_process()
+            request_id = self._next_id
+            self._next_id += 1
+            process.stdin.write(json.dumps({'jsonrpc': '2.0', 'id': request_id,
+                                            'method': method, 'params': params}) + '\n')
+            process.stdin.flush()
+            # Requests are sent one at a time, so the next line is the answer
+            line = process.stdout.readline()
+        if not line:
+            self.close()
+            raise Exception("The terracost-ai component exited unexpectedly")
+        response = json.loads(line)
+        if 'error' in response:
+            error = response['error']
+            raise AiComponentError(error['message'], (error.get('data') or {}).get('status', 500))
+        return response['result']
+
+    def _ensure_process(self) -> subprocess.Popen:
+        if self._process is None or self._process.poll() is not None:
+            path = ai_component_path()
+            if path is None:
+                raise AiComponentError("LLM support is not installed (the terracost-ai component was not found)", 501)
+            self._process = subprocess.Popen([path, 'rpc', '--stdio'], stdin=subprocess.PIPE,
+                                             stdout=subprocess.PIPE, text=True, encoding='utf-8')
+        return self._process
+
+    def close(self):
+        with self._lock:
+            if self._process is not None and self._process.poll() is None:
+                self._process.stdin.close()
+                self._process.wait(timeout=10)
+            self._process = None
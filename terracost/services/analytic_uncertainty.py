@@ -0,0 +1,154 @@
+from statistics import NormalDist
+from typing import Dict, Optional, Tuple
+import numpy as np
+from .monte_carlo import month_steps, DISTRIBUTIONS
+
+# Largest estimated error of a band, as a fraction of the base cost, for
+# which the closed form is used instead of simulating
+ANALYTIC_TOLERANCE = 0.005
+
+# The error estimate keeps only the leading Cornish-Fisher term; the validation
+# harness (scripts/validate_uncertainty.py) shows the full error is up to about
+# twice that for the normal model
+ERROR_SAFETY_FACTOR = 2.0
+
+METHODS = ('auto', 'analytic', 'simulation')
+
+# Standard normal quantiles of the reported percentiles (16, 84, 2.5, 97.5)
+CONFIDENCE_Z = [NormalDist().inv_cdf(p / 100) for p in (16, 84, 2.5, 97.5)]
+
+BAND_KEYS = ('confidence_68_lower', 'confidence_68_upper', 'confidence_95_lower', 'confidence_95_upper')
+
+# Skewness below which the total is treated as normal
+MIN_SKEWNESS = 1e-6
+
+
+class GroupMoments:
+    """
+    Exact central moments of the end-of-timeframe costs of correlated cost
+    groups under the random-walk model of monte_carlo.simulate_groups, as
+    tensors over group indices. Weighting them by the group costs gives the
+    moments of any total of the groups (a provider, or everything).
+    """
+
+    def __init__(self, volatilities: np.ndarray, correlation: np.ndarray, timeframe_months: float,
+                 distribution: str = 'normal'):
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown distribution: {distribution}")
+        volatilities = np.asarray(volatilities, dtype=float)
+        groups = len(volatilities)
+        # Each group's cost is base * P, P the product of per-step factors with
+        # mean 1. e_S = E[prod of P over the index set S] - 1, kept as expm1 of a
+        # sum of logs so small volatilities do not cancel out
+        log2 = np.zeros((groups,) * 2)
+        log3 = np.zeros((groups,) * 3)
+        log4 = np.zeros((groups,) * 4)
+        for step in month_steps(timeframe_months):
+            if distribution == 'lognormal':
+                log_sigma = np.sqrt(np.log1p(step * volatilities ** 2))
+                pair = correlation * np.outer(log_sigma, log_sigma)
+            else:
+                pair = correlation * np.outer(volatilities, volatilities) * step
+            sum3, sum4, isserlis = self._pair_sums(pair)
+            if distribution == 'lognormal':
+                # E[prod of correlated mean-1 lognormals] = exp(sum of pairwise log covariances)
+                log2 += pair
+                log3 += sum3
+                log4 += sum4
+            else:
+                # E[prod (1 + x_j)] for zero-mean jointly normal x_j: odd terms vanish,
+                # the fourth-order one follows Isserlis' theorem
+                log2 += np.log1p(pair)
+                log3 += np.log1p(sum3)
+                log4 += np.log1p(sum4 + isserlis)
+        self.e2 = e2 = np.expm1(log2)
+        e3 = np.expm1(log3)
+        e4 = np.expm1(log4)
+        # Central moments E[prod (P_j - 1)] by inclusion-exclusion over index subsets
+        self.central3 = e3 - e2[:, :, None] - e2[:, None, :] - e2[None, :, :]
+        self.central4 = (e4
+                         - e3[:, :, :, None] - e3[:, :, None, :] - e3[:, None, :, :] - e3[None, :, :, :]
+                         + e2[:, :, None, None] + e2[:, None, :, None] + e2[:, None, None, :]
+                         + e2[None, :, :, None] + e2[None, :, None, :] + e2[None, None, :, :])
+
+    @staticmethod
+    def _pair_sums(pair: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Sums of a pairwise matrix over the pairs of 3 and 4 indices, and Isserlis' pairings of 4"""
+        sum3 = pair[:, :, None] + pair[:, None, :] + pair[None, :, :]
+        ab = pair[:, :, None, None]
+        ac = pair[:, None, :, None]
+        ad = pair[:, None, None, :]
+        bc = pair[None, :, :, None]
+        bd = pair[None, :, None, :]
+        cd = pair[None, None, :, :]
+        return sum3, ab + ac + ad + bc + bd + cd, ab * cd + ac * bd + ad * bc
+
+    def summarize(self, costs: np.ndarray) -> Tuple[Dict[str, float], float]:
+        """
+        Confidence bounds and spread of the total of the given group costs
+        (zero for groups left out), and the estimated error of the bounds as
+        a fraction of the mean
+        """
+        costs = np.asarray(costs, dtype=float)
+        mean = float(costs.sum())
+        variance = float(costs @ self.e2 @ costs)
+        if mean <= 0 or variance <= 0:
+            return dict(zip(BAND_KEYS, [mean] * 4), std_deviation=0.0), 0.0
+        third = float(np.einsum('abc,a,b,c->', self.central3, costs, costs, costs))
+        fourth = float(np.einsum('abcd,a,b,c,d->', self.central4, costs, costs, costs, costs))
+        std = np.sqrt(variance)
+        skewness = third / std ** 3
+        kurtosis = fourth / variance ** 2 - 3
+        quantiles, fitted_kurtosis = shifted_lognormal_quantiles(skewness)
+        lower_68, upper_68, lower_95, upper_95 = (mean + std * q for q in quantiles)
+        # Cornish-Fisher: a kurtosis mismatch dk moves the z quantile by dk * (z^3 - 3z) / 24
+        error = (ERROR_SAFETY_FACTOR * max(abs(z ** 3 - 3 * z) for z in CONFIDENCE_Z) / 24
+                 * abs(kurtosis - fitted_kurtosis) * std / mean)
+        return {
+            'confidence_68_lower': float(lower_68),
+            'confidence_68_upper': float(upper_68),
+            'confidence_95_lower': float(lower_95),
+            'confidence_95_upper': float(upper_95),
+            'std_deviation': float(std)
+        }, float(error)
+
+
+def shifted_lognormal_quantiles(skewness: float):
+    """
+    Standardized quantiles at CONFIDENCE_Z of the shifted lognormal with the
+    given skewness (normal when it is ~0), and that distribution's excess kurtosis
+    """
+    if abs(skewness) < MIN_SKEWNESS:
+        return list(CONFIDENCE_Z), 0.0
+    # Lognormal skewness is (w + 2) sqrt(w - 1); with u = sqrt(w - 1), u^3 + 3u = skewness
+    gamma = abs(skewness)
+    root = np.sqrt(gamma ** 2 + 4)
+    u = np.cbrt((gamma + root) / 2) + np.cbrt((gamma - root) / 2)
+    w = 1 + u ** 2
+    sigma = np.sqrt(np.log(w))
+    sign = 1 if skewness > 0 else -1
+    quantiles = [sign * (np.exp(sigma * sign * z) - np.sqrt(w)) / np.sqrt(w * (w - 1)) for z in CONFIDENCE_Z]
+    return [float(q) for q in quantiles], float(w ** 4 + 2 * w ** 3 + 3 * w ** 2 - 6)
+
+
+def analytic_uncertainty(base_cost: float, volatility: float, timeframe_months: float,
+                         distribution: str = 'normal') -> Tuple[Dict[str, float], float]:
+    """
+    Closed-form counterpart of summarize_costs(simulate_costs(...)) and its
+    estimated error as a fraction of the base cost. The lognormal model is a
+    lognormal exactly; the normal one is matched on its first three moments.
+    """
+    moments = GroupMoments(np.array([volatility]), np.eye(1), timeframe_months, distribution)
+    return moments.summarize(np.array([float(base_cost)]))
+
+
+def use_analytic(method: str, error: float, tolerance: Optional[float] = None) -> bool:
+    """
+    Whether a method ('auto', 'analytic' or 'simulation') keeps closed-form
+    bands with this error; 'auto' accepts errors up to the tolerance, by
+    default ANALYTIC_TOLERANCE
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown uncertainty method: {method}")
+    tolerance = ANALYTIC_TOLERANCE if tolerance is None else tolerance
+    return method == 'analytic' or (method == 'auto' and error <= tolerance)
@@ -0,0 +1,385 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, List, Optional, Tuple
+from .cost_engine import CostEngine
+from .watch_service import IncrementalEstimator
+from .cicd_service import CostGuard
+from .terraform_file_parser import TerraformFileParser, PRICING_KINDS, PRICED_TYPE_PREFIXES
+from .parse_cache import ParseCache
+from .defaults import DEFAULT_API_WORKERS
+from .ai_component import AiComponentClient, AiComponentError, llm_available
+
+SUGGESTION_TYPES = ('savings', 'bestvalue', 'budget')
+
+# Warm workspaces and inline HCL results kept in memory (least recently used are dropped)
+MAX_WARM_WORKSPACES = 64
+MAX_CACHED_SNIPPETS = 128
+
+
+class ApiError(Exception):
+    """A request the API rejects; status is the HTTP status code to report"""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+class _WarmWorkspace:
+    """An IncrementalEstimator plus the file stamps it was last brought up to date with"""
+
+    def __init__(self, estimator: IncrementalEstimator):
+        self.estimator = estimator
+        self.snapshot: Dict[str, Tuple[int, int]] = {}
+        self.loaded = False
+        self.lock = threading.Lock()
+
+
+def _stamp(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class CostApi:
+    """
+    Transport-independent backend for long-lived TerraCost processes
+    (terracost serve and terracost rpc). Workspaces stay parsed and priced in memory and are
+    brought up to date from file stamps on each request, so repeated
+    estimates only re-parse what changed. Work runs on a bounded worker
+    pool, and identical requests that are in flight at the same time share
+    one computation.
+    """
+
+    METHODS = ('estimate', 'estimate_hcl', 'budget', 'suggest', 'invalidate', 'stats')
+
+    def __init__(self, workers: int = DEFAULT_API_WORKERS):
+        self.engine = CostEngine()
+        self.parse_cache = ParseCache()
+        self.ai_component = AiComponentClient()
+        self.executor = ThreadPoolExecutor(max_workers=max(1, workers))
+        self.workers = max(1, workers)
+        self._workspaces: 'OrderedDict[Tuple, _WarmWorkspace]' = OrderedDict()
+        self._snippets: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self.stats = {
+            'requests': 0,
+            'batched_requests': 0,
+            'workspace_loads': 0,
+            'workspace_updates': 0,
+            'snippet_hits': 0
+        }
+
+    # ---- request handling ----
+
+    def handle(self, method: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Dispatch a request by method name; identical concurrent requests are batched"""
+        handlers = {
+            'estimate': self.estimate,
+            'estimate_hcl': self.estimate_hcl,
+            'budget': self.budget,
+            'suggest': self.suggest,
+            'invalidate': self.invalidate,
+            'stats': self.get_stats
+        }
+        if method not in self.METHODS:
+            raise ApiError(f"Unknown method: {method}", 404)
+        params = params or {}
+        if not isinstance(params, dict):
+            raise ApiError("Parameters must be a JSON object")
+        with self._lock:
+            self.stats['requests'] += 1
+        if method in ('stats', 'invalidate'):
+            return handlers[method](params)
+        key = method + json.dumps(params, sort_keys=True, default=str)
+        return self._single_flight(key, lambda: handlers[method](params))
+
+    def _single_flight(self, key: str, compute: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is None:
+                future = self.executor.submit(self._run, key, compute)
+                self._inflight[key] = future
+            else:
+                self.stats['batched_requests'] += 1
+        return future.result()
+
+    def _run(self, key: str, compute: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        try:
+            return compute()
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    # ---- methods ----
+
+    def estimate(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Estimate a workspace directory: {"path", "months"?, "var_files"?, "include"?, "exclude"?, "git_files"?}"""
+        start = time.perf_counter()
+        months = self._months(params)
+        workspace, updated = self._warm_workspace(params)
+        with workspace.lock:
+            result = self._result(workspace.estimator.costs, workspace.estimator.total_resources, months)
+        result.update({
+            'workspace': workspace.estimator.working_dir,
+            'files': len(workspace.estimator.files),
+            'updated': updated,
+            'elapsed_ms': (time.perf_counter() - start) * 1000
+        })
+        return result
+
+    def estimate_hcl(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Estimate inline Terraform source: {"hcl", "filename"?, "months"?}"""
+        start = time.perf_counter()
+        source = params.get('hcl')
+        if not isinstance(source, str) or not source.strip():
+            raise ApiError("'hcl' must be a non-empty string")
+        filename = os.path.basename(params.get('filename') or 'main.tf')
+        if not filename.endswith(('.tf', '.tf.json')):
+            raise ApiError("'filename' must end in .tf or .tf.json")
+        months = self._months(params)
+
+        digest = hashlib.sha256(f"{filename}\0{source}".encode('utf-8')).hexdigest()
+        with self._lock:
+            cached = self._snippets.get(digest)
+            if cached is not None:
+                self._snippets.move_to_end(digest)
+                self.stats['snippet_hits'] += 1
+        if cached is None:
+            directory = tempfile.mkdtemp(prefix='terracost-hcl-')
+            try:
+                with open(os.path.join(directory, filename), 'w', encoding='utf-8') as f:
+                    f.write(source)
+                estimator = IncrementalEstimator(directory, engine=self.engine)
+                estimator.load()
+                cached = {'costs': estimator.costs, 'resources': estimator.total_resources}
+            finally:
+                shutil.rmtree(directory, ignore_errors=True)
+            with self._lock:
+                self._snippets[digest] = cached
+                while len(self._snippets) > MAX_CACHED_SNIPPETS:
+                    self._snippets.popitem(last=False)
+
+        result = self._result(cached['costs'], cached['resources'], months)
+        result['elapsed_ms'] = (time.perf_counter() - start) * 1000
+        return result
+
+    def budget(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Check a workspace against a monthly limit: {"path", "limit", ...estimate options}"""
+        try:
+            limit = float(params['limit'])
+        except (KeyError, TypeError, ValueError):
+            raise ApiError("'limit' must be a number")
+        estimate = self.estimate(params)
+        check = CostGuard.check_budget(estimate['monthly_cost'], limit, estimate['breakdown'])
+        estimate.update(check)
+        estimate['limit'] = limit
+        return estimate
+
+    def suggest(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        LLM optimization suggestions for a workspace:
+        {"path", "type": savings|bestvalue|budget, "budget"?, "api_key"?, ...discovery options}
+        """
+        if not llm_available():
+            # Fast-start builds answer suggestions from the separate AI component
+            try:
+                return self.ai_component.request('suggest', params)
+            except AiComponentError as e:
+                raise ApiError(str(e), e.status)
+
+        # The LLM client is only imported once suggestions are asked for
+        from . import suggest_service
+
+        suggestion_type = params.get('type', 'savings')
+        if suggestion_type not in SUGGESTION_TYPES:
+            raise ApiError(f"'type' must be one of: {', '.join(SUGGESTION_TYPES)}")
+        budget = None
+        if suggestion_type == 'budget':
+            try:
+                budget = float(params['budget'])
+            except (KeyError, TypeError, ValueError):
+                raise ApiError("'budget' must be a number")
+        api_key = params.get('api_key') or suggest_service.api_key
+        if not api_key:
+            raise ApiError("OPENAI_API_KEY not found; set it or pass 'api_key'", 401)
+        path = params.get('path')
+        if not isinstance(path, str) or not os.path.isdir(path):
+            raise ApiError(f"Not a directory: {path}", 404)
+
+        parser = TerraformFileParser(path, self._discovery_options(params), parse_cache=self.parse_cache)
+        try:
+            parse_result = parser.parse_terraform_files(show_progress=False, kinds=PRICING_KINDS,
+                                                        type_prefixes=PRICED_TYPE_PREFIXES)
+        except Exception as e:
+            raise ApiError(str(e), 422)
+        resources = parse_result['resources']
+        costs = self.engine.price(resources)
+
+        if suggestion_type == 'budget':
+            response = suggest_service.suggest_budget(budget, resources, costs, api_key)
+        elif suggestion_type == 'savings':
+            response = suggest_service.suggest_savings(resources, costs, api_key)
+        else:
+            response = suggest_service.suggest_best_value(resources, costs, api_key)
+        if response is None:
+            raise ApiError("Could not generate suggestions; check the OpenAI API key and connection", 502)
+        return {
+            'type': suggestion_type,
+            'current_monthly_cost': costs.total_monthly,
+            'suggestions': suggest_service.parse_suggestions(response),
+            'response': response
+        }
+
+    def invalidate(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Forget cached state: {"file"} re-reads that file on the next request
+        (stamps normally catch edits already), {"path"} drops a warm workspace,
+        {} drops everything
+        """
+        file_path = params.get('file')
+        path = params.get('path')
+        with self._lock:
+            if file_path:
+                file_path = os.path.abspath(file_path)
+                for workspace in self._workspaces.values():
+                    workspace.snapshot.pop(file_path, None)
+                self.parse_cache.invalidate(file_path)
+                return {'invalidated': 1}
+            if path:
+                path = os.path.abspath(path)
+                keys = [key for key in self._workspaces if key[0] == path]
+            else:
+                keys = list(self._workspaces)
+                self._snippets.clear()
+                self.parse_cache = ParseCache()
+            for key in keys:
+                del self._workspaces[key]
+            return {'invalidated': len(keys)}
+
+    def get_stats(self, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+            stats.update({
+                'warm_workspaces': len(self._workspaces),
+                'cached_snippets': len(self._snippets),
+                'in_flight': len(self._inflight),
+                'workers': self.workers
+            })
+        stats['price_cache_entries'] = {
+            f"{provider}:{region or 'default'}": len(service._pricing_cache)
+            for (provider, region), service in list(self.engine._services.items())
+        }
+        return stats
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+        self.ai_component.close()
+
+    # ---- helpers ----
+
+    @staticmethod
+    def _months(params: Dict[str, Any]) -> float:
+        try:
+            months = float(params.get('months', 1))
+        except (TypeError, ValueError):
+            raise ApiError("'months' must be a number")
+        if months <= 0:
+            raise ApiError("'months' must be positive")
+        return months
+
+    def _result(self, costs: Dict[str, float], resources: int, months: float) -> Dict[str, Any]:
+        monthly_cost = sum(costs.values())
+        uncertainty = self.engine.estimate_breakdown_uncertainty(costs, months)
+        return {
+            'timeframe_months': months,
+            'monthly_cost': monthly_cost,
+            'total_cost': monthly_cost * months,
+            'resources': resources,
+            'breakdown': costs,
+            'uncertainty_analysis': uncertainty
+        }
+
+    @staticmethod
+    def _discovery_options(params: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'include': params.get('include'),
+            'exclude': params.get('exclude'),
+            'use_git': bool(params.get('git_files', False))
+        }
+
+    def _warm_workspace(self, params: Dict[str, Any]) -> Tuple[_WarmWorkspace, bool]:
+        """The workspace's warm estimator, loaded on first use and refreshed from file stamps"""
+        path = params.get('path')
+        if not isinstance(path, str) or not path:
+            raise ApiError("'path' must be a directory")
+        path = os.path.abspath(path)
+        if not os.path.isdir(path):
+            raise ApiError(f"Not a directory: {path}", 404)
+        discovery_options = self._discovery_options(params)
+        var_files = [os.path.abspath(var_file) for var_file in params.get('var_files') or []]
+        key = (path, json.dumps(discovery_options, sort_keys=True), tuple(var_files))
+
+        with self._lock:
+            workspace = self._workspaces.get(key)
+            if workspace is None:
+                estimator = IncrementalEstimator(path, discovery_options, var_files, engine=self.engine)
+                workspace = _WarmWorkspace(estimator)
+                self._workspaces[key] = workspace
+                while len(self._workspaces) > MAX_WARM_WORKSPACES:
+                    self._workspaces.popitem(last=False)
+            else:
+                self._workspaces.move_to_end(key)
+
+        with workspace.lock:
+            estimator = workspace.estimator
+            if not workspace.loaded:
+                try:
+                    estimator.load()
+                except Exception as e:
+                    with self._lock:
+                        self._workspaces.pop(key, None)
+                    raise ApiError(str(e), 422)
+                workspace.snapshot = self._take_snapshot(estimator)
+                workspace.loaded = True
+                with self._lock:
+                    self.stats['workspace_loads'] += 1
+                return workspace, True
+
+            snapshot = self._take_snapshot(estimator)
+            changed = {path for path, stamp in snapshot.items() if workspace.snapshot.get(path) != stamp}
+            changed.update(path for path in workspace.snapshot if path not in snapshot)
+            if not changed:
+                return workspace, False
+            # A changed directory stamp means files may have been added or removed;
+            # the estimator rediscovers the files only then
+            estimator.apply_changes(changed)
+            workspace.snapshot = self._take_snapshot(estimator)
+            with self._lock:
+                self.stats['workspace_updates'] += 1
+            return workspace, True
+
+    @staticmethod
+    def _take_snapshot(estimator: IncrementalEstimator) -> Dict[str, Tuple[int, int]]:
+        """
+        Stamps of every file and directory the estimate depends on. The
+        directory list is the estimator's cached one, rebuilt only when a
+        change added or removed files or directories, so an unchanged
+        workspace costs one stat per path rather than a walk of the tree.
+        """
+        paths: List[str] = list(estimator.watched_files()) + list(estimator.watched_directories())
+        snapshot = {}
+        for path in paths:
+            stamp = _stamp(path)
+            if stamp is not None:
+                snapshot[path] = stamp
+        return snapshot
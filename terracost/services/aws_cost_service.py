@@ -1,4 +1,3 @@
-import requests
 from .base_cost_service import BaseCostService
 
 class AwsCostService(BaseCostService):
@@ -119,14 +118,14 @@ class AwsCostService(BaseCostService):
                 continue
                 
             for resource in resource_list:
-                resource_name = resource.get('name', 'unknown')
-                resource_config = resource.get('config', {})
+                resource_name = resource.name
+                resource_config = resource.config
                 
                 # Generate a unique key for this resource
                 key = f"{resource_type}.{resource_name}"
                 
                 # Calculate cost based on resource type and configuration
-                cost = self._calculate_resource_cost(resource_type, resource_config)
+                cost = self._calculate_resource_cost(resource_type, resource_config) * resource.count
                 costs[key] = cost
                 
         return costs
@@ -210,20 +209,15 @@ class AwsCostService(BaseCostService):
     def _calculate_ec2_cost(self, config: dict) -> float:
         """Calculate EC2 instance cost based on configuration"""
         instance_type = config.get('instance_type', 't3.micro')
-        count = self._parse_count(config.get('count', '1'))
         
-        # Get base instance cost
-        base_cost = self.get_ec2_instance_price(instance_type) or 0.0
-        
-        # Calculate total cost for all instances
-        return base_cost * count
+        # Cost of a single instance; build_costs multiplies by count/for_each
+        return self.get_ec2_instance_price(instance_type) or 0.0
     
     def _calculate_rds_cost(self, config: dict) -> float:
         """Calculate RDS instance cost based on configuration"""
         instance_class = config.get('instance_class', 'db.t3.micro')
         engine = config.get('engine', 'postgres')
         allocated_storage = self._parse_storage(config.get('allocated_storage', '20'))
-        count = self._parse_count(config.get('count', '1'))
         
         # Get base instance cost
         base_cost = self.get_rds_price(instance_class, engine) or 0.0
@@ -231,7 +225,7 @@ class AwsCostService(BaseCostService):
         # Add storage cost (simplified - in reality this varies by engine and storage type)
         storage_cost = self._calculate_rds_storage_cost(allocated_storage, engine)
         
-        return (base_cost + storage_cost) * count
+        return base_cost + storage_cost
     
     def _calculate_s3_cost(self, config: dict) -> float:
         """Calculate S3 cost based on configuration"""
@@ -1,4 +1,3 @@
-import requests
 from .base_cost_service import BaseCostService
 from typing import Dict, Any, Optional, List
 
@@ -10,6 +9,13 @@ class AzureCostService(BaseCostService):
     
     BASE_URL = "https://prices.azure.com/api/retail/prices"
     API_VERSION = "2021-10-01-preview"
+
+    # Azure pricing is generally more predictable than AWS
+    VOLATILITY_FACTORS = {
+        'low': 0.03,     # 3% monthly variation (lower than AWS)
+        'medium': 0.06,  # 6% monthly variation
+        'high': 0.12     # 12% monthly variation
+    }
     
     def __init__(self, region: str = "eastus"):
         super().__init__(region)
@@ -300,14 +306,14 @@ class AzureCostService(BaseCostService):
                 continue
                 
             for resource in resource_list:
-                resource_name = resource.get('name', 'unknown')
-                resource_config = resource.get('config', {})
+                resource_name = resource.name
+                resource_config = resource.config
                 
                 # Generate unique key
                 key = f"{resource_type}.{resource_name}"
                 
                 # Calculate cost using real-time API
-                cost = self._calculate_resource_cost(resource_type, resource_config)
+                cost = self._calculate_resource_cost(resource_type, resource_config) * resource.count
                 
                 if cost > 0:
                     costs[key] = cost
@@ -343,18 +349,3 @@ class AzureCostService(BaseCostService):
     def get_region_name(self) -> str:
         """Get human-readable region name"""
         return self.region_name_map.get(self.region, self.region)
-
-    def estimate_uncertainty(self, base_cost: float, timeframe_months: float) -> Dict[str, float]:
-        """
-        Estimate cost uncertainty for Azure resources
-        Azure pricing tends to be more stable than AWS
-        """
-        # Azure pricing is generally more predictable
-        volatility_factors = {
-            'low': 0.03,     # 3% monthly variation (lower than AWS)
-            'medium': 0.06,  # 6% monthly variation
-            'high': 0.12     # 12% monthly variation
-        }
-        
-        # Use the same uncertainty calculation as base class
-        return super().estimate_uncertainty(base_cost, timeframe_months)
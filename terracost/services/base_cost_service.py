@@ -1,15 +1,49 @@
 from abc import ABC, abstractmethod
 from typing import Dict, Any, Optional
-import requests
+import threading
 import time
 
+# Connections are pooled per host; providers are priced concurrently
+HTTP_POOL_SIZE = 16
+
+_http_session = None
+_http_session_lock = threading.Lock()
+
+
+def get_http_session() -> "requests.Session":
+    """The HTTP session (and connection pool) shared by every cost service"""
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            # requests is only imported once a price list is actually downloaded
+            import requests
+            from requests.adapters import HTTPAdapter
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _http_session = session
+        return _http_session
+
+
 class BaseCostService(ABC):
     """Base class for cloud provider cost services"""
     
+    # Cost volatility factors (monthly variations); providers override these
+    VOLATILITY_FACTORS = {
+        'low': 0.05,    # 5% monthly variation
+        'medium': 0.10,  # 10% monthly variation  
+        'high': 0.20     # 20% monthly variation
+    }
+    
     def __init__(self, region: str = "us-east-1"):
         self.region = region
         self._pricing_cache = {}
         self._cache_ttl = 3600  # 1 hour cache
+        # Services may be shared between worker threads (batch mode); concurrent
+        # callers of the same request wait for the first download instead of repeating it
+        self._request_lock = threading.Lock()
+        self._inflight_requests = {}
     
     @abstractmethod
     def get_resource_price(self, resource_type: str, **kwargs) -> float:
@@ -34,13 +68,40 @@ class BaseCostService(ABC):
         self._pricing_cache[cache_key] = (time.time(), price)
     
     def _make_api_request(self, url: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Make API request, reusing cached responses for identical requests"""
+        cache_key = f"api_{url}?{sorted((params or {}).items())}"
+        cached_data = self._get_cached_price(cache_key)
+        if cached_data is not None:
+            return cached_data
+        
+        with self._request_lock:
+            request_lock = self._inflight_requests.setdefault(cache_key, threading.Lock())
+        try:
+            with request_lock:
+                cached_data = self._get_cached_price(cache_key)
+                if cached_data is not None:
+                    return cached_data
+                # Failed requests raise and are not cached
+                data = self._fetch_api_response(url, params)
+                self._cache_price(cache_key, data)
+                return data
+        finally:
+            # Later requests are served from the cache; threads already waiting
+            # keep their reference, so the entry is only needed while in flight
+            with self._request_lock:
+                if self._inflight_requests.get(cache_key) is request_lock:
+                    del self._inflight_requests[cache_key]
+    
+    def _fetch_api_response(self, url: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
         """Make API request with retry logic and error handling"""
+        import requests
+
         max_retries = 3
         retry_delay = 1
         
         for attempt in range(max_retries):
             try:
-                response = requests.get(url, params=params, timeout=30)
+                response = get_http_session().get(url, params=params, timeout=30)
                 response.raise_for_status()
                 return response.json()
             except requests.exceptions.RequestException as e:
@@ -51,57 +112,41 @@ class BaseCostService(ABC):
         
         raise Exception("Unexpected error in API request")
     
-    def estimate_uncertainty(self, base_cost: float, timeframe_months: float) -> Dict[str, float]:
+    @classmethod
+    def timeframe_volatility(cls, timeframe_months: float) -> float:
+        """Monthly cost volatility of this provider for a timeframe"""
+        if timeframe_months <= 1:
+            return cls.VOLATILITY_FACTORS['low']
+        elif timeframe_months <= 6:
+            return cls.VOLATILITY_FACTORS['medium']
+        else:
+            return cls.VOLATILITY_FACTORS['high']
+    
+    def estimate_uncertainty(self, base_cost: float, timeframe_months: float,
+                             n_simulations: Optional[int] = None, distribution: str = 'normal',
+                             seed: Optional[int] = None, method: str = 'auto',
+                             tolerance: Optional[float] = None, sampling: str = 'random',
+                             jobs: int = 1) -> Dict[str, float]:
         """
         Estimate cost uncertainty using Monte Carlo simulation
-        Returns confidence intervals for cost estimation
+        Returns confidence intervals for cost estimation. The method
+        ('auto', 'analytic' or 'simulation') and the simulation options are
+        those of uncertainty_model.summarize_groups, with the whole cost as
+        one group at this provider's volatility.
         """
-        import random
         import numpy as np
+        from .uncertainty_model import summarize_groups
         
         # Simulate cost variations based on historical patterns
         # This is a simplified model - in production you'd use more sophisticated data
-        
-        # Cost volatility factors (monthly variations)
-        volatility_factors = {
-            'low': 0.05,    # 5% monthly variation
-            'medium': 0.10,  # 10% monthly variation  
-            'high': 0.20     # 20% monthly variation
-        }
-        
-        # Determine volatility based on timeframe and cost
-        if timeframe_months <= 1:
-            volatility = volatility_factors['low']
-        elif timeframe_months <= 6:
-            volatility = volatility_factors['medium']
-        else:
-            volatility = volatility_factors['high']
-        
-        # Monte Carlo simulation
-        n_simulations = 1000
-        monthly_costs = []
-        
-        for _ in range(n_simulations):
-            monthly_cost = base_cost
-            for month in range(int(timeframe_months)):
-                # Add random variation each month
-                variation = random.gauss(0, volatility)
-                monthly_cost *= (1 + variation)
-            monthly_costs.append(monthly_cost)
-        
-        monthly_costs = np.array(monthly_costs)
-        
-        # Calculate confidence intervals
-        confidence_68 = np.percentile(monthly_costs, [16, 84])  # 68% confidence
-        confidence_95 = np.percentile(monthly_costs, [2.5, 97.5])  # 95% confidence
-        
+        volatility = self.timeframe_volatility(timeframe_months)
+        (summary,), details = summarize_groups(np.array([float(base_cost)]), np.array([volatility]), np.eye(1),
+                                               timeframe_months, [[0]], n_simulations, distribution, seed,
+                                               method, tolerance, sampling, jobs)
         return {
             'base_cost': base_cost,
             'timeframe_months': timeframe_months,
-            'confidence_68_lower': confidence_68[0],
-            'confidence_68_upper': confidence_68[1],
-            'confidence_95_lower': confidence_95[0],
-            'confidence_95_upper': confidence_95[1],
+            **summary,
             'volatility': volatility,
-            'std_deviation': np.std(monthly_costs)
+            **details
         }
@@ -0,0 +1,193 @@
+import glob
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+from .cost_engine import CostEngine
+from .terraform_file_parser import TerraformFileParser, PRICING_KINDS, PRICED_TYPE_PREFIXES
+from .parse_cache import ParseCache
+from .change_detection import git_changed_files, affected_workspaces
+from .defaults import DEFAULT_JOBS
+
+
+def resolve_workspaces(spec: str) -> List[str]:
+    """
+    Resolve --workspaces to root module directories. spec is either a file
+    listing one directory per line (relative to the file, '#' starts a
+    comment) or a glob such as 'envs/*' or 'stacks/**/prod'.
+    """
+    if os.path.isfile(spec):
+        base_dir = os.path.dirname(os.path.abspath(spec))
+        with open(spec, 'r', encoding='utf-8') as f:
+            entries = [line.split('#', 1)[0].strip() for line in f]
+        candidates = [os.path.join(base_dir, entry) for entry in entries if entry]
+        missing = [path for path in candidates if not os.path.isdir(path)]
+        for path in missing:
+            print(f"   ⚠️  Warning: Workspace not found: {path}")
+    else:
+        candidates = glob.glob(spec, recursive=True)
+
+    workspaces = []
+    seen = set()
+    for path in candidates:
+        path = os.path.abspath(path)
+        if os.path.isdir(path) and path not in seen:
+            seen.add(path)
+            workspaces.append(path)
+    if not workspaces:
+        raise Exception(f"No workspaces match {spec}")
+    return sorted(workspaces)
+
+
+def load_report(path: str) -> Optional[Dict[str, Any]]:
+    """Read a previous batch report; returns None when there is none"""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"   ⚠️  Warning: Could not read previous report {path}: {e}")
+        return None
+
+
+def save_report(report: Dict[str, Any], path: str):
+    try:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    except OSError as e:
+        print(f"   ⚠️  Warning: Could not write report {path}: {e}")
+
+
+class BatchEstimator:
+    """
+    Estimates many root modules in one process. All workspaces share the cost
+    services (so each price catalog is downloaded once) and a parse cache (so
+    local modules used by several workspaces are parsed once).
+    """
+
+    def __init__(self, discovery_options: Optional[Dict[str, Any]] = None,
+                 var_files: Optional[List[str]] = None, jobs: int = DEFAULT_JOBS,
+                 n_simulations: Optional[int] = None, seed: Optional[int] = None,
+                 uncertainty_method: str = 'auto', uncertainty_tolerance: Optional[float] = None,
+                 uncertainty_sampling: str = 'random'):
+        self.discovery_options = discovery_options or {}
+        self.var_files = [os.path.abspath(path) for path in (var_files or [])]
+        self.jobs = max(1, jobs)
+        # Simulations of the aggregate's uncertainty (simulated rather than closed-form
+        # when given), run on the same number of processes
+        self.n_simulations = n_simulations
+        self.seed = seed
+        # The same uncertainty options as a single-workspace plan
+        self.uncertainty_method = uncertainty_method
+        self.uncertainty_tolerance = uncertainty_tolerance
+        self.uncertainty_sampling = uncertainty_sampling
+        self.parse_cache = ParseCache()
+        self.engine = CostEngine()
+
+    def estimate_workspace(self, working_dir: str, months: float) -> Dict[str, Any]:
+        """Parse and price one workspace; errors are reported in the result"""
+        start = time.perf_counter()
+        # Reports name workspaces relative to the current directory so they stay valid across checkouts
+        result = {'workspace': os.path.relpath(working_dir)}
+        try:
+            parser = TerraformFileParser(working_dir, self.discovery_options, var_files=self.var_files,
+                                         parse_cache=self.parse_cache)
+            parse_result = parser.parse_terraform_files(show_progress=False, kinds=PRICING_KINDS,
+                                                        type_prefixes=PRICED_TYPE_PREFIXES)
+            costs = self.engine.price(parse_result['resources']).costs
+
+            summary = parse_result['summary']
+            monthly_cost = sum(costs.values())
+            result.update({
+                'status': 'ok',
+                'monthly_cost': monthly_cost,
+                'total_cost': monthly_cost * months,
+                'resources': summary['total_resources'],
+                'instances': summary['total_instances'],
+                'unresolved_counts': summary['unresolved_counts'],
+                'files': summary['files_count'],
+                'breakdown': costs
+            })
+        except Exception as e:
+            result.update({'status': 'error', 'error': str(e)})
+        result['elapsed'] = time.perf_counter() - start
+        return result
+
+    def reusable_results(self, workspaces: List[str], changed_since: str,
+                         previous_report: Optional[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Previous results of workspaces unaffected by the changes since a git ref.
+        A workspace is affected when a changed file lies in it or in a local
+        module it uses; every workspace is affected when a --var-file changed.
+        """
+        if not previous_report:
+            print("   ⚠️  Warning: No previous report to reuse, estimating every workspace")
+            return {}
+        changed_files = git_changed_files(changed_since)
+        if any(var_file in changed_files for var_file in self.var_files):
+            return {}
+        affected = affected_workspaces(workspaces, changed_files, self.discovery_options, self.parse_cache)
+        previous = {result['workspace']: result for result in previous_report.get('workspaces', [])
+                    if result.get('status') == 'ok'}
+        reusable = {}
+        for workspace in workspaces:
+            name = os.path.relpath(workspace)
+            if workspace not in affected and name in previous:
+                reusable[workspace] = previous[name]
+        return reusable
+
+    def _reuse_result(self, previous: Dict[str, Any], months: float) -> Dict[str, Any]:
+        result = dict(previous)
+        result.update({'total_cost': previous['monthly_cost'] * months, 'reused': True, 'elapsed': 0.0})
+        return result
+
+    def run(self, workspaces: List[str], months: float,
+            reuse: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """
+        Estimate every workspace on a thread pool; results keep the input order.
+        Workspaces in reuse take their previous result instead of being estimated.
+        """
+        start = time.perf_counter()
+        reuse = reuse or {}
+        to_estimate = [workspace for workspace in workspaces if workspace not in reuse]
+        if self.jobs == 1 or len(to_estimate) <= 1:
+            estimated = [self.estimate_workspace(workspace, months) for workspace in to_estimate]
+        else:
+            # Threads rather than processes: pricing is network bound and the caches are shared
+            with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+                estimated = list(executor.map(lambda workspace: self.estimate_workspace(workspace, months),
+                                              to_estimate))
+        estimated = dict(zip(to_estimate, estimated))
+        results = [estimated[workspace] if workspace in estimated else self._reuse_result(reuse[workspace], months)
+                   for workspace in workspaces]
+
+        succeeded = [result for result in results if result['status'] == 'ok']
+        monthly_cost = sum(result['monthly_cost'] for result in succeeded)
+        # Resource names repeat across workspaces, so qualify them with the workspace
+        costs = {f"{key}@{result['workspace']}": cost
+                 for result in succeeded for key, cost in result.get('breakdown', {}).items()}
+        uncertainty = self.engine.estimate_breakdown_uncertainty(costs, months, self.n_simulations,
+                                                                 method=self.uncertainty_method,
+                                                                 tolerance=self.uncertainty_tolerance,
+                                                                 sampling=self.uncertainty_sampling,
+                                                                 seed=self.seed, jobs=self.jobs)
+        return {
+            'timeframe_months': months,
+            'workspaces': results,
+            'aggregate': {
+                'workspaces_count': len(results),
+                'failed_count': len(results) - len(succeeded),
+                'estimated_count': len(estimated),
+                'reused_count': len(results) - len(estimated),
+                'monthly_cost': monthly_cost,
+                'total_cost': monthly_cost * months,
+                'resources': sum(result['resources'] for result in succeeded),
+                'instances': sum(result['instances'] for result in succeeded),
+                'uncertainty_analysis': uncertainty,
+                'parse_cache': self.parse_cache.get_stats(),
+                'jobs': self.jobs,
+                'elapsed': time.perf_counter() - start
+            }
+        }
@@ -0,0 +1,70 @@
+import os
+from typing import Dict, Any, Iterable, Optional, Set
+from .terraform_file_parser import TerraformFileParser
+from .workspace_discovery import WorkspaceDiscovery
+from .parse_cache import ParseCache
+from .git_tree import run_git
+
+
+def _is_within(path: str, directory: str) -> bool:
+    """Check whether path is directory itself or lies below it"""
+    return path == directory or path.startswith(directory.rstrip(os.sep) + os.sep)
+
+
+def git_changed_files(ref: str, cwd: str = '.') -> Set[str]:
+    """
+    Absolute paths of files that differ between ref and the working tree:
+    committed, staged and unstaged changes, deletions, renames (both sides)
+    and untracked files
+    """
+    root = run_git(['rev-parse', '--show-toplevel'], cwd).strip()
+    changed = set()
+    diff = run_git(['diff', '--name-only', '-z', '--no-renames', ref, '--'], root)
+    untracked = run_git(['ls-files', '-z', '--others', '--exclude-standard'], root)
+    for rel_path in (diff + untracked).split('\0'):
+        if rel_path:
+            changed.add(os.path.join(root, *rel_path.split('/')))
+    return changed
+
+
+def local_module_dirs(working_dir: str, discovery_options: Optional[Dict[str, Any]] = None,
+                      parse_cache: Optional[ParseCache] = None) -> Set[str]:
+    """
+    Every local module directory a workspace uses, following module sources
+    transitively. Sources resolve against the declaring module's directory,
+    as they do when modules are expanded for pricing.
+    """
+    root = os.path.abspath(working_dir)
+    found = set()
+    pending = [root]
+    while pending:
+        directory = pending.pop()
+        options = dict(discovery_options or {})
+        if directory != root:
+            # Module directories are discovered with the workspace's ignore files, as when pricing
+            options['ignore_root'] = root
+        parser = TerraformFileParser(directory, options, parse_cache=parse_cache)
+        for file_path in WorkspaceDiscovery(directory, **options).discover():
+            modules = parser.parse_file(file_path, kinds=('module',))['modules']
+            for module_info in modules.values():
+                source = module_info['source']
+                if not (source.startswith('./') or source.startswith('../')):
+                    continue
+                module_path = os.path.normpath(os.path.join(directory, source))
+                if module_path not in found and os.path.isdir(module_path):
+                    found.add(module_path)
+                    pending.append(module_path)
+    return found
+
+
+def affected_workspaces(workspaces: Iterable[str], changed_files: Set[str],
+                        discovery_options: Optional[Dict[str, Any]] = None,
+                        parse_cache: Optional[ParseCache] = None) -> Set[str]:
+    """Workspaces containing a changed file, directly or in a local module they use"""
+    affected = set()
+    for workspace in workspaces:
+        directories = [os.path.abspath(workspace)]
+        directories.extend(local_module_dirs(workspace, discovery_options, parse_cache))
+        if any(_is_within(path, directory) for path in changed_files for directory in directories):
+            affected.add(workspace)
+    return affected
@@ -1,10 +1,8 @@
 import json
 import sys
-from typing import Dict
-from .aws_cost_service import AwsCostService
-from .azure_cost_service import AzureCostService
-from .gcp_cost_service import GCPCostService
-from .terraform_file_parser import TerraformFileParser
+from typing import Dict, Any
+from .cost_engine import CostEngine
+from .terraform_file_parser import TerraformFileParser, PRICING_KINDS, PRICED_TYPE_PREFIXES
 from .progress_indicator import CostCalculationProgress
 
 import json
@@ -16,29 +14,21 @@ class CostGuard:
     """CI/CD guard for cost enforcement and warning"""
 
     @staticmethod
-    def enforce_budget(
+    def check_budget(
         total_cost: float,
         budget_limit: float,
         costs: Dict[str, float] = None,
-        previous_cost_file: str = "cost_report.json",
         warning_threshold: float = 0.75,
-        max_growth_rate: float = 0.50,
-    ):
+    ) -> Dict[str, Any]:
         """
-        Run multiple cost checks:
-        1. Global budget check
-        2. Warning threshold check
-        3. Per-resource sanity checks (e.g., no single resource > 50% of budget)
-        4. Growth check compared to previous run
+        The budget checks that need no previous run (global limit, warning
+        threshold, per-resource sanity). Nothing is raised or persisted.
         """
         messages = []
 
         # --- Hard Budget Limit ---
-        if total_cost > budget_limit:
-            raise Exception(
-                f"❌ Estimated cost (${total_cost:.2f}) exceeds budget limit (${budget_limit:.2f})"
-            )
-        else:
+        within_budget = total_cost <= budget_limit
+        if within_budget:
             messages.append(
                 f"✅ Total cost (${total_cost:.2f}) is within budget (${budget_limit:.2f})"
             )
@@ -58,6 +48,35 @@ class CostGuard:
                         f"which exceeds 50% of budget"
                     )
 
+        return {
+            'within_budget': within_budget,
+            'messages': messages
+        }
+
+    @staticmethod
+    def enforce_budget(
+        total_cost: float,
+        budget_limit: float,
+        costs: Dict[str, float] = None,
+        previous_cost_file: str = "cost_report.json",
+        warning_threshold: float = 0.75,
+        max_growth_rate: float = 0.50,
+    ):
+        """
+        Run multiple cost checks:
+        1. Global budget check
+        2. Warning threshold check
+        3. Per-resource sanity checks (e.g., no single resource > 50% of budget)
+        4. Growth check compared to previous run
+        """
+        # --- Hard Budget Limit ---
+        if total_cost > budget_limit:
+            raise Exception(
+                f"❌ Estimated cost (${total_cost:.2f}) exceeds budget limit (${budget_limit:.2f})"
+            )
+
+        messages = CostGuard.check_budget(total_cost, budget_limit, costs, warning_threshold)['messages']
+
         # --- Growth detection ---
         if os.path.exists(previous_cost_file):
             try:
@@ -87,7 +106,7 @@ class CostGuard:
         for msg in messages:
             print(msg)
 
-def run_pipeline_check(working_dir: str, budget_limit: float = 25.0):
+def run_pipeline_check(working_dir: str, budget_limit: float = 25.0, discovery_options: dict = None):
 
     progress = CostCalculationProgress()
     parser = None
@@ -97,8 +116,9 @@ def run_pipeline_check(working_dir: str, budget_limit: float = 25.0):
         
         # Step 1: Parse Terraform files
         progress.next_step()
-        parser = TerraformFileParser(working_dir)
-        parsed = parser.parse_terraform_files(show_progress=True)
+        parser = TerraformFileParser(working_dir, discovery_options)
+        parsed = parser.parse_terraform_files(show_progress=True, kinds=PRICING_KINDS,
+                                              type_prefixes=PRICED_TYPE_PREFIXES)
 
         if not parsed:
             print("❌ No AWS resources found in the specified directory")
@@ -114,37 +134,9 @@ def run_pipeline_check(working_dir: str, budget_limit: float = 25.0):
         # Step 4: Calculate cost estimates for all cloud providers
         progress.next_step()
         
-        all_costs = {}
-        total_monthly = 0.0
-        
-        # AWS costs
-        if resources.get('aws'):
-            aws_service = AwsCostService()
-            aws_costs = aws_service.build_costs(resources['aws'])
-            all_costs.update({f"aws.{k}": v for k, v in aws_costs.items()})
-            total_monthly += sum(aws_costs.values())
-        
-        # Azure costs
-        if resources.get('azure'):
-            azure_service = AzureCostService()
-            azure_costs = azure_service.build_costs(resources['azure'])
-            all_costs.update({f"azure.{k}": v for k, v in azure_costs.items()})
-            total_monthly += sum(azure_costs.values())
-        
-        # GCP costs
-        if resources.get('gcp'):
-            gcp_service = GCPCostService()
-            gcp_costs = gcp_service.build_costs(resources['gcp'])
-            all_costs.update({f"gcp.{k}": v for k, v in gcp_costs.items()})
-            total_monthly += sum(gcp_costs.values())
-        
-        # Other/unknown resources
-        if resources.get('other'):
-            # Estimate costs for unknown resources
-            other_costs = {f"other.{k}": 10.0 for k in resources['other'].keys()}
-            all_costs.update(other_costs)
-            total_monthly += sum(other_costs.values())
-        
+        costs = CostEngine().price(resources)
+        all_costs = costs.costs
+        total_monthly = costs.total_monthly
         
         progress.stop(True)
 
@@ -0,0 +1,125 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, Optional, Tuple
+from .aws_cost_service import AwsCostService
+from .azure_cost_service import AzureCostService
+from .gcp_cost_service import GCPCostService
+from .base_cost_service import BaseCostService
+
+PROVIDER_SERVICES = {
+    'aws': AwsCostService,
+    'azure': AzureCostService,
+    'gcp': GCPCostService
+}
+
+# Flat monthly estimate for resource types no provider service can price
+OTHER_RESOURCE_COST = 10.0
+
+# Called as (provider, state, provider total) with state 'started', 'done' or 'failed'
+ProviderProgress = Callable[[str, str, Optional[float]], None]
+
+
+class CostBreakdown:
+    """Monthly costs of one priced resource set, per provider"""
+
+    def __init__(self):
+        self.provider_costs: Dict[str, Dict[str, float]] = {}
+        self.resource_counts: Dict[str, int] = {}
+
+    @property
+    def costs(self) -> Dict[str, float]:
+        """Cost per resource keyed 'provider.type.name', providers in a fixed order"""
+        merged = {}
+        for provider, provider_costs in self.provider_costs.items():
+            merged.update({f"{provider}.{k}": v for k, v in provider_costs.items()})
+        return merged
+
+    @property
+    def provider_totals(self) -> Dict[str, float]:
+        return {provider: sum(provider_costs.values()) for provider, provider_costs in self.provider_costs.items()}
+
+    @property
+    def total_monthly(self) -> float:
+        return sum(self.provider_totals.values())
+
+
+class CostEngine:
+    """
+    Prices parsed resources with one long-lived service per provider and
+    region, so pricing caches are shared by every consumer (plan, budget,
+    suggest, watch, batch and diff). Callers price a resource set once and
+    hand the CostBreakdown on instead of pricing it again.
+    """
+
+    def __init__(self, regions: Optional[Dict[str, str]] = None):
+        # Default region per provider; services use their own default otherwise
+        self.regions = regions or {}
+        self._services: Dict[Tuple[str, Optional[str]], BaseCostService] = {}
+        self._services_lock = threading.Lock()
+
+    def service(self, provider: str, region: Optional[str] = None) -> BaseCostService:
+        """The shared cost service for a provider and region"""
+        region = region or self.regions.get(provider)
+        key = (provider, region)
+        with self._services_lock:
+            if key not in self._services:
+                service_class = PROVIDER_SERVICES[provider]
+                self._services[key] = service_class(region) if region else service_class()
+            return self._services[key]
+
+    def _price_provider(self, provider: str, provider_resources: Dict[str, Any],
+                        on_progress: Optional[ProviderProgress]) -> Dict[str, float]:
+        if on_progress:
+            on_progress(provider, 'started', None)
+        try:
+            provider_costs = self.service(provider).build_costs(provider_resources)
+        except Exception:
+            if on_progress:
+                on_progress(provider, 'failed', None)
+            raise
+        if on_progress:
+            on_progress(provider, 'done', sum(provider_costs.values()))
+        return provider_costs
+
+    def price(self, resources: Dict[str, Dict[str, Any]], on_progress: Optional[ProviderProgress] = None,
+              parallel: bool = True) -> CostBreakdown:
+        """
+        Price resources grouped as {provider: {resource_type: [records]}}.
+        Providers are priced concurrently (one slow price list download does
+        not hold up the others); results are merged in a fixed provider order.
+        """
+        breakdown = CostBreakdown()
+        providers = [provider for provider in PROVIDER_SERVICES if resources.get(provider)]
+        if parallel and len(providers) > 1:
+            with ThreadPoolExecutor(max_workers=len(providers)) as executor:
+                futures = {provider: executor.submit(self._price_provider, provider, resources[provider], on_progress)
+                           for provider in providers}
+                results = {provider: future.result() for provider, future in futures.items()}
+        else:
+            results = {provider: self._price_provider(provider, resources[provider], on_progress)
+                       for provider in providers}
+        for provider in providers:
+            breakdown.provider_costs[provider] = results[provider]
+            breakdown.resource_counts[provider] = len(resources[provider])
+        if resources.get('other'):
+            breakdown.provider_costs['other'] = {k: OTHER_RESOURCE_COST for k in resources['other'].keys()}
+            breakdown.resource_counts['other'] = len(resources['other'])
+        return breakdown
+
+    def estimate_breakdown_uncertainty(self, costs: Dict[str, float], timeframe_months: float,
+                                       n_simulations: Optional[int] = None, method: str = 'auto',
+                                       tolerance: Optional[float] = None, sampling: str = 'random',
+                                       seed: Optional[int] = None, jobs: int = 1) -> Dict[str, Any]:
+        """
+        Uncertainty of a resource breakdown (CostBreakdown.costs), with each
+        provider's resources simulated at that provider's volatility and
+        per-provider bands under 'providers'
+        """
+        from .uncertainty_model import estimate_breakdown_uncertainty
+        provider_volatility = {
+            provider: PROVIDER_SERVICES.get(provider, AwsCostService).timeframe_volatility(timeframe_months)
+            for provider in {key.split('.')[0] for key in costs}
+        }
+        return estimate_breakdown_uncertainty(costs, timeframe_months, provider_volatility, n_simulations,
+                                              seed=seed, method=method, tolerance=tolerance, sampling=sampling,
+                                              jobs=jobs)
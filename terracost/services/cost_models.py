@@ -0,0 +1,16 @@
+from typing import List
+from pydantic import BaseModel, Field
+
+# =====================
+# Pydantic Models
+# =====================
+
+class ResourceCost(BaseModel):
+    name: str
+    monthly_cost: float = Field(ge=0, description="Cost per month in USD")
+
+class CostEstimate(BaseModel):
+    timeframe_months: float
+    total_cost: float
+    breakdown: List[ResourceCost]
+    uncertainty_analysis: dict = None
@@ -0,0 +1,15 @@
+# CLI defaults, kept free of heavy imports so argument parsing stays fast
+import os
+
+# Workspaces estimated in parallel by plan --workspaces
+DEFAULT_JOBS = min(8, os.cpu_count() or 1)
+
+# Requests processed in parallel by serve and rpc
+DEFAULT_API_WORKERS = min(8, (os.cpu_count() or 1) + 2)
+
+# Address terracost serve listens on
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8787
+
+# Smallest simulation cap plan --uncertainty-tolerance accepts (four batches of 1024 paths)
+MIN_ADAPTIVE_SIMULATIONS = 4096
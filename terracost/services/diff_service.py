@@ -0,0 +1,201 @@
+import hashlib
+import json
+import os
+import posixpath
+import shutil
+import tempfile
+import time
+from typing import Dict, Any, List, Optional, Tuple
+from .cost_engine import CostEngine
+from .terraform_file_parser import TerraformFileParser, PRICING_KINDS, PRICED_TYPE_PREFIXES
+from .workspace_discovery import IGNORE_FILES
+from .resource_record import ResourceRecord
+from .git_tree import GitTree
+from .parse_cache import ParseCache
+
+# Files the parser reads from a revision
+TERRAFORM_SUFFIXES = ('.tf', '.tf.json', '.tfvars', '.tfvars.json')
+
+
+def _is_terraform_path(path: str) -> bool:
+    return path.endswith(TERRAFORM_SUFFIXES) or path.rsplit('/', 1)[-1] in IGNORE_FILES
+
+
+def resource_fingerprint(resource: ResourceRecord) -> str:
+    """Hash of everything pricing depends on: type, config and instance count"""
+    payload = json.dumps([resource.resource_type, resource.config, resource.count],
+                         sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class CostDiff:
+    """
+    Cost difference between two git revisions of a workspace. Resources are
+    matched by address and compared by config hash; unchanged resources are
+    priced once for both sides and only added, removed and changed ones are
+    priced per revision.
+
+    Only the workspace and the local modules it uses (transitively) are
+    exported from git. Both revisions are exported to the same directory,
+    the head one over the base one, and files share a parse cache: files
+    whose blob is the same in both revisions are neither rewritten nor
+    re-parsed, and their head records share the base records' configs.
+    """
+
+    def __init__(self, working_dir: str = '.', discovery_options: Optional[Dict[str, Any]] = None):
+        self.working_dir = os.path.abspath(working_dir)
+        self.discovery_options = discovery_options or {}
+        self.engine = CostEngine()
+        self.parse_cache = ParseCache()
+
+    def _export_revision(self, tree: GitTree, workspace: str, export_dir: str,
+                         exported: Dict[str, str]) -> Dict[str, str]:
+        """
+        Export the workspace's files and those of the local modules it uses to
+        export_dir, over the files `exported` (path -> blob id) already there.
+        Returns the revision's exported files.
+        """
+        available = dict(tree.list_files(_is_terraform_path))
+        selected: Dict[str, str] = {}
+        pending = [workspace]
+        visited = set()
+        while pending:
+            directory = pending.pop()
+            if directory in visited:
+                continue
+            visited.add(directory)
+            prefix = '' if directory == '.' else directory + '/'
+            files = {path: blob_id for path, blob_id in available.items() if path.startswith(prefix)}
+            changed = [(path, blob_id) for path, blob_id in files.items()
+                       if path not in selected and exported.get(path) != blob_id]
+            selected.update(files)
+            tree.write(export_dir, changed)
+            for path, _ in changed:
+                self.parse_cache.invalidate(os.path.join(export_dir, *path.split('/')))
+
+            # Local module sources resolve against the declaring module's directory,
+            # so a module nested in an exported directory is parsed again from its own
+            parser = TerraformFileParser(os.path.join(export_dir, *prefix.split('/')), self.discovery_options,
+                                         parse_cache=self.parse_cache)
+            for path in files:
+                if not path.endswith(('.tf', '.tf.json')):
+                    continue
+                modules = parser.parse_file(os.path.join(export_dir, *path.split('/')), kinds=('module',))['modules']
+                for module_info in modules.values():
+                    source = module_info['source']
+                    if source.startswith('./') or source.startswith('../'):
+                        module_dir = posixpath.normpath(posixpath.join(directory, source))
+                        if not module_dir.startswith('..'):
+                            pending.append(module_dir)
+
+        for path in set(exported) - set(selected):
+            file_path = os.path.join(export_dir, *path.split('/'))
+            self.parse_cache.invalidate(file_path)
+            try:
+                os.remove(file_path)
+            except OSError:
+                pass
+        return selected
+
+    def _parse_revision(self, ref: str, export_dir: str,
+                        exported: Dict[str, str]) -> Tuple[Dict[str, Tuple[str, ResourceRecord]], Dict[str, str]]:
+        """
+        Parse the workspace as of ref, exported over the files of the previous
+        revision; returns address -> (provider, record) and the exported files
+        """
+        tree = GitTree(ref, self.working_dir)
+        workspace = os.path.relpath(self.working_dir, tree.root)
+        if workspace.startswith('..'):
+            raise Exception(f"{self.working_dir} is not inside the git repository {tree.root}")
+        workspace = workspace.replace(os.sep, '/')
+        exported = self._export_revision(tree, workspace, export_dir, exported)
+        revision_dir = os.path.normpath(os.path.join(export_dir, workspace))
+        if not os.path.isdir(revision_dir):
+            return {}, exported
+        parser = TerraformFileParser(revision_dir, self.discovery_options, parse_cache=self.parse_cache)
+        try:
+            parse_result = parser.parse_terraform_files(show_progress=False, kinds=PRICING_KINDS,
+                                                        type_prefixes=PRICED_TYPE_PREFIXES)
+        except Exception as e:
+            if not parser.discovered_files:
+                # The workspace has no Terraform files in this revision
+                return {}, exported
+            raise e
+        resources = {}
+        for provider, provider_resources in parse_result['resources'].items():
+            if provider == 'other':
+                continue
+            for resource_list in provider_resources.values():
+                for resource in resource_list:
+                    resources[f"{provider}.{resource.key}"] = (provider, resource)
+        return resources, exported
+
+    def _price(self, resources: List[Tuple[str, ResourceRecord]]) -> Dict[str, float]:
+        """Price (provider, record) pairs; returns address -> monthly cost"""
+        grouped = {}
+        for provider, resource in resources:
+            grouped.setdefault(provider, {}).setdefault(resource.resource_type, []).append(resource)
+        return self.engine.price(grouped).costs
+
+    def compare(self, base_ref: str, head_ref: str = 'HEAD') -> Dict[str, Any]:
+        """Diff the costs of two revisions"""
+        start = time.perf_counter()
+        export_dir = tempfile.mkdtemp(prefix='terracost-diff-')
+        try:
+            base, exported = self._parse_revision(base_ref, export_dir, {})
+            head, _ = self._parse_revision(head_ref, export_dir, exported)
+            # Configs are read (and lazily parsed) before the export is removed;
+            # records from unchanged files share one config, hashed once
+            fingerprints = {}
+
+            def fingerprint(resource: ResourceRecord) -> str:
+                key = (id(resource.config), resource.resource_type, resource.count)
+                if key not in fingerprints:
+                    fingerprints[key] = resource_fingerprint(resource)
+                return fingerprints[key]
+
+            base_hashes = {address: fingerprint(resource) for address, (_, resource) in base.items()}
+            head_hashes = {address: fingerprint(resource) for address, (_, resource) in head.items()}
+        finally:
+            shutil.rmtree(export_dir, ignore_errors=True)
+        added = sorted(set(head) - set(base))
+        removed = sorted(set(base) - set(head))
+        common = set(base) & set(head)
+        changed = sorted(address for address in common if base_hashes[address] != head_hashes[address])
+        unchanged = sorted(common - set(changed))
+
+        unchanged_costs = self._price([head[address] for address in unchanged])
+        base_costs = self._price([base[address] for address in removed + changed])
+        head_costs = self._price([head[address] for address in added + changed])
+        base_costs.update(unchanged_costs)
+        head_costs.update(unchanged_costs)
+
+        resources = []
+        for status, addresses in (('added', added), ('removed', removed), ('changed', changed)):
+            for address in addresses:
+                old_cost = base_costs.get(address, 0.0)
+                new_cost = head_costs.get(address, 0.0)
+                resources.append({
+                    'resource': address,
+                    'status': status,
+                    'base_cost': old_cost,
+                    'head_cost': new_cost,
+                    'delta': new_cost - old_cost
+                })
+        resources.sort(key=lambda entry: (-abs(entry['delta']), entry['resource']))
+
+        base_total = sum(base_costs.values())
+        head_total = sum(head_costs.values())
+        return {
+            'base_ref': base_ref,
+            'head_ref': head_ref,
+            'resources': resources,
+            'base_monthly': base_total,
+            'head_monthly': head_total,
+            'delta_monthly': head_total - base_total,
+            'added_count': len(added),
+            'removed_count': len(removed),
+            'changed_count': len(changed),
+            'unchanged_count': len(unchanged),
+            'elapsed': time.perf_counter() - start
+        }
@@ -0,0 +1,713 @@
+import json
+import math
+import os
+import re
+from typing import Dict, Any, List, Optional, Iterator, Tuple, Iterable
+
+# Top-level attribute assignment at the start of a line: name = ...
+ATTRIBUTE_START_PATTERN = re.compile(r'[ \t]*([A-Za-z_][A-Za-z0-9_-]*)[ \t]*=(?![=>])')
+HEREDOC_PATTERN = re.compile(r'<<-?([A-Za-z_][A-Za-z0-9_]*)[ \t]*\n')
+
+TOKEN_PATTERN = re.compile(r'''
+    (?P<space>\s+|\#[^\n]*|//[^\n]*|/\*.*?\*/)
+  | (?P<number>\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)
+  | (?P<string>")
+  | (?P<ident>[A-Za-z_][A-Za-z0-9_-]*)
+  | (?P<op>==|!=|<=|>=|&&|\|\||=>|\.\.\.|[-+*/%<>!?:()\[\]{},.=])
+''', re.VERBOSE | re.DOTALL)
+
+STRING_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', '"': '"', '\\': '\\'}
+
+
+class UnresolvedExpression(Exception):
+    """Raised when an expression depends on something only known at apply time"""
+    pass
+
+
+def _skip_string(text: str, pos: int) -> int:
+    """Return the offset just past a string whose opening quote is at pos - 1"""
+    n = len(text)
+    while pos < n:
+        char = text[pos]
+        if char == '\\':
+            pos += 2
+            continue
+        if char == '"':
+            return pos + 1
+        if text.startswith('${', pos):
+            pos = _skip_nested(text, pos + 2, '}')
+            continue
+        pos += 1
+    return n
+
+
+def _skip_nested(text: str, pos: int, closing: str) -> int:
+    """Skip to just past the bracket that closes a group opened right before pos"""
+    n = len(text)
+    depth = 1
+    while pos < n:
+        char = text[pos]
+        if char == '"':
+            pos = _skip_string(text, pos + 1)
+            continue
+        if char in '([{':
+            depth += 1
+        elif char in ')]}':
+            depth -= 1
+            if depth == 0:
+                return pos + 1
+        pos += 1
+    return n
+
+
+def _expression_end(text: str, pos: int) -> int:
+    """
+    Find where an attribute value starting at pos ends: the first newline
+    outside brackets, strings and heredocs (or the end of the text)
+    """
+    n = len(text)
+    depth = 0
+    while pos < n:
+        char = text[pos]
+        if char == '\n' and depth == 0:
+            return pos
+        if char == '"':
+            pos = _skip_string(text, pos + 1)
+            continue
+        if char == '#' or text.startswith('//', pos):
+            newline = text.find('\n', pos)
+            pos = n if newline == -1 else newline
+            continue
+        if text.startswith('/*', pos):
+            close = text.find('*/', pos + 2)
+            pos = n if close == -1 else close + 2
+            continue
+        if text.startswith('<<', pos):
+            heredoc = HEREDOC_PATTERN.match(text, pos)
+            if heredoc:
+                marker = re.compile(rf'^[ \t]*{heredoc.group(1)}[ \t]*$', re.MULTILINE)
+                close = marker.search(text, heredoc.end())
+                pos = n if close is None else close.end()
+                continue
+        if char in '([{':
+            depth += 1
+        elif char in ')]}':
+            depth -= 1
+            if depth < 0:
+                return pos
+        pos += 1
+    return n
+
+
+def iter_attributes(body: str) -> Iterator[Tuple[str, str]]:
+    """
+    Yield (name, expression text) for each top-level attribute of a block body.
+    Nested blocks are skipped; multi-line lists, maps and heredocs are kept whole.
+    """
+    pos = 0
+    n = len(body)
+    while pos < n:
+        match = ATTRIBUTE_START_PATTERN.match(body, pos)
+        if match:
+            end = _expression_end(body, match.end())
+            yield match.group(1), body[match.end():end].strip()
+        else:
+            # Not an attribute: skip the line, including a whole nested block it opens
+            end = _expression_end(body, pos)
+        pos = end + 1
+
+
+# A JSON-syntax string that is a single interpolation, e.g. "${var.count}"
+JSON_INTERPOLATION_PATTERN = re.compile(r'^\$\{([^{}]*)\}$')
+
+
+def json_to_expression(value: Any) -> str:
+    """
+    Convert an attribute value from Terraform JSON syntax (*.tf.json) to the
+    native expression text iter_attributes would have produced for it.
+    JSON strings are templates, so "${var.n}" becomes the expression var.n.
+    """
+    if isinstance(value, str):
+        match = JSON_INTERPOLATION_PATTERN.match(value)
+        if match:
+            return match.group(1).strip()
+    return json.dumps(value)
+
+
+class _Parser:
+    """Recursive descent evaluator for the subset of HCL expressions we can resolve statically"""
+
+    def __init__(self, text: str, evaluator: 'ExpressionEvaluator'):
+        self.text = text
+        self.evaluator = evaluator
+        self.tokens = self._tokenize(text)
+        self.pos = 0
+
+    def _tokenize(self, text: str) -> List[Tuple[str, Any]]:
+        tokens = []
+        pos = 0
+        n = len(text)
+        while pos < n:
+            match = TOKEN_PATTERN.match(text, pos)
+            if match is None:
+                # Heredocs, template directives and other syntax we do not evaluate
+                raise UnresolvedExpression(f"Unsupported syntax at {text[pos:pos + 10]!r}")
+            kind = match.lastgroup
+            if kind == 'string':
+                end = _skip_string(text, match.end())
+                tokens.append(('string', text[match.end():end - 1]))
+                pos = end
+                continue
+            if kind == 'number':
+                value = match.group()
+                tokens.append(('number', float(value) if any(c in value for c in '.eE') else int(value)))
+            elif kind != 'space':
+                tokens.append((kind, match.group()))
+            pos = match.end()
+        tokens.append(('end', None))
+        return tokens
+
+    def _peek(self, offset: int = 0) -> Tuple[str, Any]:
+        return self.tokens[min(self.pos + offset, len(self.tokens) - 1)]
+
+    def _next(self) -> Tuple[str, Any]:
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def _accept(self, value: str) -> bool:
+        kind, token = self._peek()
+        if kind == 'op' and token == value:
+            self.pos += 1
+            return True
+        return False
+
+    def _expect(self, value: str):
+        if not self._accept(value):
+            raise UnresolvedExpression(f"Expected '{value}' in {self.text!r}")
+
+    def parse(self) -> Any:
+        value = self._ternary()
+        if self._peek()[0] != 'end':
+            raise UnresolvedExpression(f"Unexpected token {self._peek()[1]!r} in {self.text!r}")
+        return value
+
+    def _ternary(self) -> Any:
+        condition = self._or()
+        if self._accept('?'):
+            # Only the selected branch has to be resolvable
+            if _bool(condition):
+                value = self._ternary()
+                self._expect(':')
+                self._skip_expression()
+            else:
+                self._skip_expression()
+                self._expect(':')
+                value = self._ternary()
+            return value
+        return condition
+
+    def _skip_expression(self):
+        """Skip the tokens of an expression without evaluating it"""
+        depth = 0
+        pending_ternaries = 0
+        while True:
+            kind, token = self._peek()
+            if kind == 'end':
+                return
+            if depth == 0:
+                if kind == 'op' and token in (',', ')', ']', '}'):
+                    return
+                if kind == 'op' and token == ':':
+                    if pending_ternaries == 0:
+                        return
+                    pending_ternaries -= 1
+                elif kind == 'op' and token == '?':
+                    pending_ternaries += 1
+                elif kind != 'op' and self._peek(1) == ('op', '='):
+                    # The next `key = value` entry of an enclosing map
+                    return
+            if kind == 'op' and token in ('(', '[', '{'):
+                depth += 1
+            elif kind == 'op' and token in (')', ']', '}'):
+                depth -= 1
+            self.pos += 1
+
+    def _or(self) -> Any:
+        value = self._and()
+        while self._accept('||'):
+            right = self._and()
+            value = _bool(value) or _bool(right)
+        return value
+
+    def _and(self) -> Any:
+        value = self._equality()
+        while self._accept('&&'):
+            right = self._equality()
+            value = _bool(value) and _bool(right)
+        return value
+
+    def _equality(self) -> Any:
+        value = self._comparison()
+        while True:
+            if self._accept('=='):
+                value = value == self._comparison()
+            elif self._accept('!='):
+                value = value != self._comparison()
+            else:
+                return value
+
+    def _comparison(self) -> Any:
+        value = self._additive()
+        while True:
+            kind, token = self._peek()
+            if kind != 'op' or token not in ('<', '>', '<=', '>='):
+                return value
+            self.pos += 1
+            right = _number(self._additive())
+            left = _number(value)
+            value = {'<': left < right, '>': left > right, '<=': left <= right, '>=': left >= right}[token]
+
+    def _additive(self) -> Any:
+        value = self._multiplicative()
+        while True:
+            if self._accept('+'):
+                value = _normalize(_number(value) + _number(self._multiplicative()))
+            elif self._accept('-'):
+                value = _normalize(_number(value) - _number(self._multiplicative()))
+            else:
+                return value
+
+    def _multiplicative(self) -> Any:
+        value = self._unary()
+        while True:
+            if self._accept('*'):
+                value = _normalize(_number(value) * _number(self._unary()))
+            elif self._accept('/'):
+                divisor = _number(self._unary())
+                if divisor == 0:
+                    raise UnresolvedExpression("Division by zero")
+                value = _normalize(_number(value) / divisor)
+            elif self._accept('%'):
+                divisor = _number(self._unary())
+                if divisor == 0:
+                    raise UnresolvedExpression("Division by zero")
+                value = _normalize(_number(value) % divisor)
+            else:
+                return value
+
+    def _unary(self) -> Any:
+        if self._accept('-'):
+            return _normalize(-_number(self._unary()))
+        if self._accept('!'):
+            return not _bool(self._unary())
+        return self._postfix()
+
+    def _postfix(self) -> Any:
+        value = self._primary()
+        while True:
+            if self._accept('['):
+                index = self._ternary()
+                self._expect(']')
+                value = _index(value, index)
+            elif self._peek() == ('op', '.') and self._peek(1)[0] in ('ident', 'number'):
+                self.pos += 1
+                value = _index(value, self._next()[1])
+            else:
+                return value
+
+    def _primary(self) -> Any:
+        kind, token = self._next()
+        if kind == 'number':
+            return token
+        if kind == 'string':
+            return self._template(token)
+        if kind == 'ident':
+            if token == 'true':
+                return True
+            if token == 'false':
+                return False
+            if token == 'null':
+                return None
+            if self._peek() == ('op', '('):
+                self.pos += 1
+                return self._call(token)
+            if token in ('var', 'local') and self._peek() == ('op', '.') and self._peek(1)[0] == 'ident':
+                self.pos += 1
+                name = self._next()[1]
+                if token == 'var':
+                    return self.evaluator.variable(name)
+                return self.evaluator.local(name)
+            # Resource attributes, count.index, each.key, module outputs...
+            raise UnresolvedExpression(f"Cannot resolve reference '{token}'")
+        if kind == 'op':
+            if token == '(':
+                value = self._ternary()
+                self._expect(')')
+                return value
+            if token == '[':
+                return self._list()
+            if token == '{':
+                return self._map()
+        raise UnresolvedExpression(f"Unexpected token {token!r} in {self.text!r}")
+
+    def _template(self, raw: str) -> str:
+        """Unescape a string literal, evaluating ${...} interpolations"""
+        parts = []
+        pos = 0
+        n = len(raw)
+        while pos < n:
+            char = raw[pos]
+            if char == '\\' and pos + 1 < n:
+                parts.append(STRING_ESCAPES.get(raw[pos + 1], raw[pos + 1]))
+                pos += 2
+            elif raw.startswith('${', pos):
+                end = _skip_nested(raw, pos + 2, '}')
+                value = self.evaluator.evaluate_strict(raw[pos + 2:end - 1])
+                if isinstance(value, (list, dict)):
+                    raise UnresolvedExpression("Cannot interpolate a collection")
+                parts.append(_to_string(value))
+                pos = end
+            elif raw.startswith('%{', pos):
+                raise UnresolvedExpression("Template directives are not supported")
+            else:
+                parts.append(char)
+                pos += 1
+        return ''.join(parts)
+
+    def _list(self) -> List[Any]:
+        items = []
+        if self._peek() == ('ident', 'for'):
+            raise UnresolvedExpression("for expressions are not supported")
+        while not self._accept(']'):
+            items.append(self._ternary())
+            if not self._accept(','):
+                self._expect(']')
+                break
+        return items
+
+    def _map(self) -> Dict[str, Any]:
+        result = {}
+        if self._peek() == ('ident', 'for'):
+            raise UnresolvedExpression("for expressions are not supported")
+        while not self._accept('}'):
+            kind, token = self._peek()
+            if kind in ('ident', 'string', 'number'):
+                self.pos += 1
+                key = self._template(token) if kind == 'string' else str(token)
+            elif self._accept('('):
+                key = _to_string(self._ternary())
+                self._expect(')')
+            else:
+                raise UnresolvedExpression(f"Invalid map key {token!r}")
+            if not (self._accept('=') or self._accept(':')):
+                raise UnresolvedExpression(f"Expected '=' after map key {key!r}")
+            result[key] = self._ternary()
+            self._accept(',')
+        return result
+
+    def _call(self, name: str) -> Any:
+        args = []
+        while not self._accept(')'):
+            if name == 'try':
+                args.append(self._try_argument())
+            else:
+                args.append(self._ternary())
+            if self._accept('...'):
+                args.extend(_sequence(args.pop()))
+            if not self._accept(','):
+                self._expect(')')
+                break
+        if name == 'try':
+            for arg in args:
+                if arg is not _UNRESOLVED:
+                    return arg
+            raise UnresolvedExpression("No try() argument could be resolved")
+        function = FUNCTIONS.get(name)
+        if function is None:
+            raise UnresolvedExpression(f"Unsupported function {name}()")
+        try:
+            return function(*args)
+        except (TypeError, ValueError, KeyError, IndexError) as e:
+            raise UnresolvedExpression(f"{name}() failed: {e}")
+
+    def _try_argument(self) -> Any:
+        """Evaluate a try() argument, skipping past it when it cannot be resolved"""
+        start = self.pos
+        try:
+            return self._ternary()
+        except UnresolvedExpression:
+            self.pos = start
+            self._skip_expression()
+            return _UNRESOLVED
+
+
+_UNRESOLVED = object()
+
+
+def _number(value: Any):
+    if isinstance(value, bool):
+        raise UnresolvedExpression("Expected a number, got a bool")
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        try:
+            return _normalize(float(value))
+        except ValueError:
+            pass
+    raise UnresolvedExpression(f"Expected a number, got {value!r}")
+
+
+def _bool(value: Any) -> bool:
+    """Convert a condition as Terraform does: only bools and the strings "true"/"false" qualify"""
+    if isinstance(value, bool):
+        return value
+    if value in ('true', 'false'):
+        return value == 'true'
+    raise UnresolvedExpression(f"Expected a bool, got {value!r}")
+
+
+def _normalize(value):
+    """Keep integral numbers as ints so counts come out as ints"""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _to_string(value: Any) -> str:
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return str(value)
+
+
+def _index(value: Any, key: Any) -> Any:
+    try:
+        if isinstance(value, dict):
+            return value[_to_string(key)]
+        if isinstance(value, list):
+            return value[int(_number(key))]
+    except (KeyError, IndexError):
+        pass
+    raise UnresolvedExpression(f"Cannot index {type(value).__name__} with {key!r}")
+
+
+def _sequence(value: Any) -> List[Any]:
+    if isinstance(value, list):
+        return value
+    if isinstance(value, dict):
+        return list(value.values())
+    raise UnresolvedExpression(f"Expected a list, got {value!r}")
+
+
+def _distinct(items: Iterable[Any]) -> List[Any]:
+    result = []
+    for item in items:
+        if item not in result:
+            result.append(item)
+    return result
+
+
+def _range(*args):
+    numbers = [_number(arg) for arg in args]
+    if len(numbers) == 1:
+        return list(range(int(numbers[0])))
+    return list(range(*(int(n) for n in numbers)))
+
+
+def _flatten(items: List[Any]) -> List[Any]:
+    result = []
+    for item in _sequence(items):
+        if isinstance(item, list):
+            result.extend(_flatten(item))
+        else:
+            result.append(item)
+    return result
+
+
+def _merge(*maps):
+    result = {}
+    for value in maps:
+        if not isinstance(value, dict):
+            raise UnresolvedExpression("merge() expects maps")
+        result.update(value)
+    return result
+
+
+def _lookup(mapping, key, *default):
+    if isinstance(mapping, dict) and _to_string(key) in mapping:
+        return mapping[_to_string(key)]
+    if default:
+        return default[0]
+    raise UnresolvedExpression(f"lookup() key {key!r} not found")
+
+
+def _coalesce(*args):
+    for arg in args:
+        if arg is not None and arg != '':
+            return arg
+    raise UnresolvedExpression("coalesce() got no non-null arguments")
+
+
+def _length(value):
+    if isinstance(value, (list, dict, str)):
+        return len(value)
+    raise UnresolvedExpression(f"length() of {value!r}")
+
+
+FUNCTIONS = {
+    'length': _length,
+    'toset': lambda items: _distinct(_sequence(items)),
+    'tolist': _sequence,
+    'tomap': lambda value: dict(value),
+    'keys': lambda value: sorted(value.keys()),
+    'values': lambda value: [value[k] for k in sorted(value.keys())],
+    'distinct': _distinct,
+    'concat': lambda *lists: [item for lst in lists for item in _sequence(lst)],
+    'flatten': _flatten,
+    'merge': _merge,
+    'lookup': _lookup,
+    'element': lambda items, index: _sequence(items)[int(_number(index)) % len(_sequence(items))],
+    'contains': lambda items, value: value in _sequence(items),
+    'range': _range,
+    'coalesce': _coalesce,
+    'max': lambda *args: _normalize(max(_number(a) for a in args)),
+    'min': lambda *args: _normalize(min(_number(a) for a in args)),
+    'ceil': lambda value: int(math.ceil(_number(value))),
+    'floor': lambda value: int(math.floor(_number(value))),
+    'abs': lambda value: abs(_number(value)),
+    'tonumber': _number,
+    'tostring': _to_string,
+    'tobool': _bool,
+}
+
+
+class ExpressionEvaluator:
+    """
+    Statically evaluates Terraform expressions against variable values and
+    locals: var.* and local.* references, literal lists and maps, arithmetic,
+    comparisons, conditionals and common functions. Results are memoized per
+    expression, so each distinct expression in a workspace is evaluated once.
+    """
+
+    def __init__(self, variables: Optional[Dict[str, Any]] = None, locals: Optional[Dict[str, str]] = None):
+        self.variables = variables or {}
+        self.locals = locals or {}
+        self._cache: Dict[str, Any] = {}
+        self._local_values: Dict[str, Any] = {}
+        self._resolving = set()
+
+    def variable(self, name: str) -> Any:
+        if name not in self.variables:
+            raise UnresolvedExpression(f"Variable '{name}' has no value")
+        return self.variables[name]
+
+    def local(self, name: str) -> Any:
+        if name in self._local_values:
+            value = self._local_values[name]
+        else:
+            if name not in self.locals or name in self._resolving:
+                raise UnresolvedExpression(f"Local '{name}' is undefined or circular")
+            self._resolving.add(name)
+            try:
+                value = self.evaluate(self.locals[name])
+            finally:
+                self._resolving.discard(name)
+            self._local_values[name] = value
+        if value is _UNRESOLVED:
+            raise UnresolvedExpression(f"Local '{name}' cannot be resolved")
+        return value
+
+    def evaluate_strict(self, expression: str) -> Any:
+        """Evaluate an expression, raising UnresolvedExpression when it cannot be resolved"""
+        value = self.evaluate(expression)
+        if value is _UNRESOLVED:
+            raise UnresolvedExpression(f"Cannot resolve {expression!r}")
+        return value
+
+    def evaluate(self, expression: str) -> Any:
+        """Evaluate an expression, returning UNRESOLVED when it cannot be resolved statically"""
+        expression = expression.strip()
+        if expression in self._cache:
+            return self._cache[expression]
+        try:
+            value = _Parser(expression, self).parse()
+        except UnresolvedExpression:
+            value = _UNRESOLVED
+        except RecursionError:
+            value = _UNRESOLVED
+        self._cache[expression] = value
+        return value
+
+    def resolve(self, expression: str, default: Any = None) -> Any:
+        """Evaluate an expression, falling back to default when it cannot be resolved"""
+        value = self.evaluate(expression)
+        return default if value is _UNRESOLVED else value
+
+    def instance_count(self, count_expression: Optional[str] = None,
+                       for_each_expression: Optional[str] = None) -> Optional[int]:
+        """
+        Number of instances a count or for_each meta-argument creates,
+        or None when it depends on values only known at apply time
+        """
+        if count_expression is not None:
+            value = self.evaluate(count_expression)
+            if value is _UNRESOLVED or isinstance(value, bool):
+                return None
+            try:
+                return max(0, int(_number(value)))
+            except UnresolvedExpression:
+                return None
+        if for_each_expression is not None:
+            value = self.evaluate(for_each_expression)
+            if isinstance(value, (list, dict)):
+                return len(value)
+            return None
+        return 1
+
+
+UNRESOLVED = _UNRESOLVED
+
+# Files Terraform loads automatically, in precedence order (later wins)
+AUTO_TFVARS = ('terraform.tfvars', 'terraform.tfvars.json')
+
+
+def parse_tfvars(file_path: str) -> Dict[str, Any]:
+    """Read variable values from a .tfvars or .tfvars.json file"""
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+    except (OSError, UnicodeDecodeError) as e:
+        print(f"   ⚠️  Warning: Could not read {file_path}: {e}")
+        return {}
+
+    if file_path.endswith('.json'):
+        try:
+            values = json.loads(content)
+        except ValueError as e:
+            print(f"   ⚠️  Warning: Could not parse {file_path}: {e}")
+            return {}
+        return values if isinstance(values, dict) else {}
+
+    # Variable files may only contain literal values
+    literal = ExpressionEvaluator()
+    values = {}
+    for name, expression in iter_attributes(content):
+        value = literal.evaluate(expression)
+        if value is not UNRESOLVED:
+            values[name] = value
+    return values
+
+
+def find_tfvars_files(working_dir: str) -> List[str]:
+    """Variable files Terraform loads automatically: terraform.tfvars(.json), then *.auto.tfvars(.json)"""
+    files = [os.path.join(working_dir, name) for name in AUTO_TFVARS
+             if os.path.isfile(os.path.join(working_dir, name))]
+    try:
+        auto_files = sorted(name for name in os.listdir(working_dir)
+                            if name.endswith(('.auto.tfvars', '.auto.tfvars.json')))
+    except OSError:
+        auto_files = []
+    files.extend(os.path.join(working_dir, name) for name in auto_files)
+    return files
@@ -0,0 +1,177 @@
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+# inotify event masks (see <sys/inotify.h>)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+
+EVENT_HEADER = struct.Struct('iIII')
+
+# Editors write a file in several steps; events closer together than this are batched
+DEFAULT_DEBOUNCE = 0.05
+DEFAULT_POLL_INTERVAL = 0.5
+
+
+class InotifyWatcher:
+    """Watches directories for file changes with Linux inotify (through ctypes)"""
+
+    method = 'inotify'
+
+    def __init__(self, directories: Iterable[str], debounce: float = DEFAULT_DEBOUNCE):
+        libc_name = ctypes.util.find_library('c') or 'libc.so.6'
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()))
+        self.debounce = debounce
+        self._watches: Dict[int, str] = {}
+        self._directories: Dict[str, int] = {}
+        self.overflowed = False
+        self.watch_directories(directories)
+
+    def watch_directories(self, directories: Iterable[str]):
+        """Start watching additional directories (already watched ones are ignored)"""
+        for directory in directories:
+            directory = os.path.abspath(directory)
+            if directory in self._directories:
+                continue
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+            if wd < 0:
+                error = ctypes.get_errno()
+                if error != errno.ENOENT:
+                    print(f"   ⚠️  Warning: Could not watch {directory}: {os.strerror(error)}")
+                continue
+            self._watches[wd] = directory
+            self._directories[directory] = wd
+
+    def _read_events(self) -> Set[str]:
+        changed = set()
+        while True:
+            try:
+                data = os.read(self._fd, 65536)
+            except BlockingIOError:
+                return changed
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b'\0')
+                offset += length
+
+                if mask & IN_Q_OVERFLOW:
+                    # Events were dropped; the caller has to rescan everything
+                    self.overflowed = True
+                    continue
+                directory = self._watches.get(wd)
+                if directory is None:
+                    continue
+                if mask & (IN_IGNORED | IN_DELETE_SELF):
+                    del self._directories[self._watches.pop(wd)]
+                    continue
+                path = os.path.join(directory, os.fsdecode(name)) if name else directory
+                if mask & IN_ISDIR:
+                    if mask & (IN_CREATE | IN_MOVED_TO):
+                        self.watch_directories([path])
+                    # Files inside a moved or created directory are picked up by rediscovery
+                changed.add(path)
+
+    def poll(self, timeout: Optional[float] = None) -> Set[str]:
+        """
+        Block until files change (or timeout expires) and return the changed paths.
+        Bursts of events are collected until the directory goes quiet for `debounce`.
+        """
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        changed = self._read_events()
+        while True:
+            ready, _, _ = select.select([self._fd], [], [], self.debounce)
+            if not ready:
+                return changed
+            changed |= self._read_events()
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class PollingWatcher:
+    """
+    Portable fallback that compares modification times at a fixed interval.
+    Directories are compared too: creating, deleting or renaming a file
+    changes its directory's mtime, so the directory is reported and the
+    caller rediscovers the files.
+    """
+
+    method = 'polling'
+
+    def __init__(self, directories: Iterable[str], list_files: Callable[[], List[str]],
+                 interval: float = DEFAULT_POLL_INTERVAL):
+        self._list_files = list_files
+        self._directories: Set[str] = set()
+        self.interval = interval
+        self.overflowed = False
+        self.watch_directories(directories)
+        self._snapshot = self._take_snapshot()
+
+    def watch_directories(self, directories: Iterable[str]):
+        """Start comparing additional directories (removed ones drop out of the snapshot)"""
+        self._directories.update(os.path.abspath(directory) for directory in directories)
+
+    def _take_snapshot(self) -> Dict[str, Tuple[int, int]]:
+        snapshot = {}
+        for path in list(self._list_files()) + sorted(self._directories):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def poll(self, timeout: Optional[float] = None) -> Set[str]:
+        """Sleep for one interval (bounded by timeout) and return files that changed"""
+        time.sleep(self.interval if timeout is None else min(self.interval, timeout))
+        snapshot = self._take_snapshot()
+        previous = self._snapshot
+        self._snapshot = snapshot
+        changed = {path for path, stamp in snapshot.items() if previous.get(path) != stamp}
+        changed.update(path for path in previous if path not in snapshot)
+        return changed
+
+    def close(self):
+        pass
+
+
+def create_watcher(directories: Iterable[str], list_files: Callable[[], List[str]],
+                   use_polling: bool = False, poll_interval: float = DEFAULT_POLL_INTERVAL):
+    """
+    Create an inotify watcher on Linux, falling back to polling when inotify
+    is unavailable (other platforms, exhausted watch limits, no libc).
+    """
+    directories = list(directories)
+    if not use_polling and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(directories)
+        except (OSError, AttributeError) as e:
+            print(f"   ⚠️  Warning: inotify unavailable ({e}), falling back to polling")
+    return PollingWatcher(directories, list_files, poll_interval)
@@ -1,4 +1,3 @@
-import requests
 from .base_cost_service import BaseCostService
 from typing import Dict, Any, Optional, List
 
@@ -10,6 +9,13 @@ class GCPCostService(BaseCostService):
     
     BASE_URL = "https://cloudbilling.googleapis.com/v1"
     COMPUTE_ENGINE_API = "https://compute.googleapis.com/compute/v1"
+
+    # GCP pricing is generally very predictable
+    VOLATILITY_FACTORS = {
+        'low': 0.02,     # 2% monthly variation (very low)
+        'medium': 0.04,  # 4% monthly variation
+        'high': 0.08     # 8% monthly variation
+    }
     
     def __init__(self, region: str = "us-central1"):
         super().__init__(region)
@@ -341,14 +347,14 @@ class GCPCostService(BaseCostService):
                 continue
                 
             for resource in resource_list:
-                resource_name = resource.get('name', 'unknown')
-                resource_config = resource.get('config', {})
+                resource_name = resource.name
+                resource_config = resource.config
                 
                 # Generate unique key
                 key = f"{resource_type}.{resource_name}"
                 
                 # Calculate cost using real-time API
-                cost = self._calculate_resource_cost(resource_type, resource_config)
+                cost = self._calculate_resource_cost(resource_type, resource_config) * resource.count
                 
                 if cost > 0:
                     costs[key] = cost
@@ -388,18 +394,3 @@ class GCPCostService(BaseCostService):
     def get_region_name(self) -> str:
         """Get human-readable region name"""
         return self.region_name_map.get(self.region, self.region)
-
-    def estimate_uncertainty(self, base_cost: float, timeframe_months: float) -> Dict[str, float]:
-        """
-        Estimate cost uncertainty for GCP resources
-        GCP pricing tends to be very stable
-        """
-        # GCP pricing is generally very predictable
-        volatility_factors = {
-            'low': 0.02,     # 2% monthly variation (very low)
-            'medium': 0.04,  # 4% monthly variation
-            'high': 0.08     # 8% monthly variation
-        }
-        
-        # Use the same uncertainty calculation as base class
-        return super().estimate_uncertainty(base_cost, timeframe_months)
@@ -0,0 +1,85 @@
+import os
+import subprocess
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+def run_git(args: List[str], cwd: str) -> str:
+    """Run a git command and return its output; raises when git fails"""
+    try:
+        result = subprocess.run(['git'] + args, cwd=cwd, capture_output=True, timeout=60)
+    except (OSError, subprocess.SubprocessError) as e:
+        raise Exception(f"git {args[0]} failed: {e}")
+    if result.returncode != 0:
+        raise Exception(f"git {args[0]} failed: {result.stderr.decode('utf-8', errors='replace').strip()}")
+    return result.stdout.decode('utf-8', errors='replace')
+
+
+class GitTree:
+    """
+    Read-only view of the files of a git revision, read from git objects
+    (ls-tree and a single cat-file --batch process) without a checkout
+    """
+
+    def __init__(self, ref: str, cwd: str = '.'):
+        self.root = run_git(['rev-parse', '--show-toplevel'], cwd).strip()
+        self.ref = ref
+        self.commit = run_git(['rev-parse', '--verify', f"{ref}^{{commit}}"], self.root).strip()
+
+    def list_files(self, accept: Optional[Callable[[str], bool]] = None) -> List[Tuple[str, str]]:
+        """(repository-relative path, blob id) of regular files, optionally filtered by path"""
+        output = run_git(['ls-tree', '-r', '-z', '--full-tree', self.commit], self.root)
+        files = []
+        for entry in output.split('\0'):
+            if not entry:
+                continue
+            info, path = entry.split('\t', 1)
+            mode, object_type, blob_id = info.split()
+            # Symlinks and submodules are not followed
+            if object_type != 'blob' or mode == '120000':
+                continue
+            if accept is None or accept(path):
+                files.append((path, blob_id))
+        return files
+
+    def read_blobs(self, blob_ids: List[str]) -> Dict[str, bytes]:
+        """Read blob contents through one git cat-file --batch process"""
+        contents = {}
+        pending = list(dict.fromkeys(blob_ids))
+        if not pending:
+            return contents
+        process = subprocess.Popen(['git', 'cat-file', '--batch'], cwd=self.root,
+                                   stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        try:
+            for blob_id in pending:
+                process.stdin.write(blob_id.encode('ascii') + b'\n')
+                process.stdin.flush()
+                header = process.stdout.readline().split()
+                if len(header) != 3:
+                    raise Exception(f"git cat-file could not read {blob_id}")
+                size = int(header[2])
+                contents[blob_id] = process.stdout.read(size)
+                process.stdout.read(1)  # trailing newline
+        finally:
+            process.stdin.close()
+            process.stdout.close()
+            process.wait()
+        return contents
+
+    def write(self, destination: str, files: List[Tuple[str, str]]):
+        """Write (repository-relative path, blob id) files below destination"""
+        contents = self.read_blobs([blob_id for _, blob_id in files])
+        for path, blob_id in files:
+            target = os.path.join(destination, *path.split('/'))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, 'wb') as f:
+                f.write(contents[blob_id])
+
+    def export(self, destination: str, accept: Optional[Callable[[str], bool]] = None) -> int:
+        """
+        Write the accepted files of the revision below destination (only what
+        the parser reads; the working tree and index are left alone).
+        Returns the number of files written.
+        """
+        files = self.list_files(accept)
+        self.write(destination, files)
+        return len(files)
@@ -0,0 +1,80 @@
+import json
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Tuple
+from .api_service import CostApi, ApiError
+from .defaults import DEFAULT_HOST, DEFAULT_PORT
+
+# Request bodies larger than this are rejected (inline HCL is the largest payload)
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+# POST endpoints and the API method each one calls
+ROUTES = {
+    '/estimate': 'estimate',
+    '/estimate/hcl': 'estimate_hcl',
+    '/budget': 'budget',
+    '/invalidate': 'invalidate'
+}
+
+
+class _ApiRequestHandler(BaseHTTPRequestHandler):
+    """JSON over HTTP in front of a shared CostApi"""
+
+    server_version = 'TerraCost'
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        if self.path == '/stats':
+            self._respond(200, self.server.api.get_stats())
+        elif self.path == '/health':
+            self._respond(200, {'status': 'ok'})
+        else:
+            self._respond(404, {'error': f"Unknown endpoint: {self.path}"})
+
+    def do_POST(self):
+        method = ROUTES.get(self.path)
+        if method is None:
+            self._respond(404, {'error': f"Unknown endpoint: {self.path}"})
+            return
+        try:
+            params = self._read_json()
+            self._respond(200, self.server.api.handle(method, params))
+        except ApiError as e:
+            self._respond(e.status, {'error': str(e)})
+        except Exception as e:
+            self._respond(500, {'error': str(e)})
+
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_BODY_BYTES:
+            raise ApiError("Request body too large", 413)
+        body = self.rfile.read(length) if length else b''
+        if not body.strip():
+            return {}
+        try:
+            return json.loads(body)
+        except ValueError as e:
+            raise ApiError(f"Invalid JSON: {e}")
+
+    def _respond(self, status: int, payload: Dict[str, Any]):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            sys.stderr.write(f"   {self.address_string()} {format % args}\n")
+
+
+class ApiServer(ThreadingHTTPServer):
+    """HTTP server whose connection threads hand the work to the CostApi worker pool"""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], api: CostApi, verbose: bool = False):
+        super().__init__(address, _ApiRequestHandler)
+        self.api = api
+        self.verbose = verbose
@@ -0,0 +1,179 @@
+import json
+import re
+import sys
+from contextlib import contextmanager
+from typing import Any, Iterator, TextIO
+
+WHITESPACE_PATTERN = re.compile(r'[ \t\n\r]*')
+# Characters that matter when skipping over a container without decoding it
+STRUCTURE_PATTERN = re.compile(r'["{}\[\]]')
+# Remainder of a string after its opening quote, up to the closing quote
+STRING_REST_PATTERN = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+
+
+class JsonStreamError(ValueError):
+    """Raised when the streamed document is not valid JSON"""
+    pass
+
+
+@contextmanager
+def open_json_source(path: str) -> Iterator[TextIO]:
+    """Open a JSON file for streaming; '-' reads from stdin"""
+    if path == '-':
+        yield sys.stdin
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        yield f
+
+
+class JsonStream:
+    """
+    Pull-style incremental JSON reader.
+
+    Only the values a caller asks for are decoded; everything else is skipped
+    by scanning for structural characters, so memory stays bounded by the
+    read chunk plus the largest value actually decoded. Every key yielded by
+    iter_object and every item yielded by iter_array must be consumed with
+    read_value, skip_value, iter_object or iter_array before continuing.
+    """
+
+    def __init__(self, fp: TextIO, chunk_size: int = 1 << 20):
+        self._fp = fp
+        self._chunk_size = chunk_size
+        self._buf = ''
+        self._pos = 0
+        self._eof = False
+        self._consumed = 0
+        self._decoder = json.JSONDecoder()
+
+    @property
+    def offset(self) -> int:
+        """Character offset of the reader in the whole document"""
+        return self._consumed + self._pos
+
+    def _fill(self, size: int = None) -> bool:
+        """Drop consumed input and read another chunk; returns False at end of input"""
+        if self._eof:
+            return False
+        chunk = self._fp.read(size or self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._consumed += self._pos
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _peek(self) -> str:
+        """Return the next non-whitespace character without consuming it ('' at end of input)"""
+        while True:
+            self._pos = WHITESPACE_PATTERN.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ''
+
+    def _expect(self, char: str):
+        found = self._peek()
+        if found != char:
+            raise JsonStreamError(f"Expected '{char}' but found '{found or 'end of input'}' at offset {self.offset}")
+        self._pos += 1
+
+    def read_value(self) -> Any:
+        """Decode and return the next value"""
+        first = self._peek()
+        if not first:
+            raise JsonStreamError("Unexpected end of JSON input")
+        read_size = self._chunk_size
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError as e:
+                # Most likely the value continues in the next chunk
+                if not self._fill(read_size):
+                    raise JsonStreamError(f"Invalid JSON at offset {self.offset}: {e.msg}")
+                read_size *= 2
+                continue
+            # A number at the very end of the buffer may continue in the next chunk
+            if end == len(self._buf) and first not in '{["' and self._fill(read_size):
+                continue
+            self._pos = end
+            return value
+
+    def _skip_string(self):
+        """Skip a string whose opening quote has already been consumed"""
+        while True:
+            match = STRING_REST_PATTERN.match(self._buf, self._pos)
+            if match:
+                self._pos = match.end()
+                return
+            if not self._fill():
+                raise JsonStreamError("Unterminated string at end of JSON input")
+
+    def skip_value(self):
+        """Skip the next value without building it"""
+        first = self._peek()
+        if first == '"':
+            self._pos += 1
+            self._skip_string()
+            return
+        if first not in ('{', '['):
+            self.read_value()
+            return
+
+        depth = 0
+        while True:
+            match = STRUCTURE_PATTERN.search(self._buf, self._pos)
+            if match is None:
+                self._pos = len(self._buf)
+                if not self._fill():
+                    raise JsonStreamError("Unexpected end of JSON input")
+                continue
+            self._pos = match.end()
+            char = match.group()
+            if char == '"':
+                self._skip_string()
+            elif char in '{[':
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return
+
+    def iter_object(self) -> Iterator[str]:
+        """Iterate over the keys of the next object"""
+        self._expect('{')
+        if self._peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            if self._peek() != '"':
+                raise JsonStreamError(f"Expected object key at offset {self.offset}")
+            key = self.read_value()
+            self._expect(':')
+            yield key
+            char = self._peek()
+            self._pos += 1
+            if char == ',':
+                continue
+            if char == '}':
+                return
+            raise JsonStreamError(f"Expected ',' or '}}' at offset {self.offset - 1}")
+
+    def iter_array(self) -> Iterator[int]:
+        """Iterate over the indexes of the next array"""
+        self._expect('[')
+        if self._peek() == ']':
+            self._pos += 1
+            return
+        index = 0
+        while True:
+            yield index
+            index += 1
+            char = self._peek()
+            self._pos += 1
+            if char == ',':
+                continue
+            if char == ']':
+                return
+            raise JsonStreamError(f"Expected ',' or ']' at offset {self.offset - 1}")
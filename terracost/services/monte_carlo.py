@@ -0,0 +1,316 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import os
+import warnings
+import numpy as np
+from .defaults import MIN_ADAPTIVE_SIMULATIONS
+from .quantile_sketch import TDigest
+
+# Simulated cost paths per estimate; override with plan --uncertainty-sims
+DEFAULT_SIMULATIONS = 10000
+
+# Normal draws per block (paths x steps x groups), bounding memory to ~8 MB
+CHUNK_ELEMENTS = 1 << 20
+
+# Simulations with more simulated costs (paths x groups) than this are
+# summarized with streaming t-digests instead of being kept for np.percentile
+STREAMING_ELEMENTS = 1 << 22
+
+# Paths per task of a streamed simulation. Fixed rather than derived from
+# the worker count, so the seeding (one stream per task) and therefore the
+# result do not depend on --jobs
+STREAM_TASK_SIZE = 1 << 18
+
+# Adaptive simulation (plan --uncertainty-tolerance) runs equal batches of
+# paths and stops once the batch-means standard error of every band is
+# within the tolerance, after at least MIN_BATCHES and at most MAX_SIMULATIONS
+ADAPTIVE_BATCH_SIZE = 1024
+MIN_BATCHES = MIN_ADAPTIVE_SIMULATIONS // ADAPTIVE_BATCH_SIZE
+MAX_SIMULATIONS = 1_000_000
+
+# Independently scrambled Sobol' sequences behind an adaptive Sobol' estimate
+SOBOL_REPLICATES = 8
+
+DISTRIBUTIONS = ('normal', 'lognormal')
+
+# How the standard normal shocks are drawn: independent pseudo-random draws,
+# antithetic pairs (z, -z), or a scrambled Sobol' sequence mapped through the
+# inverse normal CDF (needs scipy, the "qmc" extra)
+SAMPLING_STRATEGIES = ('random', 'antithetic', 'sobol')
+
+# Keeps Sobol' points off 0 and 1, where the inverse normal CDF is infinite
+SOBOL_EPSILON = 1e-12
+
+# Percentiles reported as 68% and 95% confidence bounds
+CONFIDENCE_PERCENTILES = [16, 84, 2.5, 97.5]
+
+
+def month_steps(timeframe_months: float) -> List[float]:
+    """
+    Length of each simulated step in months: one per whole month plus a
+    final partial step, e.g. 2.5 -> [1, 1, 0.5] and 0.25 -> [0.25]
+    """
+    if timeframe_months <= 0:
+        return []
+    whole = int(timeframe_months)
+    steps = [1.0] * whole
+    fraction = timeframe_months - whole
+    if fraction > 1e-9:
+        steps.append(fraction)
+    return steps
+
+
+def simulate_costs(base_cost: float, volatility: float, timeframe_months: float,
+                   n_simulations: int = DEFAULT_SIMULATIONS, distribution: str = 'normal',
+                   seed: Optional[int] = None, sampling: str = 'random') -> np.ndarray:
+    """
+    Monthly cost at the end of the timeframe for n_simulations independent
+    paths. Each month multiplies the cost by a random factor with mean 1
+    and standard deviation `volatility`; a partial month's deviation is
+    scaled by the square root of its length, so variance grows linearly
+    with time. 'normal' draws the factor as 1 + N(0, volatility),
+    'lognormal' as a lognormal with the same mean and variance (never
+    negative).
+    """
+    return simulate_groups(np.array([float(base_cost)]), np.array([float(volatility)]), np.eye(1),
+                           timeframe_months, n_simulations, distribution, seed, sampling)[:, 0]
+
+
+def simulate_groups(costs: np.ndarray, volatilities: np.ndarray, correlation: np.ndarray,
+                    timeframe_months: float, n_simulations: int = DEFAULT_SIMULATIONS,
+                    distribution: str = 'normal', seed: Optional[int] = None,
+                    sampling: str = 'random') -> np.ndarray:
+    """
+    Monthly cost of each of G cost groups at the end of the timeframe,
+    shape (n_simulations, G). Groups follow the single-cost model of
+    simulate_costs with their own volatility; their monthly shocks are
+    correlated through the Cholesky factor of the G x G correlation matrix
+    and drawn with one of SAMPLING_STRATEGIES.
+    """
+    simulated = np.empty((n_simulations, len(costs)))
+    start = 0
+    for chunk in simulate_chunks(costs, volatilities, correlation, timeframe_months, n_simulations,
+                                 distribution, seed, sampling):
+        simulated[start:start + len(chunk)] = chunk
+        start += len(chunk)
+    return simulated
+
+
+def simulate_chunks(costs: np.ndarray, volatilities: np.ndarray, correlation: np.ndarray,
+                    timeframe_months: float, n_simulations: int = DEFAULT_SIMULATIONS,
+                    distribution: str = 'normal', seed: Optional[int] = None,
+                    sampling: str = 'random') -> Iterator[np.ndarray]:
+    """simulate_groups as consecutive chunks of paths, each of at most CHUNK_ELEMENTS draws"""
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(f"Unknown distribution: {distribution}")
+    if sampling not in SAMPLING_STRATEGIES:
+        raise ValueError(f"Unknown sampling strategy: {sampling}")
+    if n_simulations < 1:
+        raise ValueError("n_simulations must be at least 1")
+    costs = np.asarray(costs, dtype=float)
+    steps = month_steps(timeframe_months)
+    chunk_size = max(1, CHUNK_ELEMENTS // (max(1, len(steps)) * len(costs)))
+    if not steps or not np.any(volatilities):
+        for start in range(0, n_simulations, chunk_size):
+            yield np.tile(costs, (min(chunk_size, n_simulations - start), 1))
+        return
+
+    cholesky = np.linalg.cholesky(correlation)
+    # Per-step, per-group standard deviation of the multiplicative factor
+    sigma = np.sqrt(np.asarray(steps))[:, None] * np.asarray(volatilities, dtype=float)[None, :]
+    if distribution == 'lognormal':
+        log_sigma = np.sqrt(np.log1p(sigma ** 2))
+        log_mu = -0.5 * log_sigma ** 2
+
+    # seed may also be a Generator, which default_rng returns as is
+    rng = np.random.default_rng(seed)
+    for draws in normal_draws(rng, sampling, n_simulations, (len(steps), len(costs)), chunk_size):
+        if len(costs) > 1:
+            draws = draws @ cholesky.T
+        if distribution == 'lognormal':
+            # A product of lognormal factors is exp of the summed log-returns
+            draws *= log_sigma
+            draws += log_mu
+            yield costs * np.exp(draws.sum(axis=1))
+        else:
+            draws *= sigma
+            draws += 1.0
+            yield costs * draws.prod(axis=1)
+
+
+def stream_totals(costs: np.ndarray, volatilities: np.ndarray, correlation: np.ndarray,
+                  timeframe_months: float, n_simulations: int, totals: Optional[Sequence[List[int]]] = None,
+                  distribution: str = 'normal', seed: Optional[int] = None,
+                  sampling: str = 'random', jobs: int = 1) -> List[TDigest]:
+    """
+    simulate_groups for runs too large to keep: each chunk's totals (lists
+    of group columns; all groups together by default) are folded into a
+    t-digest per total, so memory stays constant whatever n_simulations is.
+
+    The paths are split into tasks of STREAM_TASK_SIZE, each with its own
+    random stream spawned from SeedSequence(seed), and run on up to `jobs`
+    processes. The tasks' digests are merged in task order, so a seed gives
+    bit-for-bit the same result whatever the number of jobs.
+    """
+    totals = [list(columns) for columns in (totals or [range(len(costs))])]
+    sizes = [min(STREAM_TASK_SIZE, n_simulations - start) for start in range(0, n_simulations, STREAM_TASK_SIZE)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(costs, volatilities, correlation, timeframe_months, size, totals, distribution, task_seed, sampling)
+             for size, task_seed in zip(sizes, seeds)]
+    digests = [TDigest() for _ in totals]
+    workers = min(jobs, len(tasks), os.cpu_count() or 1)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            _merge_partials(digests, executor.map(_stream_task, tasks))
+    else:
+        _merge_partials(digests, map(_stream_task, tasks))
+    return digests
+
+
+def _stream_task(task: tuple) -> List[TDigest]:
+    """One task of stream_totals (module level so worker processes can unpickle it)"""
+    costs, volatilities, correlation, timeframe_months, size, totals, distribution, seed, sampling = task
+    digests = [TDigest() for _ in totals]
+    for chunk in simulate_chunks(costs, volatilities, correlation, timeframe_months, size,
+                                 distribution, seed, sampling):
+        for digest, columns in zip(digests, totals):
+            digest.update(chunk[:, columns].sum(axis=1))
+    return digests
+
+
+def _merge_partials(digests: List[TDigest], partials: Iterator[List[TDigest]]):
+    for partial in partials:
+        for digest, part in zip(digests, partial):
+            digest.merge(part)
+
+
+def normal_draws(rng: np.random.Generator, sampling: str, n_simulations: int, shape: Tuple[int, ...],
+                 chunk_size: int) -> Iterator[np.ndarray]:
+    """
+    Standard normal draws of shape (paths,) + shape for n_simulations paths,
+    in chunks of at most chunk_size paths. Antithetic chunks hold whole
+    (z, -z) pairs; Sobol' chunks continue one scrambled sequence whose
+    dimensions are the flattened shape.
+    """
+    if sampling == 'sobol':
+        qmc, ndtri = _import_qmc()
+        dimensions = int(np.prod(shape))
+        if dimensions > qmc.Sobol.MAXDIM:
+            raise ValueError(f"Sobol' sampling supports up to {qmc.Sobol.MAXDIM} months x cost groups, "
+                             f"got {dimensions}")
+        sampler = qmc.Sobol(d=dimensions, scramble=True, seed=rng)
+    elif sampling == 'antithetic':
+        chunk_size += chunk_size % 2
+    for start in range(0, n_simulations, chunk_size):
+        size = min(chunk_size, n_simulations - start)
+        if sampling == 'antithetic':
+            half = rng.standard_normal(((size + 1) // 2,) + shape)
+            yield np.concatenate([half, -half])[:size]
+        elif sampling == 'sobol':
+            with warnings.catch_warnings():
+                # Balance is best at powers of two, but any count is a valid sample
+                warnings.simplefilter('ignore', UserWarning)
+                points = sampler.random(size)
+            yield ndtri(np.clip(points, SOBOL_EPSILON, 1 - SOBOL_EPSILON)).reshape((size,) + shape)
+        else:
+            yield rng.standard_normal((size,) + shape)
+
+
+def _import_qmc():
+    """scipy's quasi-Monte Carlo module and inverse normal CDF (optional dependency)"""
+    try:
+        from scipy.stats import qmc
+        from scipy.special import ndtri
+    except ImportError:
+        raise Exception("Sobol' sampling requires scipy: pip install \"terracost[qmc]\"")
+    return qmc, ndtri
+
+
+def simulate_adaptive(costs: np.ndarray, volatilities: np.ndarray, correlation: np.ndarray,
+                      timeframe_months: float, tolerance: float, totals: Optional[Sequence[List[int]]] = None,
+                      max_simulations: Optional[int] = None, distribution: str = 'normal',
+                      seed: Optional[int] = None, sampling: str = 'random') -> Tuple[np.ndarray, float]:
+    """
+    simulate_groups in batches of ADAPTIVE_BATCH_SIZE paths until the
+    confidence bounds of every total (lists of group columns; all groups
+    together by default) have a standard error within `tolerance` of that
+    total's base cost. The standard error of each percentile is estimated
+    from its spread across batches (batch means). Returns the simulated
+    costs and the largest relative standard error reached, which is above
+    the tolerance when max_simulations ran out first. max_simulations is
+    never exceeded and must be at least MIN_ADAPTIVE_SIMULATIONS.
+
+    Sobol' batches would each be a short, separately scrambled sequence and
+    lose most of the low-discrepancy gain, so Sobol' sampling instead grows
+    SOBOL_REPLICATES independent scrambles together, doubling their length
+    each round (a prefix of a Sobol' sequence is balanced at powers of two),
+    and uses the spread between the replicates. Regenerating every round at
+    most doubles the work.
+    """
+    costs = np.asarray(costs, dtype=float)
+    totals = [list(columns) for columns in (totals or [range(len(costs))])]
+    bases = np.array([costs[columns].sum() for columns in totals])
+    max_simulations = max_simulations or MAX_SIMULATIONS
+    if max_simulations < MIN_ADAPTIVE_SIMULATIONS:
+        raise ValueError(f"Adaptive simulation needs at least {MIN_ADAPTIVE_SIMULATIONS} simulations, "
+                         f"got {max_simulations}")
+    rng = np.random.default_rng(seed)
+
+    def percentiles(sample: np.ndarray) -> List[np.ndarray]:
+        return [np.percentile(sample[:, columns].sum(axis=1), CONFIDENCE_PERCENTILES) for columns in totals]
+
+    def standard_error(sample_percentiles: List[List[np.ndarray]]) -> float:
+        # Shape (samples, totals, percentiles) -> error per total and percentile
+        spread = np.std(sample_percentiles, axis=0, ddof=1) / np.sqrt(len(sample_percentiles))
+        return float((spread / np.where(bases > 0, bases, np.inf)[:, None]).max())
+
+    if sampling == 'sobol':
+        seeds = rng.integers(0, 2 ** 63, SOBOL_REPLICATES)
+        size = max(1, ADAPTIVE_BATCH_SIZE // SOBOL_REPLICATES)
+        while True:
+            replicates = [simulate_groups(costs, volatilities, correlation, timeframe_months, size,
+                                          distribution, int(replicate_seed), sampling)
+                          for replicate_seed in seeds]
+            error = standard_error([percentiles(replicate) for replicate in replicates])
+            if error <= tolerance or 2 * size * SOBOL_REPLICATES > max_simulations:
+                return np.concatenate(replicates), error
+            size *= 2
+
+    max_batches = max_simulations // ADAPTIVE_BATCH_SIZE
+    batches = []
+    batch_percentiles = []
+    error = float('inf')
+    while len(batches) < max_batches:
+        batch = simulate_groups(costs, volatilities, correlation, timeframe_months, ADAPTIVE_BATCH_SIZE,
+                                distribution, rng, sampling)
+        batches.append(batch)
+        batch_percentiles.append(percentiles(batch))
+        if len(batches) >= MIN_BATCHES:
+            error = standard_error(batch_percentiles)
+            if error <= tolerance:
+                break
+    return np.concatenate(batches), error
+
+
+def summarize_digest(digest: TDigest) -> Dict[str, float]:
+    """summarize_costs of the values a t-digest has seen"""
+    lower_68, upper_68, lower_95, upper_95 = digest.quantile(np.asarray(CONFIDENCE_PERCENTILES) / 100)
+    return {
+        'confidence_68_lower': float(lower_68),
+        'confidence_68_upper': float(upper_68),
+        'confidence_95_lower': float(lower_95),
+        'confidence_95_upper': float(upper_95),
+        'std_deviation': digest.std()
+    }
+
+
+def summarize_costs(costs: np.ndarray) -> Dict[str, float]:
+    """Confidence bounds and spread of simulated costs"""
+    lower_68, upper_68, lower_95, upper_95 = np.percentile(costs, CONFIDENCE_PERCENTILES)
+    return {
+        'confidence_68_lower': float(lower_68),
+        'confidence_68_upper': float(upper_68),
+        'confidence_95_lower': float(lower_95),
+        'confidence_95_upper': float(upper_95),
+        'std_deviation': float(np.std(costs))
+    }
@@ -0,0 +1,58 @@
+import os
+import threading
+from typing import Dict, Any, Callable, Iterable, Optional, Tuple
+
+
+class ParseCache:
+    """
+    Per-file parse results shared between parsers (batch mode parses many
+    workspaces that use the same local modules). Entries are keyed by the
+    file's path, size and modification time, so an edited file is re-parsed.
+    Cached results are never handed out directly; parsers merge copies.
+    """
+
+    def __init__(self):
+        self._entries: Dict[Tuple, Tuple[Tuple[int, int], Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(working_dir: str, file_path: str, kinds: Iterable[str],
+             type_prefixes: Optional[Tuple[str, ...]]) -> Tuple:
+        # Record file names are relative to the parser's working directory
+        return (os.path.abspath(working_dir), os.path.abspath(file_path),
+                frozenset(kinds), tuple(type_prefixes) if type_prefixes is not None else None)
+
+    def get_or_parse(self, working_dir: str, file_path: str, kinds: Iterable[str],
+                     type_prefixes: Optional[Tuple[str, ...]],
+                     parse: Callable[[str], Dict[str, Any]]) -> Dict[str, Any]:
+        """Return the cached result for file_path, calling parse(file_path) when missing or stale"""
+        key = self._key(working_dir, file_path, kinds, type_prefixes)
+        stat = os.stat(file_path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == stamp:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        # Parsing happens outside the lock; two workers missing the same file both parse it
+        result = parse(file_path)
+        with self._lock:
+            self._entries[key] = (stamp, result)
+        return result
+
+    def invalidate(self, file_path: str):
+        """Drop every cached result for a file"""
+        file_path = os.path.abspath(file_path)
+        with self._lock:
+            for key in [key for key in self._entries if key[1] == file_path]:
+                del self._entries[key]
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses
+        }
@@ -107,6 +107,12 @@ class CostCalculationProgress:
             ]
         
         self.current_step = 0
+        self.provider_states = {}
+        # Use Windows-compatible provider state markers
+        if platform.system() == "Windows":
+            self.state_symbols = {'done': "[OK]", 'failed': "[FAILED]", 'pending': "..."}
+        else:
+            self.state_symbols = {'done': "✓", 'failed': "✗", 'pending': "…"}
     
     def start(self):
         """Start the cost calculation progress"""
@@ -119,6 +125,20 @@ class CostCalculationProgress:
         if self.current_step < len(self.steps):
             self.progress.update_message(self.steps[self.current_step])
     
+    def provider_update(self, provider: str, state: str, total: Optional[float] = None):
+        """Show per-provider pricing progress on the current step (CostEngine progress callback)"""
+        if state == 'done':
+            done = self.state_symbols['done']
+            label = f"{done} ${total:.2f}" if total is not None else done
+        elif state == 'failed':
+            label = self.state_symbols['failed']
+        else:
+            label = self.state_symbols['pending']
+        self.provider_states[provider] = label
+        states = " | ".join(f"{name.upper()} {label}" for name, label in self.provider_states.items())
+        if self.current_step < len(self.steps):
+            self.progress.update_message(f"{self.steps[self.current_step]} {states}")
+    
     def stop(self, success: bool = True):
         """Stop the progress indicator"""
         if success:
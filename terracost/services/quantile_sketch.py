@@ -0,0 +1,92 @@
+from typing import Sequence
+import numpy as np
+
+# Centroids are sized so that each spans at most 1 / DEFAULT_COMPRESSION of
+# the k1 scale: about DEFAULT_COMPRESSION / 2 centroids, densest in the tails
+DEFAULT_COMPRESSION = 1000
+
+
+class TDigest:
+    """
+    Mergeable streaming quantile sketch (a merging t-digest with the k1 scale
+    function), fed with NumPy arrays. Memory stays constant however many
+    values are added; count, mean and variance are tracked exactly.
+    """
+
+    def __init__(self, compression: float = DEFAULT_COMPRESSION):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def update(self, values: np.ndarray):
+        """Add a chunk of values"""
+        values = np.asarray(values, dtype=float).ravel()
+        if not values.size:
+            return
+        mean = float(values.mean())
+        self._add_moments(values.size, mean, float(np.square(values - mean).sum()))
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self._compress(np.sort(values), np.ones(values.size))
+
+    def merge(self, other: "TDigest"):
+        """Add everything another digest has seen"""
+        if not other.count:
+            return
+        self._add_moments(other.count, other._mean, other._m2)
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress(other.means, other.weights)
+
+    def quantile(self, q: Sequence[float]) -> np.ndarray:
+        """Estimated quantiles (q in [0, 1]), interpolating between centroid centres"""
+        if not self.count:
+            raise ValueError("quantile of an empty digest")
+        positions = np.cumsum(self.weights) - self.weights / 2
+        return np.interp(np.asarray(q, dtype=float) * self.count,
+                         np.concatenate([[0.0], positions, [self.count]]),
+                         np.concatenate([[self.min], self.means, [self.max]]))
+
+    def mean(self) -> float:
+        return self._mean
+
+    def std(self) -> float:
+        """Population standard deviation, as np.std"""
+        return float(np.sqrt(self._m2 / self.count)) if self.count else 0.0
+
+    def _add_moments(self, count: int, mean: float, m2: float):
+        # Chan et al.'s pairwise update keeps the variance stable over many chunks
+        total = self.count + count
+        delta = mean - self._mean
+        self._mean += delta * count / total
+        self._m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray):
+        """Merge sorted (means, weights) into the centroids"""
+        # Both sides are sorted, so placing the centroids among the new points
+        # is a binary search rather than a sort of everything
+        positions = np.searchsorted(means, self.means, side='right') + np.arange(len(self.means))
+        is_centroid = np.zeros(len(means) + len(self.means), dtype=bool)
+        is_centroid[positions] = True
+        all_means = np.empty(len(is_centroid))
+        all_weights = np.empty(len(is_centroid))
+        all_means[is_centroid] = self.means
+        all_weights[is_centroid] = self.weights
+        all_means[~is_centroid] = means
+        all_weights[~is_centroid] = weights
+        # Centroids (and new values) whose centre falls in the same unit of
+        # k(q) = compression / (2 pi) * asin(2q - 1) are merged
+        centres = (np.cumsum(all_weights) - all_weights / 2) / all_weights.sum()
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * centres - 1) + self.compression / 4
+        buckets = np.floor(k).astype(np.int64)
+        merged_weights = np.bincount(buckets, weights=all_weights)
+        merged_sums = np.bincount(buckets, weights=all_weights * all_means)
+        keep = merged_weights > 0
+        self.weights = merged_weights[keep]
+        self.means = merged_sums[keep] / self.weights
@@ -0,0 +1,114 @@
+import sys
+from typing import Dict, Any, Optional, Callable
+
+
+class _LazyConfig:
+    """A config parsed from its source on first use, shared by a record and its copies"""
+
+    __slots__ = ('source', 'parse', 'value')
+
+    def __init__(self, source: Any, parse: Callable[[Any], Dict[str, Any]]):
+        self.source = source
+        self.parse = parse
+        self.value: Optional[Dict[str, Any]] = None
+
+    def get(self) -> Dict[str, Any]:
+        if self.value is None:
+            # Batch workers may share a cell; a concurrent first access parses twice but
+            # never sees the source cleared before the value is set
+            parse, source = self.parse, self.source
+            if parse is None:
+                return self.value
+            self.value = parse(source)
+            self.source = None
+            self.parse = None
+        return self.value
+
+
+class ResourceRecord:
+    """
+    Compact record for a single parsed resource.
+
+    Type, file and module strings are interned so the many records of a large
+    workspace share them, and the config is only parsed from its source text
+    when a pricer first reads it.
+    """
+
+    __slots__ = ('resource_type', 'name', 'file', 'module', 'count', 'count_expression',
+                 'for_each_expression', '_config', '_lazy')
+
+    def __init__(self, resource_type: str, name: str, file: str, config: Optional[Dict[str, Any]] = None,
+                 module: Optional[str] = None, source: Any = None,
+                 parse: Optional[Callable[[Any], Dict[str, Any]]] = None, count: int = 1):
+        self.resource_type = sys.intern(resource_type)
+        self.name = name
+        self.file = sys.intern(file)
+        self.module = sys.intern(module) if module else None
+        # Number of instances created through count/for_each; pricers multiply by it
+        self.count = count
+        self.count_expression = None
+        self.for_each_expression = None
+        self._config = config
+        self._lazy = _LazyConfig(source, parse) if config is None and parse is not None else None
+
+    @classmethod
+    def lazy(cls, resource_type: str, name: str, file: str, source: Any,
+             parse: Callable[[Any], Dict[str, Any]]) -> 'ResourceRecord':
+        """Create a record whose config is parsed from source (block text or decoded JSON) on first access"""
+        return cls(resource_type, name, file, source=source, parse=parse)
+
+    @property
+    def config(self) -> Dict[str, Any]:
+        if self._config is None:
+            self._config = self._lazy.get() if self._lazy is not None else {}
+            self._lazy = None
+        return self._config
+
+    @property
+    def is_parsed(self) -> bool:
+        return self._config is not None or (self._lazy is not None and self._lazy.value is not None)
+
+    @property
+    def key(self) -> str:
+        """Cost breakdown key, e.g. 'aws_instance.web'"""
+        return f"{self.resource_type}.{self.name}"
+
+    def _derive(self, name: str, module: Optional[str], count: int) -> 'ResourceRecord':
+        """A new record sharing this one's config, or the cell it is parsed into once"""
+        record = ResourceRecord(self.resource_type, name, self.file, config=self._config,
+                                module=module, count=count)
+        record._lazy = self._lazy
+        return record
+
+    def copy(self) -> 'ResourceRecord':
+        """An independent record (own instance count) sharing this record's config"""
+        record = self._derive(self.name, self.module, self.count)
+        record.count_expression = self.count_expression
+        record.for_each_expression = self.for_each_expression
+        return record
+
+    def in_module(self, module_name: str, module_count: int = 1) -> 'ResourceRecord':
+        """
+        Return this record as seen from a calling module (name prefixed with the
+        module, instances multiplied by the module's own count/for_each)
+        """
+        # Copies share the config, or its lazy cell: whichever record is priced
+        # first parses it, and every copy then reads the same dict
+        return self._derive(f"{module_name}.{self.name}", module_name, self.count * module_count)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The record in the dict layout parsers used to return"""
+        data = {
+            'name': self.name,
+            'config': self.config,
+            'file': self.file
+        }
+        if self.module is not None:
+            data['module'] = self.module
+        if self.count != 1:
+            data['count'] = self.count
+        return data
+
+    def __repr__(self):
+        # Records are interpolated into LLM prompts; keep the familiar dict layout
+        return repr(self.to_dict())
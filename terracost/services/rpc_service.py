@@ -0,0 +1,98 @@
+import contextlib
+import json
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, TextIO
+from .api_service import CostApi, ApiError
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+SERVER_ERROR = -32000
+
+
+class RpcServer:
+    """
+    Line-delimited JSON-RPC 2.0 over a pair of streams (terracost rpc --stdio).
+    Every request is one JSON object per line and is answered with one line;
+    requests are handled concurrently, so responses may arrive out of order
+    and are matched by id. The methods are those of CostApi plus "shutdown".
+    While serving, anything printed goes to stderr so the protocol stream
+    stays clean.
+    """
+
+    def __init__(self, api: CostApi, reader: Optional[TextIO] = None, writer: Optional[TextIO] = None):
+        self.api = api
+        self.reader = reader or sys.stdin
+        self.writer = writer or sys.stdout
+        self._write_lock = threading.Lock()
+        self._dispatcher = ThreadPoolExecutor(max_workers=api.workers)
+        self._shutdown = threading.Event()
+
+    def serve(self):
+        """Answer requests until stdin closes or a shutdown request arrives"""
+        with contextlib.redirect_stdout(sys.stderr):
+            try:
+                for line in self.reader:
+                    if not line.strip():
+                        continue
+                    self._dispatch_line(line)
+                    if self._shutdown.is_set():
+                        break
+            finally:
+                self._dispatcher.shutdown(wait=True)
+
+    def _dispatch_line(self, line: str):
+        try:
+            message = json.loads(line)
+        except ValueError as e:
+            self._send_error(None, PARSE_ERROR, f"Parse error: {e}")
+            return
+        if not isinstance(message, dict) or not isinstance(message.get('method'), str):
+            self._send_error(message.get('id') if isinstance(message, dict) else None,
+                             INVALID_REQUEST, "Invalid request")
+            return
+        if message['method'] == 'shutdown':
+            self._shutdown.set()
+            if 'id' in message:
+                self._send({'jsonrpc': '2.0', 'id': message['id'], 'result': None})
+            return
+        self._dispatcher.submit(self._handle, message)
+
+    def _handle(self, message: Dict[str, Any]):
+        request_id = message.get('id')
+        is_notification = 'id' not in message
+        method = message['method']
+        if method not in self.api.METHODS:
+            if not is_notification:
+                self._send_error(request_id, METHOD_NOT_FOUND, f"Method not found: {method}")
+            return
+        try:
+            result = self.api.handle(method, message.get('params'))
+        except ApiError as e:
+            if not is_notification:
+                code = INVALID_PARAMS if e.status == 400 else SERVER_ERROR
+                self._send_error(request_id, code, str(e), {'status': e.status})
+            return
+        except Exception as e:
+            if not is_notification:
+                self._send_error(request_id, INTERNAL_ERROR, str(e))
+            return
+        if not is_notification:
+            self._send({'jsonrpc': '2.0', 'id': request_id, 'result': result})
+
+    def _send_error(self, request_id, code: int, message: str, data: Optional[Dict[str, Any]] = None):
+        error = {'code': code, 'message': message}
+        if data is not None:
+            error['data'] = data
+        self._send({'jsonrpc': '2.0', 'id': request_id, 'error': error})
+
+    def _send(self, payload: Dict[str, Any]):
+        line = json.dumps(payload) + '\n'
+        with self._write_lock:
+            self.writer.write(line)
+            self.writer.flush()
@@ -5,10 +5,8 @@ import os
 import json
 import re
 
-from .aws_cost_service import AwsCostService
 from .progress_indicator import ProgressIndicator
-from terracost.services.azure_cost_service import AzureCostService
-from terracost.services.gcp_cost_service import GCPCostService
+from .cost_engine import CostEngine, CostBreakdown
 
 load_dotenv()
 
@@ -20,6 +18,16 @@ def show_llm_loading(message: str = "🤖 Generating AI suggestions..."):
     progress.start()
     return progress
 
+def parse_suggestions(response):
+    """The JSON block of an LLM response, or None when there is none to parse"""
+    match = re.search(r"```json\n(.*?)```", response, re.DOTALL)
+    if not match:
+        return None
+    try:
+        return json.loads(match.group(1))
+    except json.JSONDecodeError:
+        return None
+
 def pretty_display(response):
     """Extract and display JSON response from LLM"""
     match = re.search(r"```json\n(.*?)```", response, re.DOTALL)
@@ -66,37 +74,20 @@ def pretty_display(response):
     else:
         print(response)
 
-def suggest_budget(budget: float, resources: dict):
-    """Suggest infrastructure modifications to fit within budget"""
-    if not api_key:
+def _current_monthly_cost(resources: dict, costs: CostBreakdown = None) -> float:
+    """Monthly cost of the current infrastructure, priced here only if the caller has not already"""
+    if costs is None:
+        costs = CostEngine().price(resources)
+    return costs.total_monthly
+
+def suggest_budget(budget: float, resources: dict, costs: CostBreakdown = None, openai_api_key: str = None):
+    """Suggest infrastructure modifications to fit within budget; returns the LLM response or None"""
+    key = openai_api_key or api_key
+    if not key:
         print("❌ OPENAI_API_KEY not found. Please set it in your environment.")
-        return
-    
-    total_monthly = 0.0
-    
-    # AWS costs
-    if resources.get('aws'):
-        aws_service = AwsCostService()
-        aws_costs = aws_service.build_costs(resources['aws'])
-        total_monthly += sum(aws_costs.values())
-    
-    # Azure costs
-    if resources.get('azure'):
-        azure_service = AzureCostService()
-        azure_costs = azure_service.build_costs(resources['azure'])
-        total_monthly += sum(azure_costs.values())
-    
-    # GCP costs
-    if resources.get('gcp'):
-        gcp_service = GCPCostService()
-        gcp_costs = gcp_service.build_costs(resources['gcp'])
-        total_monthly += sum(gcp_costs.values())
+        return None
     
-    # Other/unknown resources
-    if resources.get('other'):
-        # Estimate costs for unknown resources
-        other_costs = {f"other.{k}": 10.0 for k in resources['other'].keys()}
-        total_monthly += sum(other_costs.values())
+    total_monthly = _current_monthly_cost(resources, costs)
 
     print(f"🎯 Budget Optimization Suggestions (Target: ${budget:.2f})")
     print("=" * 60)
@@ -107,7 +98,7 @@ def suggest_budget(budget: float, resources: dict):
     try:
         llm = ChatOpenAI(
             model="gpt-4o-mini",
-            api_key=api_key
+            api_key=key
         )
         
         template = PromptTemplate.from_template("""
@@ -136,43 +127,22 @@ def suggest_budget(budget: float, resources: dict):
         
         progress.stop("✅ AI suggestions generated!")
         pretty_display(response.content)
+        return response.content
         
     except Exception as e:
         progress.stop("❌ Failed to generate suggestions")
         print(f"⚠️ Error: {str(e)}")
         print("💡 Try checking your OpenAI API key and internet connection")
+        return None
 
-def suggest_savings(resources: dict):
-    """Suggest infrastructure combinations at different saving levels"""
-    if not api_key:
+def suggest_savings(resources: dict, costs: CostBreakdown = None, openai_api_key: str = None):
+    """Suggest infrastructure combinations at different saving levels; returns the LLM response or None"""
+    key = openai_api_key or api_key
+    if not key:
         print("❌ OPENAI_API_KEY not found. Please set it in your environment.")
-        return
+        return None
     
-    total_monthly = 0.0
-    
-    # AWS costs
-    if resources.get('aws'):
-        aws_service = AwsCostService()
-        aws_costs = aws_service.build_costs(resources['aws'])
-        total_monthly += sum(aws_costs.values())
-    
-    # Azure costs
-    if resources.get('azure'):
-        azure_service = AzureCostService()
-        azure_costs = azure_service.build_costs(resources['azure'])
-        total_monthly += sum(azure_costs.values())
-    
-    # GCP costs
-    if resources.get('gcp'):
-        gcp_service = GCPCostService()
-        gcp_costs = gcp_service.build_costs(resources['gcp'])
-        total_monthly += sum(gcp_costs.values())
-    
-    # Other/unknown resources
-    if resources.get('other'):
-        # Estimate costs for unknown resources
-        other_costs = {f"other.{k}": 10.0 for k in resources['other'].keys()}
-        total_monthly += sum(other_costs.values())
+    total_monthly = _current_monthly_cost(resources, costs)
     
     print(f"💡 Cost Savings Suggestions (Current: ${total_monthly:.2f}/month)")
     print("=" * 60)
@@ -183,7 +153,7 @@ def suggest_savings(resources: dict):
     try:
         llm = ChatOpenAI(
             model="gpt-4o-mini",
-            api_key=api_key
+            api_key=key
         )
         
         template = PromptTemplate.from_template("""
@@ -213,43 +183,22 @@ def suggest_savings(resources: dict):
         
         progress.stop("✅ AI suggestions generated!")
         pretty_display(response.content)
+        return response.content
         
     except Exception as e:
         progress.stop("❌ Failed to generate suggestions")
         print(f"⚠️ Error: {str(e)}")
         print("💡 Try checking your OpenAI API key and internet connection")
+        return None
 
-def suggest_best_value(resources: dict):
-    """Suggest configuration that provides best bang for buck"""
-    if not api_key:
+def suggest_best_value(resources: dict, costs: CostBreakdown = None, openai_api_key: str = None):
+    """Suggest configuration that provides best bang for buck; returns the LLM response or None"""
+    key = openai_api_key or api_key
+    if not key:
         print("❌ OPENAI_API_KEY not found. Please set it in your environment.")
-        return
-    
-    total_monthly = 0.0
-    
-    # AWS costs
-    if resources.get('aws'):
-        aws_service = AwsCostService()
-        aws_costs = aws_service.build_costs(resources['aws'])
-        total_monthly += sum(aws_costs.values())
-    
-    # Azure costs
-    if resources.get('azure'):
-        azure_service = AzureCostService()
-        azure_costs = azure_service.build_costs(resources['azure'])
-        total_monthly += sum(azure_costs.values())
-    
-    # GCP costs
-    if resources.get('gcp'):
-        gcp_service = GCPCostService()
-        gcp_costs = gcp_service.build_costs(resources['gcp'])
-        total_monthly += sum(gcp_costs.values())
+        return None
     
-    # Other/unknown resources
-    if resources.get('other'):
-        # Estimate costs for unknown resources
-        other_costs = {f"other.{k}": 10.0 for k in resources['other'].keys()}
-        total_monthly += sum(other_costs.values())
+    total_monthly = _current_monthly_cost(resources, costs)
     
     print(f"⭐ Best Value Configuration Suggestions")
     print("=" * 60)
@@ -260,7 +209,7 @@ def suggest_best_value(resources: dict):
     try:
         llm = ChatOpenAI(
             model="gpt-4o-mini",
-            api_key=api_key
+            api_key=key
         )
         
         template = PromptTemplate.from_template("""
@@ -289,8 +238,10 @@ def suggest_best_value(resources: dict):
         
         progress.stop("✅ AI suggestions generated!")
         pretty_display(response.content)
+        return response.content
         
     except Exception as e:
         progress.stop("❌ Failed to generate suggestions")
         print(f"⚠️ Error: {str(e)}")
         print("💡 Try checking your OpenAI API key and internet connection")
+        return None
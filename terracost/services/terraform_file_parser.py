@@ -1,14 +1,83 @@
 import os
 import re
+import sys
 import json
-from typing import Dict, Any, List, Optional
+import mmap
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional, Iterator, Pattern, Tuple, Union, Iterable, Callable
 from pathlib import Path
+from .workspace_discovery import WorkspaceDiscovery
+from .resource_record import ResourceRecord
+from .parse_cache import ParseCache
+from .expression_evaluator import (ExpressionEvaluator, UNRESOLVED, JSON_INTERPOLATION_PATTERN, iter_attributes,
+                                   json_to_expression, parse_tfvars, find_tfvars_files)
+
+try:
+    # Optional: a much faster decoder for *.tf.json files (pip install terracost[fast])
+    import orjson
+except ImportError:
+    orjson = None
+
+# Block header patterns, matched directly against the memory-mapped file bytes
+RESOURCE_PATTERN = re.compile(rb'resource\s+"([^"]+)"\s+"([^"]+)"\s*\{')
+MODULE_PATTERN = re.compile(rb'module\s+"([^"]+)"\s*\{')
+VARIABLE_PATTERN = re.compile(rb'variable\s+"([^"]+)"\s*\{')
+DATA_PATTERN = re.compile(rb'data\s+"([^"]+)"\s+"([^"]+)"\s*\{')
+LOCALS_PATTERN = re.compile(rb'(?<![\w.])locals\s*\{')
+BRACE_PATTERN = re.compile(rb'[{}]')
+
+# Block kinds parse_terraform_files can extract
+BLOCK_KINDS = ('resource', 'module', 'variable', 'data', 'locals')
+
+# What cost estimation needs: resources, modules for expansion, and
+# variables and locals to resolve count/for_each
+PRICING_KINDS = ('resource', 'module', 'variable', 'locals')
+
+# Cheap check for resources that use count or for_each
+META_ARGUMENT_PATTERN = re.compile(r'^[ \t]*(?:count|for_each)[ \t]*=', re.MULTILINE)
+
+# Module block arguments that are not input variables
+MODULE_META_ARGUMENTS = {'source', 'version', 'count', 'for_each', 'providers', 'depends_on'}
+
+# Resource type prefixes of the providers we have pricers for
+PRICED_TYPE_PREFIXES = ('aws_', 'azurerm_', 'google_')
+
+# Config values up to this length are interned when parsed
+MAX_INTERNED_VALUE_LENGTH = 64
+
+# Terraform's JSON configuration syntax
+JSON_CONFIG_SUFFIX = '.tf.json'
+
+
+def detect_provider(resource_type: str) -> str:
+    """Detect cloud provider from resource type"""
+    if resource_type.startswith('aws_'):
+        return 'aws'
+    elif resource_type.startswith('azurerm_'):
+        return 'azure'
+    elif resource_type.startswith('google_'):
+        return 'gcp'
+    else:
+        return 'other'
+
 
 class TerraformFileParser:
     """Parses Terraform files directly to extract resource information"""
     
-    def __init__(self, working_dir: str):
+    def __init__(self, working_dir: str, discovery_options: Optional[Dict[str, Any]] = None,
+                 keep_contents: bool = False, var_files: Optional[List[str]] = None,
+                 variable_values: Optional[Dict[str, Any]] = None, parse_cache: Optional[ParseCache] = None):
         self.working_dir = working_dir
+        # Root modules read *.tfvars; child modules get their inputs from the module block
+        self.var_files = var_files or []
+        self.variable_values = variable_values
+        self.evaluator = None
+        self.unresolved_counts = 0
+        self.discovery_options = discovery_options or {}
+        self.discovery_stats = {}
+        self.discovered_files = []
+        # Raw file contents are only retained when keep_contents is set
+        self.keep_contents = keep_contents
         self.parsed_files = {}
         self.resources = {
             'aws': {},
@@ -18,13 +87,31 @@ class TerraformFileParser:
         }
         self.modules = {}
         self.variables = {}
+        self.locals = {}
         self.data_sources = {}
+        self.kinds = set(BLOCK_KINDS)
+        self.type_prefixes = None
+        # Shared per-file results (batch mode); passed on to module parsers
+        self.parse_cache = parse_cache
     
-    def parse_terraform_files(self, show_progress: bool = True) -> Dict[str, Any]:
+    def parse_terraform_files(self, show_progress: bool = True, kinds: Optional[Iterable[str]] = None,
+                              type_prefixes: Optional[Iterable[str]] = None) -> Dict[str, Any]:
         """
         Parse all Terraform files in the working directory and subdirectories
         Returns parsed resource information
+        
+        kinds limits extraction to the given block kinds (see BLOCK_KINDS) and
+        type_prefixes limits resources to types starting with one of the prefixes.
+        Resource configs are parsed lazily, on first access.
         """
+        if kinds is not None:
+            unknown = set(kinds) - set(BLOCK_KINDS)
+            if unknown:
+                raise ValueError(f"Unknown block kinds: {', '.join(sorted(unknown))}")
+            self.kinds = set(kinds)
+        if type_prefixes is not None:
+            self.type_prefixes = tuple(type_prefixes)
+        
         if show_progress:
             print("📁 Scanning for Terraform files...")
         
@@ -35,7 +122,8 @@ class TerraformFileParser:
             raise Exception(f"No .tf files found in {self.working_dir}")
         
         if show_progress:
-            print(f"   📋 Found {len(tf_files)} Terraform files")
+            print(f"   📋 Found {len(tf_files)} Terraform files "
+                  f"in {self.discovery_stats.get('discovery_time', 0.0) * 1000:.0f} ms")
         
         # Parse each file
         for tf_file in tf_files:
@@ -43,6 +131,10 @@ class TerraformFileParser:
                 print(f"   📖 Parsing {os.path.relpath(tf_file, self.working_dir)}")
             self._parse_single_file(tf_file, show_progress)
         
+        # Resolve count/for_each against variable defaults, *.tfvars and locals
+        self.evaluator = self.build_evaluator()
+        self._resolve_instance_counts(self.resources['other'])
+        
         # Process modules recursively
         if show_progress:
             print("   🔍 Processing modules...")
@@ -50,7 +142,7 @@ class TerraformFileParser:
                 print(f"   📦 Found {len(self.modules)} modules to process")
             else:
                 print("   ℹ️  No modules found")
-        self._process_modules()
+        self._process_modules(show_progress)
         
         # Extract resources from parsed data
         if show_progress:
@@ -68,44 +160,149 @@ class TerraformFileParser:
             'resources': self.resources,
             'modules': self.modules,
             'variables': self.variables,
+            'locals': self.locals,
             'data_sources': self.data_sources,
             'summary': self._generate_summary()
         }
     
-    def _find_terraform_files(self) -> List[str]:
-        """Find all .tf files in the working directory and subdirectories"""
-        tf_files = []
+    def parse_file(self, file_path: str, kinds: Optional[Iterable[str]] = None,
+                   type_prefixes: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Parse a single Terraform file in isolation (used for incremental re-parsing).
+        Modules declared in the file are returned but not expanded, and
+        count/for_each are left unresolved (see resolve_instance_counts).
+        """
+        parser = TerraformFileParser(self.working_dir, self.discovery_options, self.keep_contents,
+                                     self.var_files, self.variable_values, self.parse_cache)
+        parser.kinds = set(kinds) if kinds is not None else set(self.kinds)
+        parser.type_prefixes = tuple(type_prefixes) if type_prefixes is not None else self.type_prefixes
+        parser._parse_single_file(file_path, show_progress=False)
+        parser._extract_resources()
+        return {
+            'resources': parser.resources,
+            'modules': parser.modules,
+            'variables': parser.variables,
+            'locals': parser.locals,
+            'data_sources': parser.data_sources
+        }
+
+    def build_evaluator(self) -> ExpressionEvaluator:
+        """
+        Build the expression evaluator for this module from variable defaults,
+        then *.tfvars and --var-file values (root module) or the calling
+        module block's arguments (child module), plus locals
+        """
+        literal = ExpressionEvaluator()
+        values = {}
+        for variable_name, variable in self.variables.items():
+            expression = variable.get('default_expression')
+            if expression is not None:
+                value = literal.evaluate(expression)
+                if value is not UNRESOLVED:
+                    values[variable_name] = value
         
-        for root, dirs, files in os.walk(self.working_dir):
-            # Skip .terraform directory
-            if '.terraform' in dirs:
-                dirs.remove('.terraform')
-            
-            # Skip .git directory
-            if '.git' in dirs:
-                dirs.remove('.git')
-            
-            for file in files:
-                if file.endswith('.tf'):
-                    tf_files.append(os.path.join(root, file))
+        if self.variable_values is None:
+            for tfvars_file in find_tfvars_files(self.working_dir) + list(self.var_files):
+                values.update(parse_tfvars(tfvars_file))
+        else:
+            values.update(self.variable_values)
         
-        return sorted(tf_files)
+        return ExpressionEvaluator(values, self.locals)
+
+    def resolve_instance_counts(self, resources: Dict[str, List[ResourceRecord]]) -> int:
+        """
+        Set the instance count of resources that use count/for_each.
+        Returns how many could not be resolved (these keep a count of 1).
+        """
+        if self.evaluator is None:
+            self.evaluator = self.build_evaluator()
+        unresolved = 0
+        for resource_list in resources.values():
+            for resource in resource_list:
+                if resource.count_expression is None and resource.for_each_expression is None:
+                    continue
+                count = self.evaluator.instance_count(resource.count_expression, resource.for_each_expression)
+                if count is None:
+                    unresolved += 1
+                    count = 1
+                resource.count = count
+        return unresolved
+
+    def _resolve_instance_counts(self, resources: Dict[str, List[ResourceRecord]]):
+        self.unresolved_counts += self.resolve_instance_counts(resources)
+
+    def _find_terraform_files(self) -> List[str]:
+        """Find all .tf files in the working directory and subdirectories"""
+        discovery = WorkspaceDiscovery(self.working_dir, **self.discovery_options)
+        tf_files = discovery.discover()
+        self.discovery_stats = discovery.get_stats()
+        self.discovered_files = tf_files
+        return tf_files
     
     def _parse_single_file(self, file_path: str, show_progress: bool = True):
+        """Parse a single Terraform file, through the shared parse cache when there is one"""
+        if self.parse_cache is None or self.keep_contents:
+            self._parse_file_contents(file_path, show_progress)
+            return
+        try:
+            file_result = self.parse_cache.get_or_parse(self.working_dir, file_path, self.kinds,
+                                                        self.type_prefixes, self._parse_file_result)
+        except OSError as e:
+            print(f"   ⚠️  Warning: Could not parse {file_path}: {e}")
+            return
+        self._merge_file_result(file_result)
+    
+    def _parse_file_result(self, file_path: str) -> Dict[str, Any]:
+        """Parse one file into a fresh result (the unit the parse cache stores)"""
+        parser = TerraformFileParser(self.working_dir, self.discovery_options)
+        parser.kinds = set(self.kinds)
+        parser.type_prefixes = self.type_prefixes
+        parser._parse_file_contents(file_path, show_progress=False)
+        return {
+            'resources': parser.resources['other'],
+            'modules': parser.modules,
+            'variables': parser.variables,
+            'locals': parser.locals,
+            'data_sources': parser.data_sources
+        }
+    
+    def _merge_file_result(self, file_result: Dict[str, Any]):
+        """Add a cached file result; records are copied since counts are resolved per parser"""
+        for resource_type, resource_list in file_result['resources'].items():
+            self.resources['other'].setdefault(resource_type, []).extend(
+                resource.copy() for resource in resource_list
+            )
+        self.modules.update(file_result['modules'])
+        self.variables.update(file_result['variables'])
+        self.locals.update(file_result['locals'])
+        for data_type, data_list in file_result['data_sources'].items():
+            self.data_sources.setdefault(data_type, []).extend(data_list)
+    
+    def _parse_file_contents(self, file_path: str, show_progress: bool = True):
         """Parse a single Terraform file"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Store the parsed content
             relative_path = os.path.relpath(file_path, self.working_dir)
-            self.parsed_files[relative_path] = content
             
-            # Extract different components
-            self._extract_resources_from_content(content, relative_path, show_progress)
-            self._extract_modules_from_content(content, relative_path, show_progress)
-            self._extract_variables_from_content(content, relative_path, show_progress)
-            self._extract_data_sources_from_content(content, relative_path, show_progress)
+            if file_path.endswith(JSON_CONFIG_SUFFIX):
+                self._parse_json_file(file_path, relative_path, show_progress)
+                return
+            
+            with self._open_buffer(file_path) as buffer:
+                # Raw contents are only kept when explicitly requested
+                if self.keep_contents:
+                    self.parsed_files[relative_path] = self._decode(buffer[:])
+                
+                # Extract only the components the caller asked for
+                if 'resource' in self.kinds:
+                    self._extract_resources_from_content(buffer, relative_path, show_progress)
+                if 'module' in self.kinds:
+                    self._extract_modules_from_content(buffer, relative_path, show_progress)
+                if 'variable' in self.kinds:
+                    self._extract_variables_from_content(buffer, relative_path, show_progress)
+                if 'data' in self.kinds:
+                    self._extract_data_sources_from_content(buffer, relative_path, show_progress)
+                if 'locals' in self.kinds:
+                    self._extract_locals_from_content(buffer, relative_path, show_progress)
             
             # Debug: Show what was extracted from this file
             if show_progress and relative_path == 'main.tf':
@@ -117,82 +314,230 @@ class TerraformFileParser:
         except Exception as e:
             print(f"   ⚠️  Warning: Could not parse {file_path}: {e}")
     
-    def _extract_resources_from_content(self, content: str, file_path: str, show_progress: bool = True):
+    @staticmethod
+    def _load_json(data: bytes) -> Any:
+        """Decode JSON bytes with orjson when it is installed"""
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data)
+    
+    @staticmethod
+    def _json_blocks(value: Any) -> Iterator[Tuple[str, Any]]:
+        """
+        Yield (label, body) pairs of a JSON-syntax block object. Terraform also
+        accepts an array of objects wherever a single object is expected.
+        """
+        for item in (value if isinstance(value, list) else [value]):
+            if isinstance(item, dict):
+                yield from item.items()
+    
+    def _parse_json_file(self, file_path: str, relative_path: str, show_progress: bool = True):
+        """
+        Parse a *.tf.json file. Blocks are decoded in one pass and mapped straight
+        into the parser's structures; no regex work is needed.
+        """
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        if self.keep_contents:
+            self.parsed_files[relative_path] = self._decode(data)
+        if not data.strip():
+            return
+        document = self._load_json(data)
+        if not isinstance(document, dict):
+            raise ValueError("top-level value must be an object")
+        
+        for kind, blocks in document.items():
+            if kind not in self.kinds:
+                continue
+            if kind == 'resource':
+                for resource_type, instances in self._json_blocks(blocks):
+                    if self.type_prefixes is not None and not resource_type.startswith(self.type_prefixes):
+                        continue
+                    for resource_name, body in self._json_blocks(instances):
+                        self._add_json_resource(resource_type, resource_name, body, relative_path)
+            elif kind == 'module':
+                for module_name, body in self._json_blocks(blocks):
+                    config = self._json_config(body)
+                    self.modules[module_name] = {
+                        'source': config.get('source', ''),
+                        'config': config,
+                        'arguments': {name: json_to_expression(value) for name, value in self._json_attributes(body)},
+                        'file': relative_path
+                    }
+            elif kind == 'variable':
+                for variable_name, body in self._json_blocks(blocks):
+                    default = dict(self._json_attributes(body)).get('default')
+                    self.variables[variable_name] = {
+                        'config': self._json_config(body),
+                        'default_expression': json_to_expression(default) if default is not None else None,
+                        'file': relative_path
+                    }
+            elif kind == 'data':
+                for data_type, instances in self._json_blocks(blocks):
+                    for data_name, body in self._json_blocks(instances):
+                        self.data_sources.setdefault(data_type, []).append({
+                            'name': data_name,
+                            'config': self._json_config(body),
+                            'file': relative_path
+                        })
+            elif kind == 'locals':
+                for local_name, value in self._json_blocks(blocks):
+                    self.locals[local_name] = json_to_expression(value)
+    
+    def _add_json_resource(self, resource_type: str, resource_name: str, body: Any, file_path: str):
+        """Store one resource from a *.tf.json file (its config is converted on first access)"""
+        record = ResourceRecord.lazy(resource_type, resource_name, file_path, body, self._json_config)
+        attributes = dict(self._json_attributes(body))
+        if 'count' in attributes:
+            record.count_expression = json_to_expression(attributes['count'])
+        if 'for_each' in attributes:
+            record.for_each_expression = json_to_expression(attributes['for_each'])
+        self.resources['other'].setdefault(resource_type, []).append(record)
+    
+    @staticmethod
+    def _json_attributes(body: Any) -> Iterator[Tuple[str, Any]]:
+        """Top-level attributes of a JSON block body (nested blocks are objects or arrays of objects)"""
+        if isinstance(body, list) and body and isinstance(body[-1], dict):
+            body = body[-1]
+        if not isinstance(body, dict):
+            return
+        for name, value in body.items():
+            if isinstance(value, dict) or (isinstance(value, list) and value and isinstance(value[0], dict)):
+                continue
+            yield name, value
+    
+    def _json_config(self, body: Any) -> Dict[str, Any]:
+        """
+        Convert a JSON block body into the config layout _parse_resource_config
+        produces: scalar values as strings, nested blocks as dicts
+        """
+        config = {}
+        if isinstance(body, list) and body and isinstance(body[-1], dict):
+            body = body[-1]
+        if not isinstance(body, dict):
+            return config
+        for key, value in body.items():
+            key = sys.intern(key)
+            if isinstance(value, list) and value and all(isinstance(item, dict) for item in value):
+                # Repeated nested blocks: like the native parser, the last one wins
+                value = value[-1]
+            if isinstance(value, dict):
+                config[key] = self._json_config(value)
+                continue
+            if isinstance(value, str):
+                match = JSON_INTERPOLATION_PATTERN.match(value)
+                value = match.group(1).strip() if match else value
+            elif isinstance(value, bool):
+                value = 'true' if value else 'false'
+            elif value is None:
+                value = 'null'
+            elif isinstance(value, (int, float)):
+                value = str(value)
+            else:
+                value = json.dumps(value)
+            if len(value) <= MAX_INTERNED_VALUE_LENGTH:
+                value = sys.intern(value)
+            config[key] = value
+        return config
+    
+    @contextmanager
+    def _open_buffer(self, file_path: str) -> Iterator[Union[bytes, mmap.mmap]]:
+        """
+        Open a file as a read-only memory map so it can be matched as bytes
+        without reading it into memory. Empty files cannot be mapped.
+        """
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                yield b''
+                return
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                yield buffer
+            finally:
+                buffer.close()
+    
+    @staticmethod
+    def _decode(data: bytes) -> str:
+        """Decode a block of Terraform source"""
+        return data.decode('utf-8', errors='replace')
+    
+    @staticmethod
+    def _find_block_end(buffer, start_pos: int) -> int:
+        """
+        Find the closing brace of a block whose opening brace ends at start_pos.
+        Returns the offset of the closing brace, or -1 on a brace count mismatch.
+        """
+        brace_count = 1
+        for match in BRACE_PATTERN.finditer(buffer, start_pos):
+            if match.group() == b'{':
+                brace_count += 1
+            else:
+                brace_count -= 1
+                if brace_count == 0:
+                    return match.start()
+        return -1
+    
+    def _iter_blocks(self, buffer, pattern: Pattern,
+                     accept: Optional[Callable[[Tuple[str, ...]], bool]] = None) -> Iterator[Tuple[Tuple[str, ...], int, int]]:
+        """
+        Yield (labels, body_start, body_end) for each block matching pattern.
+        Blocks rejected by accept are skipped without locating their end.
+        """
+        for match in pattern.finditer(buffer):
+            labels = tuple(self._decode(label) for label in match.groups())
+            if accept is not None and not accept(labels):
+                continue
+            start_pos = match.end()
+            yield labels, start_pos, self._find_block_end(buffer, start_pos)
+    
+    def _extract_resources_from_content(self, buffer, file_path: str, show_progress: bool = True):
         """Extract resource blocks from Terraform content"""
         try:
             # Match resource blocks: resource "type" "name" { ... }
-            # Simplified pattern to avoid complex nested brace matching
-            resource_pattern = r'resource\s+"([^"]+)"\s+"([^"]+)"\s*\{'
+            accept = None
+            if self.type_prefixes is not None:
+                accept = lambda labels: labels[0].startswith(self.type_prefixes)
             
-            for match in re.finditer(resource_pattern, content, re.DOTALL):
+            for (resource_type, resource_name), start_pos, end_pos in self._iter_blocks(buffer, RESOURCE_PATTERN, accept):
                 try:
-                    resource_type = match.group(1)
-                    resource_name = match.group(2)
-                    
-                    # Find the matching closing brace by counting braces
-                    start_pos = match.end()
-                    brace_count = 1
-                    pos = start_pos
-                    
-                    while pos < len(content) and brace_count > 0:
-                        if content[pos] == '{':
-                            brace_count += 1
-                        elif content[pos] == '}':
-                            brace_count -= 1
-                        pos += 1
-                    
-                    if brace_count == 0:
-                        resource_config = content[start_pos:pos-1]
-                        # Parse the resource configuration
-                        parsed_config = self._parse_resource_config(resource_config)
+                    if end_pos != -1:
+                        # Only the block span is decoded; the rest of the file stays mapped.
+                        # The body is parsed when a pricer first reads the config.
+                        resource_config = self._decode(buffer[start_pos:end_pos])
                         
                         # Store the resource
                         if resource_type not in self.resources['other']:
                             self.resources['other'][resource_type] = []
                         
-                        self.resources['other'][resource_type].append({
-                            'name': resource_name,
-                            'config': parsed_config,
-                            'file': file_path
-                        })
+                        record = ResourceRecord.lazy(resource_type, resource_name, file_path,
+                                                     resource_config, self._parse_resource_config)
+                        if META_ARGUMENT_PATTERN.search(resource_config):
+                            for name, expression in iter_attributes(resource_config):
+                                if name == 'count':
+                                    record.count_expression = expression
+                                elif name == 'for_each':
+                                    record.for_each_expression = expression
+                        self.resources['other'][resource_type].append(record)
                         
                         if show_progress and file_path == 'main.tf':
                             print(f"         ✅ Found resource: {resource_type} '{resource_name}'")
                     else:
                         if show_progress and file_path == 'main.tf':
-                            print(f"         ⚠️  Brace count mismatch for {resource_type} '{resource_name}': {brace_count}")
+                            print(f"         ⚠️  Brace count mismatch for {resource_type} '{resource_name}'")
                 except Exception as e:
                     print(f"   ⚠️  Warning: Could not parse resource in {file_path}: {e}")
                     continue
         except Exception as e:
             print(f"   ⚠️  Warning: Error extracting resources from {file_path}: {e}")
     
-    def _extract_modules_from_content(self, content: str, file_path: str, show_progress: bool = True):
+    def _extract_modules_from_content(self, buffer, file_path: str, show_progress: bool = True):
         """Extract module blocks from Terraform content"""
         try:
             # Match module blocks: module "name" { ... }
-            # Simplified pattern to avoid complex nested brace matching
-            module_pattern = r'module\s+"([^"]+)"\s*\{'
-            
-            for match in re.finditer(module_pattern, content, re.DOTALL):
+            for (module_name,), start_pos, end_pos in self._iter_blocks(buffer, MODULE_PATTERN):
                 try:
-                    module_name = match.group(1)
-                    
-                    # Find the matching closing brace by counting braces
-                    start_pos = match.end()
-                    brace_count = 1
-                    pos = start_pos
-                    
-                    while pos < len(content) and brace_count > 0:
-                        if content[pos] == '{':
-                            brace_count += 1
-                        elif content[pos] == '}':
-                            brace_count -= 1
-                        pos += 1
-                    
-                    if brace_count == 0:
-                        module_config = content[start_pos:pos-1]
-                        # Parse the module configuration
+                    if end_pos != -1:
+                        module_config = self._decode(buffer[start_pos:end_pos])
                         parsed_config = self._parse_resource_config(module_config)
                         
                         # Look for source attribute
@@ -201,6 +546,7 @@ class TerraformFileParser:
                         self.modules[module_name] = {
                             'source': source,
                             'config': parsed_config,
+                            'arguments': dict(iter_attributes(module_config)),
                             'file': file_path
                         }
                         
@@ -212,36 +558,19 @@ class TerraformFileParser:
         except Exception as e:
             print(f"   ⚠️  Warning: Error extracting modules from {file_path}: {e}")
     
-    def _extract_variables_from_content(self, content: str, file_path: str, show_progress: bool = True):
+    def _extract_variables_from_content(self, buffer, file_path: str, show_progress: bool = True):
         """Extract variable blocks from Terraform content"""
         try:
             # Match variable blocks: variable "name" { ... }
-            # Simplified pattern to avoid complex nested brace matching
-            variable_pattern = r'variable\s+"([^"]+)"\s*\{'
-            
-            for match in re.finditer(variable_pattern, content, re.DOTALL):
+            for (variable_name,), start_pos, end_pos in self._iter_blocks(buffer, VARIABLE_PATTERN):
                 try:
-                    variable_name = match.group(1)
-                    
-                    # Find the matching closing brace by counting braces
-                    start_pos = match.end()
-                    brace_count = 1
-                    pos = start_pos
-                    
-                    while pos < len(content) and brace_count > 0:
-                        if content[pos] == '{':
-                            brace_count += 1
-                        elif content[pos] == '}':
-                            brace_count -= 1
-                        pos += 1
-                    
-                    if brace_count == 0:
-                        variable_config = content[start_pos:pos-1]
-                        # Parse the variable configuration
+                    if end_pos != -1:
+                        variable_config = self._decode(buffer[start_pos:end_pos])
                         parsed_config = self._parse_resource_config(variable_config)
                         
                         self.variables[variable_name] = {
                             'config': parsed_config,
+                            'default_expression': dict(iter_attributes(variable_config)).get('default'),
                             'file': file_path
                         }
                 except Exception as e:
@@ -250,33 +579,25 @@ class TerraformFileParser:
         except Exception as e:
             print(f"   ⚠️  Warning: Error extracting variables from {file_path}: {e}")
     
-    def _extract_data_sources_from_content(self, content: str, file_path: str, show_progress: bool = True):
+    def _extract_locals_from_content(self, buffer, file_path: str, show_progress: bool = True):
+        """Extract local values from locals blocks (kept as expressions, evaluated on demand)"""
+        try:
+            # Match locals blocks: locals { ... }
+            for _, start_pos, end_pos in self._iter_blocks(buffer, LOCALS_PATTERN):
+                if end_pos != -1:
+                    for local_name, expression in iter_attributes(self._decode(buffer[start_pos:end_pos])):
+                        self.locals[local_name] = expression
+        except Exception as e:
+            print(f"   ⚠️  Warning: Error extracting locals from {file_path}: {e}")
+    
+    def _extract_data_sources_from_content(self, buffer, file_path: str, show_progress: bool = True):
         """Extract data source blocks from Terraform content"""
         try:
             # Match data blocks: data "type" "name" { ... }
-            # Simplified pattern to avoid complex nested brace matching
-            data_pattern = r'data\s+"([^"]+)"\s+"([^"]+)"\s*\{'
-            
-            for match in re.finditer(data_pattern, content, re.DOTALL):
+            for (data_type, data_name), start_pos, end_pos in self._iter_blocks(buffer, DATA_PATTERN):
                 try:
-                    data_type = match.group(1)
-                    data_name = match.group(2)
-                    
-                    # Find the matching closing brace by counting braces
-                    start_pos = match.end()
-                    brace_count = 1
-                    pos = start_pos
-                    
-                    while pos < len(content) and brace_count > 0:
-                        if content[pos] == '{':
-                            brace_count += 1
-                        elif content[pos] == '}':
-                            brace_count -= 1
-                        pos += 1
-                    
-                    if brace_count == 0:
-                        data_config = content[start_pos:pos-1]
-                        # Parse the data source configuration
+                    if end_pos != -1:
+                        data_config = self._decode(buffer[start_pos:end_pos])
                         parsed_config = self._parse_resource_config(data_config)
                         
                         if data_type not in self.data_sources:
@@ -314,7 +635,7 @@ class TerraformFileParser:
                     # Process previous block
                     config[current_block] = self._parse_resource_config('\n'.join(current_block_content))
                 
-                current_block = line.split('{')[0].strip()
+                current_block = sys.intern(line.split('{')[0].strip())
                 current_block_content = []
                 continue
             
@@ -334,17 +655,22 @@ class TerraformFileParser:
                 # Simple key-value assignment
                 if '=' in line:
                     key, value = line.split('=', 1)
-                    key = key.strip()
+                    # Attribute names and short values (instance types, regions...) repeat
+                    # across resources, so they are interned and shared
+                    key = sys.intern(key.strip())
                     value = value.strip().strip('"').strip("'")
+                    if len(value) <= MAX_INTERNED_VALUE_LENGTH:
+                        value = sys.intern(value)
                     config[key] = value
         
         return config
     
-    def _process_modules(self):
+    def _process_modules(self, show_progress: bool = True):
         """Process module sources and extract resources from them"""
-        if not self.modules:
+        if not self.modules or 'module' not in self.kinds:
             return
-            
+        
+        expanded_paths = []
         for module_name, module_info in self.modules.items():
             source = module_info['source']
             
@@ -355,13 +681,13 @@ class TerraformFileParser:
                 module_path = os.path.join(self.working_dir, normalized_source)
                 
                 if os.path.exists(module_path):
-                    # Recursively parse the module directory
-                    module_parser = TerraformFileParser(module_path)
                     try:
-                        module_result = module_parser.parse_terraform_files(show_progress=False)
+                        module_result, module_count = self.expand_module(module_name, module_info)
+                        expanded_paths.append(os.path.normpath(module_path))
                         
                         # Merge resources from the module
-                        print(f"   🔍 Processing module {module_name} from {normalized_source}")
+                        if show_progress:
+                            print(f"   🔍 Processing module {module_name} from {normalized_source}")
                         
                         # Count total resources found in this module
                         total_module_resources = 0
@@ -369,7 +695,8 @@ class TerraformFileParser:
                             for resource_type, resource_list in resources.items():
                                 total_module_resources += len(resource_list)
                         
-                        print(f"      Found {total_module_resources} resources in {module_name}")
+                        if show_progress:
+                            print(f"      Found {total_module_resources} resources in {module_name}")
                         
                         for provider, resources in module_result['resources'].items():
                             if provider not in self.resources:
@@ -379,26 +706,78 @@ class TerraformFileParser:
                                 if resource_type not in self.resources[provider]:
                                     self.resources[provider][resource_type] = []
                                 
-                                # Create a copy of the resource list to avoid modification during iteration
-                                resources_to_add = []
-                                for resource in resource_list:
-                                    resource_copy = resource.copy()
-                                    resource_copy['name'] = f"{module_name}.{resource['name']}"
-                                    resource_copy['module'] = module_name
-                                    resources_to_add.append(resource_copy)
+                                # Module copies share the (lazily parsed, once) config of the original records;
+                                # count/for_each on the module block multiplies every instance
+                                resources_to_add = [resource.in_module(module_name, module_count)
+                                                    for resource in resource_list]
                                 
                                 self.resources[provider][resource_type].extend(resources_to_add)
-                                print(f"      Added {len(resources_to_add)} {resource_type} resources from {module_name}")
+                                if show_progress:
+                                    print(f"      Added {len(resources_to_add)} {resource_type} resources from {module_name}")
                     
                     except Exception as e:
                         print(f"   ⚠️  Warning: Could not parse module {normalized_source}: {e}")
                 else:
                     print(f"   ⚠️  Warning: Module path not found: {module_path}")
-            else:
+            elif show_progress:
                 print(f"   ℹ️  Skipping remote module: {source}")
+        
+        self._drop_module_sources(expanded_paths)
+    
+    def _drop_module_sources(self, module_paths: List[str]):
+        """
+        Local module directories inside the working directory are also picked up
+        by discovery; their resources are priced through the module expansion
+        (with the caller's inputs and counts), not a second time on their own
+        """
+        if not module_paths:
+            return
+        prefixes = tuple(path + os.sep for path in module_paths)
+        for resource_type, resource_list in self.resources['other'].items():
+            self.resources['other'][resource_type] = [
+                resource for resource in resource_list
+                if not os.path.normpath(os.path.join(self.working_dir, resource.file)).startswith(prefixes)
+            ]
+    
+    def module_discovery_options(self) -> Dict[str, Any]:
+        """Discovery options for local modules: the workspace root's ignore files still apply"""
+        ignore_root = self.discovery_options.get('ignore_root') or os.path.abspath(self.working_dir)
+        return {**self.discovery_options, 'ignore_root': ignore_root}
+    
+    def expand_module(self, module_name: str, module_info: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
+        """
+        Parse a local module with its input variables taken from the module block.
+        Returns the module's parse result and the number of module instances.
+        """
+        if self.evaluator is None:
+            self.evaluator = self.build_evaluator()
+        arguments = module_info.get('arguments', {})
+        
+        module_count = self.evaluator.instance_count(arguments.get('count'), arguments.get('for_each'))
+        if module_count is None:
+            self.unresolved_counts += 1
+            module_count = 1
+        
+        variable_values = {}
+        for argument, expression in arguments.items():
+            if argument in MODULE_META_ARGUMENTS:
+                continue
+            value = self.evaluator.evaluate(expression)
+            if value is not UNRESOLVED:
+                variable_values[argument] = value
+        
+        module_path = os.path.join(self.working_dir, os.path.normpath(module_info['source']))
+        module_parser = TerraformFileParser(module_path, self.module_discovery_options(), self.keep_contents,
+                                            variable_values=variable_values, parse_cache=self.parse_cache)
+        module_result = module_parser.parse_terraform_files(
+            show_progress=False, kinds=self.kinds, type_prefixes=self.type_prefixes
+        )
+        self.unresolved_counts += module_parser.unresolved_counts
+        return module_result, module_count
     
     def _extract_resources(self):
         """Extract and categorize resources by provider"""
+        # Root resources go first; module expansions of the same type are kept after them.
         # Create a copy of the keys to avoid "dictionary changed size during iteration"
         other_resource_types = list(self.resources['other'].keys())
         
@@ -409,33 +788,27 @@ class TerraformFileParser:
             if provider == 'aws':
                 if 'aws' not in self.resources:
                     self.resources['aws'] = {}
-                self.resources['aws'][resource_type] = resources
+                self.resources['aws'][resource_type] = resources + self.resources['aws'].get(resource_type, [])
             elif provider == 'azure':
                 if 'azure' not in self.resources:
                     self.resources['azure'] = {}
-                self.resources['azure'][resource_type] = resources
+                self.resources['azure'][resource_type] = resources + self.resources['azure'].get(resource_type, [])
             elif provider == 'gcp':
                 if 'gcp' not in self.resources:
                     self.resources['gcp'] = {}
-                self.resources['gcp'][resource_type] = resources
+                self.resources['gcp'][resource_type] = resources + self.resources['gcp'].get(resource_type, [])
             
             # Remove from 'other' since we've categorized it
             del self.resources['other'][resource_type]
     
     def _detect_provider(self, resource_type: str) -> str:
         """Detect cloud provider from resource type"""
-        if resource_type.startswith('aws_'):
-            return 'aws'
-        elif resource_type.startswith('azurerm_'):
-            return 'azure'
-        elif resource_type.startswith('google_'):
-            return 'gcp'
-        else:
-            return 'other'
+        return detect_provider(resource_type)
     
     def _generate_summary(self) -> Dict[str, Any]:
         """Generate a summary of all resources"""
         total_resources = 0
+        total_instances = 0
         provider_counts = {}
         
         for provider, resources in self.resources.items():
@@ -445,14 +818,20 @@ class TerraformFileParser:
             provider_total = 0
             for resource_type, resource_list in resources.items():
                 provider_total += len(resource_list)
+                total_instances += sum(resource.count for resource in resource_list)
             
             provider_counts[provider] = provider_total
             total_resources += provider_total
         
         return {
             'total_resources': total_resources,
+            'total_instances': total_instances,
+            'unresolved_counts': self.unresolved_counts,
             'provider_counts': provider_counts,
             'modules_count': len(self.modules),
             'variables_count': len(self.variables),
-            'data_sources_count': sum(len(resources) for resources in self.data_sources.values())
+            'data_sources_count': sum(len(resources) for resources in self.data_sources.values()),
+            'files_count': self.discovery_stats.get('files_count', 0),
+            'discovery_time': self.discovery_stats.get('discovery_time', 0.0),
+            'discovery_method': self.discovery_stats.get('method', 'scandir')
         }
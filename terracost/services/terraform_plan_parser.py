@@ -0,0 +1,168 @@
+from typing import Dict, Any, Iterator, Iterable, Optional
+from .json_stream import JsonStream, open_json_source
+from .terraform_file_parser import detect_provider, PRICED_TYPE_PREFIXES
+from .resource_record import ResourceRecord
+
+# Attribute values longer than this (user_data, policy documents, certificates...)
+# are never read by a pricer, so they are dropped to keep memory bounded
+MAX_ATTRIBUTE_LENGTH = 1024
+
+
+def compact_attributes(value: Any) -> Any:
+    """Drop null values and oversized strings from resource attributes"""
+    if isinstance(value, dict):
+        return {
+            k: compact_attributes(v) for k, v in value.items()
+            if v is not None and not (isinstance(v, str) and len(v) > MAX_ATTRIBUTE_LENGTH)
+        }
+    if isinstance(value, list):
+        return [
+            compact_attributes(v) for v in value
+            if v is not None and not (isinstance(v, str) and len(v) > MAX_ATTRIBUTE_LENGTH)
+        ]
+    return value
+
+
+def module_path_name(module_address: Optional[str]) -> str:
+    """Turn 'module.app.module.db[0]' into 'app.db[0]'"""
+    if not module_address:
+        return ''
+    return '.'.join(part for part in module_address.split('.') if part != 'module')
+
+
+def instance_name(module_address: Optional[str], name: str, index: Any = None) -> str:
+    """Build the resource name used in cost keys, e.g. 'app.web[0]' or 'web["blue"]'"""
+    if index is not None:
+        if isinstance(index, str):
+            name = f'{name}["{index}"]'
+        else:
+            name = f"{name}[{index}]"
+    module_name = module_path_name(module_address)
+    return f"{module_name}.{name}" if module_name else name
+
+
+class JsonResourceCollector:
+    """Collects resource instances from Terraform JSON documents (plans and state)"""
+
+    def __init__(self, source_file: str, type_prefixes: Optional[Iterable[str]] = PRICED_TYPE_PREFIXES):
+        self.source_file = source_file
+        self.type_prefixes = tuple(type_prefixes) if type_prefixes is not None else None
+        self.resources = {
+            'aws': {},
+            'azure': {},
+            'gcp': {},
+            'other': {}
+        }
+        self.modules = {}
+        self.skipped_count = 0
+
+    def _is_priced_type(self, resource_type: str) -> bool:
+        return self.type_prefixes is None or resource_type.startswith(self.type_prefixes)
+
+    def _add_instance(self, resource_type: str, module_address: Optional[str], name: str,
+                      index: Any, attributes: Optional[Dict[str, Any]]):
+        """Store a single resource instance with its (compacted) attributes as config"""
+        module_name = module_path_name(module_address) or None
+        resource = ResourceRecord(resource_type, instance_name(module_address, name, index), self.source_file,
+                                  config=compact_attributes(attributes or {}), module=module_name)
+        if module_name:
+            self.modules.setdefault(module_name, {'source': module_address, 'config': {}, 'file': self.source_file})
+
+        provider = detect_provider(resource_type)
+        self.resources[provider].setdefault(resource_type, []).append(resource)
+
+    def _print_resource_counts(self):
+        print(f"   📋 Final resource counts:")
+        for provider, resources in self.resources.items():
+            if provider != 'other':
+                total = sum(len(resource_list) for resource_list in resources.values())
+                print(f"      {provider}: {total} resources")
+
+    def _result(self, source: str) -> Dict[str, Any]:
+        """Build the same structure TerraformFileParser.parse_terraform_files returns"""
+        return {
+            'resources': self.resources,
+            'modules': self.modules,
+            'variables': {},
+            'data_sources': {},
+            'summary': self._generate_summary(source)
+        }
+
+    def _generate_summary(self, source: str) -> Dict[str, Any]:
+        """Generate a summary of all resources"""
+        provider_counts = {}
+        for provider, resources in self.resources.items():
+            if provider == 'other':
+                continue
+            provider_counts[provider] = sum(len(resource_list) for resource_list in resources.values())
+
+        return {
+            'total_resources': sum(provider_counts.values()),
+            'provider_counts': provider_counts,
+            'modules_count': len(self.modules),
+            'variables_count': 0,
+            'data_sources_count': 0,
+            'files_count': 1,
+            'source': source
+        }
+
+
+class TerraformPlanParser(JsonResourceCollector):
+    """
+    Stream-parses `terraform show -json` plan output.
+    Plan resource changes are already expanded per count/for_each instance,
+    with variables resolved and real module addresses.
+    """
+
+    def __init__(self, plan_file: str, type_prefixes: Optional[Iterable[str]] = PRICED_TYPE_PREFIXES):
+        super().__init__(plan_file, type_prefixes)
+        self.plan_file = plan_file
+        self.format_version = None
+        self.terraform_version = None
+
+    def iter_resource_changes(self) -> Iterator[Dict[str, Any]]:
+        """Yield the plan's resource_changes entries one at a time"""
+        with open_json_source(self.plan_file) as fp:
+            stream = JsonStream(fp)
+            for key in stream.iter_object():
+                if key == 'format_version':
+                    self.format_version = stream.read_value()
+                elif key == 'terraform_version':
+                    self.terraform_version = stream.read_value()
+                elif key == 'resource_changes':
+                    for _ in stream.iter_array():
+                        yield stream.read_value()
+                else:
+                    # prior_state, planned_values, configuration... can be huge
+                    stream.skip_value()
+
+    def parse_plan(self, show_progress: bool = True) -> Dict[str, Any]:
+        """
+        Parse the plan into the same structure TerraformFileParser returns
+        """
+        if show_progress:
+            print(f"📄 Reading Terraform plan {self.plan_file}...")
+
+        for change in self.iter_resource_changes():
+            self._add_resource_change(change)
+
+        if show_progress:
+            self._print_resource_counts()
+            if self.skipped_count:
+                print(f"   ℹ️  Skipped {self.skipped_count} data sources, deletions and unpriced types")
+
+        return self._result('plan')
+
+    def _add_resource_change(self, change: Dict[str, Any]):
+        """Convert a single resource_changes entry into a resource record"""
+        resource_type = change.get('type', '')
+        details = change.get('change') or {}
+        actions = details.get('actions') or []
+
+        # Resources being destroyed no longer cost anything after apply
+        if change.get('mode') != 'managed' or actions == ['delete'] or not self._is_priced_type(resource_type):
+            self.skipped_count += 1
+            return
+
+        self._add_instance(resource_type, change.get('module_address'), change.get('name', 'unknown'),
+                           change.get('index'), details.get('after'))
@@ -0,0 +1,110 @@
+from typing import Dict, Any, Iterator, Iterable, Optional, Tuple
+from .json_stream import JsonStream, JsonStreamError, open_json_source
+from .terraform_file_parser import PRICED_TYPE_PREFIXES
+from .terraform_plan_parser import JsonResourceCollector, compact_attributes
+
+SUPPORTED_STATE_VERSION = 4
+
+# Resource-level keys we need; Terraform writes them before "instances"
+RESOURCE_KEYS = ('module', 'mode', 'type', 'name')
+
+
+class TerraformStateParser(JsonResourceCollector):
+    """
+    Stream-decodes a terraform.tfstate (format v4) and prices what is
+    actually deployed. Instances are read one at a time, so memory is
+    bounded by the largest single instance rather than the file size.
+    """
+
+    def __init__(self, state_file: str, type_prefixes: Optional[Iterable[str]] = PRICED_TYPE_PREFIXES):
+        super().__init__(state_file, type_prefixes)
+        self.state_file = state_file
+        self.version = None
+        self.terraform_version = None
+
+    def iter_instances(self) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """Yield (resource, instance) pairs for every resources[].instances[] entry"""
+        with open_json_source(self.state_file) as fp:
+            stream = JsonStream(fp)
+            for key in stream.iter_object():
+                if key == 'version':
+                    self.version = stream.read_value()
+                    if self.version != SUPPORTED_STATE_VERSION:
+                        raise Exception(
+                            f"Unsupported state format version {self.version} "
+                            f"(expected {SUPPORTED_STATE_VERSION})"
+                        )
+                elif key == 'terraform_version':
+                    self.terraform_version = stream.read_value()
+                elif key == 'resources':
+                    for _ in stream.iter_array():
+                        yield from self._iter_resource_instances(stream)
+                else:
+                    stream.skip_value()
+
+    def _iter_resource_instances(self, stream: JsonStream) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """Stream the instances of a single state resource"""
+        resource = {}
+        for key in stream.iter_object():
+            if key in RESOURCE_KEYS:
+                resource[key] = stream.read_value()
+            elif key == 'instances':
+                if 'type' not in resource:
+                    # Keys arrived out of order; fall back to decoding the instance list
+                    resource['instances'] = stream.read_value()
+                    continue
+                if not self._wants(resource):
+                    stream.skip_value()
+                    continue
+                for _ in stream.iter_array():
+                    yield resource, self._read_instance(stream)
+            else:
+                stream.skip_value()
+
+        if 'instances' in resource and self._wants(resource):
+            for instance in resource.pop('instances'):
+                yield resource, {
+                    'index_key': instance.get('index_key'),
+                    'attributes': instance.get('attributes') or instance.get('attributes_flat')
+                }
+
+    def _wants(self, resource: Dict[str, Any]) -> bool:
+        """Only managed resources of priced types are decoded"""
+        wanted = resource.get('mode') == 'managed' and self._is_priced_type(resource.get('type', ''))
+        if not wanted:
+            self.skipped_count += 1
+        return wanted
+
+    def _read_instance(self, stream: JsonStream) -> Dict[str, Any]:
+        """Read index_key and attributes of an instance, skipping private data and dependencies"""
+        instance = {}
+        for key in stream.iter_object():
+            if key == 'index_key':
+                instance['index_key'] = stream.read_value()
+            elif key in ('attributes', 'attributes_flat'):
+                instance['attributes'] = compact_attributes(stream.read_value())
+            else:
+                stream.skip_value()
+        return instance
+
+    def parse_state(self, show_progress: bool = True) -> Dict[str, Any]:
+        """
+        Parse the state into the same structure TerraformFileParser returns
+        """
+        if show_progress:
+            source = 'stdin' if self.state_file == '-' else self.state_file
+            print(f"📄 Reading Terraform state from {source}...")
+
+        try:
+            for resource, instance in self.iter_instances():
+                self._add_instance(resource['type'], resource.get('module'), resource.get('name', 'unknown'),
+                                   instance.get('index_key'), instance.get('attributes'))
+        except JsonStreamError as e:
+            raise Exception(f"Could not read Terraform state {self.state_file}: {e}")
+
+        if show_progress:
+            self._print_resource_counts()
+            if self.skipped_count:
+                print(f"   ℹ️  Skipped {self.skipped_count} data sources and unpriced resource types")
+
+        return self._result('state')
@@ -0,0 +1,198 @@
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from .analytic_uncertainty import GroupMoments, use_analytic
+from .monte_carlo import (
+    simulate_adaptive, simulate_groups, stream_totals, summarize_costs, summarize_digest,
+    DEFAULT_SIMULATIONS, STREAMING_ELEMENTS
+)
+
+# Service categories by resource type tokens (e.g. aws_db_instance -> db, instance),
+# checked in this order so that e.g. a database instance is not counted as compute
+SERVICE_CATEGORY_TOKENS = [
+    ('serverless', {'lambda', 'function', 'functions', 'cloudfunctions', 'cloudfunctions2', 'sfn', 'run'}),
+    ('database', {'db', 'rds', 'sql', 'mssql', 'mysql', 'postgresql', 'database', 'dynamodb', 'cosmosdb',
+                  'redis', 'elasticache', 'spanner', 'bigtable', 'firestore', 'memorystore'}),
+    ('storage', {'s3', 'bucket', 'storage', 'ebs', 'volume', 'disk', 'efs', 'blob', 'filestore', 'share'}),
+    ('network', {'nat', 'lb', 'alb', 'elb', 'loadbalancer', 'gateway', 'cdn', 'cloudfront', 'vpn', 'eip',
+                 'ip', 'frontdoor', 'forwarding', 'router'}),
+    ('compute', {'instance', 'instances', 'vm', 'virtual', 'machine', 'compute', 'autoscaling', 'eks', 'aks',
+                 'gke', 'kubernetes', 'container', 'ecs', 'app', 'service'}),
+]
+
+# Volatility relative to the provider's: usage-billed services swing more than
+# reserved capacity, databases are usually sized once and left alone
+CATEGORY_VOLATILITY = {
+    'compute': 1.0,
+    'database': 0.8,
+    'storage': 1.25,
+    'network': 1.5,
+    'serverless': 2.0,
+    'other': 1.0
+}
+
+# Correlation of monthly cost shocks: resources in the same group (provider
+# and category), groups of the same provider, and groups of different providers
+WITHIN_GROUP_CORRELATION = 0.6
+SAME_PROVIDER_CORRELATION = 0.4
+CROSS_PROVIDER_CORRELATION = 0.2
+
+
+def service_category(resource_type: str) -> str:
+    """Service category of a resource type, e.g. 'aws_db_instance' -> 'database'"""
+    tokens = set(resource_type.lower().split('_')[1:])
+    for category, category_tokens in SERVICE_CATEGORY_TOKENS:
+        if tokens & category_tokens:
+            return category
+    return 'other'
+
+
+def group_resources(costs: Dict[str, float]) -> Dict[Tuple[str, str], List[float]]:
+    """Resource costs keyed 'provider.type.name' grouped by (provider, category)"""
+    groups: Dict[Tuple[str, str], List[float]] = {}
+    for key, cost in costs.items():
+        if cost <= 0:
+            continue
+        parts = key.split('.')
+        provider = parts[0]
+        category = service_category(parts[1]) if len(parts) > 1 else 'other'
+        groups.setdefault((provider, category), []).append(cost)
+    return groups
+
+
+def group_volatility(resource_costs: List[float], volatility: float) -> float:
+    """
+    Volatility of a group's total when each resource has `volatility` and
+    pairs are WITHIN_GROUP_CORRELATION correlated: diversification shrinks it
+    by sqrt(rho + (1 - rho) * H), H being the Herfindahl index of the costs
+    """
+    weights = np.asarray(resource_costs) / sum(resource_costs)
+    concentration = float(np.dot(weights, weights))
+    rho = WITHIN_GROUP_CORRELATION
+    return volatility * np.sqrt(rho + (1 - rho) * concentration)
+
+
+def group_correlation(group_keys: List[Tuple[str, str]]) -> np.ndarray:
+    """Correlation matrix of group shocks (positive definite for the constants above)"""
+    providers = np.array([provider for provider, _ in group_keys])
+    same_provider = providers[:, None] == providers[None, :]
+    correlation = np.where(same_provider, SAME_PROVIDER_CORRELATION, CROSS_PROVIDER_CORRELATION)
+    np.fill_diagonal(correlation, 1.0)
+    return correlation
+
+
+def summarize_groups(group_costs: np.ndarray, volatilities: np.ndarray, correlation: np.ndarray,
+                     timeframe_months: float, totals: List[List[int]],
+                     n_simulations: Optional[int] = None, distribution: str = 'normal',
+                     seed: Optional[int] = None, method: str = 'auto', tolerance: Optional[float] = None,
+                     sampling: str = 'random', jobs: int = 1) -> Tuple[List[Dict[str, float]], Dict[str, object]]:
+    """
+    Confidence bands of totals (lists of group columns) of correlated cost
+    groups, and how they were computed ('method', 'n_simulations' and the
+    method's details). With method 'auto' the bands come from the groups'
+    exact moments when every band's estimated error is within the tolerance
+    (ANALYTIC_TOLERANCE by default), and from simulation otherwise; an
+    explicit n_simulations always simulates under 'auto', and cannot be
+    combined with 'analytic'. With a tolerance the simulation is adaptive:
+    it stops once the standard error of every total's bands is within it,
+    n_simulations being the cap. sampling picks how the shocks are drawn
+    (monte_carlo.SAMPLING_STRATEGIES). Runs too large to keep in memory are
+    summarized with streaming t-digests, on up to `jobs` processes.
+    """
+    if n_simulations is not None:
+        if method == 'analytic':
+            raise ValueError("A number of simulations cannot be used with analytic uncertainty")
+        # Asking for a number of simulations (and so for the streaming and
+        # process-pool paths of large runs) means asking for a simulation
+        method = 'simulation'
+    groups = len(group_costs)
+
+    if method != 'simulation':
+        moments = GroupMoments(volatilities, correlation, timeframe_months, distribution)
+        summaries = []
+        error = 0.0
+        for columns in totals:
+            costs = np.zeros(groups)
+            costs[columns] = group_costs[columns]
+            bands, total_error = moments.summarize(costs)
+            summaries.append(bands)
+            error = max(error, total_error)
+        if use_analytic(method, error, tolerance):
+            return summaries, {'n_simulations': 0, 'method': 'analytic', 'error_estimate': error}
+
+    details = {'percentiles': 'exact'}
+    if not groups:
+        n_simulations = n_simulations or DEFAULT_SIMULATIONS
+        summaries = [summarize_costs(np.zeros(n_simulations)) for _ in totals]
+    elif tolerance is not None:
+        simulated, standard_error = simulate_adaptive(group_costs, volatilities, correlation, timeframe_months,
+                                                      tolerance, totals, n_simulations, distribution, seed,
+                                                      sampling)
+        n_simulations = len(simulated)
+        summaries = [summarize_costs(simulated[:, columns].sum(axis=1)) for columns in totals]
+        details.update(standard_error=standard_error, converged=standard_error <= tolerance)
+    else:
+        n_simulations = n_simulations or DEFAULT_SIMULATIONS
+        if n_simulations * groups > STREAMING_ELEMENTS:
+            digests = stream_totals(group_costs, volatilities, correlation, timeframe_months, n_simulations,
+                                    totals, distribution, seed, sampling, jobs)
+            summaries = [summarize_digest(digest) for digest in digests]
+            details['percentiles'] = 't-digest'
+        else:
+            simulated = simulate_groups(group_costs, volatilities, correlation, timeframe_months,
+                                        n_simulations, distribution, seed, sampling)
+            summaries = [summarize_costs(simulated[:, columns].sum(axis=1)) for columns in totals]
+    return summaries, {'n_simulations': n_simulations, 'method': 'simulation', 'sampling': sampling, **details}
+
+
+def estimate_breakdown_uncertainty(costs: Dict[str, float], timeframe_months: float,
+                                   provider_volatility: Dict[str, float],
+                                   n_simulations: Optional[int] = None, distribution: str = 'normal',
+                                   seed: Optional[int] = None, method: str = 'auto',
+                                   tolerance: Optional[float] = None, sampling: str = 'random',
+                                   jobs: int = 1) -> Dict[str, object]:
+    """
+    Uncertainty of a cost breakdown ({'provider.type.name': monthly cost}).
+    Resources are grouped by provider and service category; each group is
+    simulated with its provider's volatility scaled for the category and
+    for diversification inside the group, and group shocks are correlated.
+    Returns the same keys as BaseCostService.estimate_uncertainty for the
+    total, plus per-provider bands under 'providers'. The method and the
+    other options are those of summarize_groups.
+    """
+    base_cost = sum(costs.values())
+    groups = group_resources(costs)
+    keys = sorted(groups)
+    group_costs = np.array([sum(groups[key]) for key in keys])
+    volatilities = np.array([
+        group_volatility(groups[key], provider_volatility[key[0]] * CATEGORY_VOLATILITY[key[1]])
+        for key in keys
+    ])
+    correlation = group_correlation(keys) if keys else np.eye(0)
+    provider_columns = {}
+    for index, (provider, _) in enumerate(keys):
+        provider_columns.setdefault(provider, []).append(index)
+
+    if keys:
+        # Effective monthly volatility of the total
+        weights = group_costs / group_costs.sum()
+        covariance = correlation * np.outer(volatilities, volatilities)
+        volatility = float(np.sqrt(weights @ covariance @ weights))
+    else:
+        volatility = 0.0
+
+    totals = [list(range(len(keys)))] + list(provider_columns.values())
+    summaries, details = summarize_groups(group_costs, volatilities, correlation, timeframe_months, totals,
+                                          n_simulations, distribution, seed, method, tolerance, sampling, jobs)
+    providers = {
+        provider: {'base_cost': float(group_costs[columns].sum()), **summary}
+        for (provider, columns), summary in zip(provider_columns.items(), summaries[1:])
+    }
+    return {
+        'base_cost': base_cost,
+        'timeframe_months': timeframe_months,
+        'volatility': volatility,
+        'groups': len(keys),
+        **summaries[0],
+        **details,
+        'providers': providers
+    }
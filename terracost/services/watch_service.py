@@ -0,0 +1,343 @@
+import os
+import time
+from typing import Dict, Any, List, Optional, Set, Tuple
+from .cost_engine import CostEngine
+from .terraform_file_parser import TerraformFileParser, PRICING_KINDS, PRICED_TYPE_PREFIXES
+from .workspace_discovery import WorkspaceDiscovery, DEFAULT_PRUNED_DIRS
+from .expression_evaluator import find_tfvars_files
+
+# A module expansion is identified by the file declaring it and the module name
+ModuleKey = Tuple[str, str]
+
+
+def _is_within(path: str, directory: str) -> bool:
+    """Check whether path is directory itself or lies below it"""
+    return path == directory or path.startswith(directory.rstrip(os.sep) + os.sep)
+
+
+class IncrementalEstimator:
+    """
+    Keeps per-file cost contributions of a workspace so that a changed file
+    only needs that file (and the local modules it affects) re-parsed and
+    re-priced. Cost services live as long as the estimator, so their pricing
+    caches stay warm between changes.
+    """
+
+    def __init__(self, working_dir: str, discovery_options: Optional[Dict[str, Any]] = None,
+                 var_files: Optional[List[str]] = None, engine: Optional[CostEngine] = None):
+        self.working_dir = os.path.abspath(working_dir)
+        self.discovery_options = discovery_options or {}
+        self.var_files = [os.path.abspath(path) for path in (var_files or [])]
+        self.parser = TerraformFileParser(self.working_dir, self.discovery_options, var_files=self.var_files)
+        self.engine = engine or CostEngine()
+        self.files: List[str] = []
+        self.file_results: Dict[str, Dict[str, Any]] = {}
+        self.scope_signature = None
+        self.file_costs: Dict[str, Dict[str, float]] = {}
+        self.file_resource_counts: Dict[str, int] = {}
+        self.module_paths: Dict[ModuleKey, str] = {}
+        self.module_costs: Dict[ModuleKey, Dict[str, float]] = {}
+        self.module_files: Dict[ModuleKey, List[str]] = {}
+        self.module_resource_counts: Dict[ModuleKey, int] = {}
+        # Listing every directory is a walk of the tree, so it is kept until files,
+        # directories or local modules are added or removed
+        self._directories: Optional[Set[str]] = None
+
+    @property
+    def costs(self) -> Dict[str, float]:
+        """Monthly cost per resource across the whole workspace"""
+        merged = {}
+        module_paths = set(self.module_paths.values())
+        for file_path, file_costs in self.file_costs.items():
+            # Module sources inside the workspace are priced through their expansion
+            if not any(_is_within(file_path, module_path) for module_path in module_paths):
+                merged.update(file_costs)
+        for module_costs in self.module_costs.values():
+            merged.update(module_costs)
+        return merged
+
+    @property
+    def total_monthly(self) -> float:
+        return sum(self.costs.values())
+
+    @property
+    def total_resources(self) -> int:
+        module_paths = set(self.module_paths.values())
+        file_resources = sum(count for file_path, count in self.file_resource_counts.items()
+                             if not any(_is_within(file_path, module_path) for module_path in module_paths))
+        return file_resources + sum(self.module_resource_counts.values())
+
+    def discover(self) -> List[str]:
+        """List the workspace's Terraform files with the configured discovery options"""
+        return WorkspaceDiscovery(self.working_dir, **self.discovery_options).discover()
+
+    def _needs_rescan(self, path: str) -> bool:
+        """A change outside the known files only matters if it can alter the file list"""
+        if WorkspaceDiscovery(self.working_dir, **self.discovery_options).is_candidate(path):
+            return True
+        if self._is_tfvars(path):
+            return False
+        # Polling reports a directory whose entries were added, removed or renamed
+        if os.path.isdir(path):
+            return True
+        # A directory holding known files was moved or removed
+        return any(_is_within(file_path, path) for file_path in self.files)
+
+    def watched_files(self) -> List[str]:
+        """Every file whose contents feed into the estimate"""
+        files = list(self.files)
+        for module_files in self.module_files.values():
+            files.extend(module_files)
+        files.extend(find_tfvars_files(self.working_dir))
+        files.extend(self.var_files)
+        return files
+
+    def watched_directories(self, refresh: bool = False) -> Set[str]:
+        """
+        Every directory a new Terraform file could appear in, and those of the
+        watched files. The list is reused until apply_changes reports
+        directories_changed, or refresh is set.
+        """
+        if self._directories is None or refresh:
+            directories = set(WorkspaceDiscovery(self.working_dir, **self.discovery_options).list_directories())
+            for module_path in set(self.module_paths.values()):
+                directories.update(WorkspaceDiscovery(module_path, **self.parser.module_discovery_options())
+                                   .list_directories())
+            directories.update(os.path.dirname(path) for path in self.watched_files())
+            self._directories = directories
+        return set(self._directories)
+
+    def _directories_changed(self, changed_paths: Set[str], files_changed: bool,
+                             module_paths: Set[str]) -> bool:
+        """Whether a change set can alter watched_directories()"""
+        if self._directories is None:
+            return True
+        if files_changed or set(self.module_paths.values()) != module_paths:
+            return True
+        for path in changed_paths:
+            if path not in self._directories:
+                # A created directory (inotify reports it directly)
+                if os.path.isdir(path):
+                    return True
+                continue
+            # A watched directory changed: removed, or (when polling) gained a subdirectory
+            try:
+                with os.scandir(path) as it:
+                    if any(entry.is_dir(follow_symlinks=False) and entry.name not in DEFAULT_PRUNED_DIRS
+                           and entry.path not in self._directories for entry in it):
+                        return True
+            except OSError:
+                return True
+        return False
+
+    def load(self):
+        """Parse and price the whole workspace"""
+        self.files = self.discover()
+        self._directories = None
+        if not self.files:
+            raise Exception(f"No .tf files found in {self.working_dir}")
+        for file_path in self.files:
+            self._parse_file(file_path)
+        self._update_scope()
+        self._price_all()
+
+    def _parse_file(self, file_path: str):
+        """(Re)parse one workspace file without pricing it"""
+        if os.path.isfile(file_path):
+            self.file_results[file_path] = self.parser.parse_file(
+                file_path, kinds=PRICING_KINDS, type_prefixes=PRICED_TYPE_PREFIXES
+            )
+        else:
+            self.file_results.pop(file_path, None)
+
+    def _scope_signature(self) -> Tuple:
+        """Everything count/for_each and module inputs can depend on"""
+        variables = []
+        local_values = []
+        for file_path in sorted(self.file_results):
+            result = self.file_results[file_path]
+            variables.extend((name, variable.get('default_expression'))
+                             for name, variable in sorted(result['variables'].items()))
+            local_values.extend(sorted(result['locals'].items()))
+        return tuple(variables), tuple(local_values)
+
+    def _update_scope(self) -> bool:
+        """Rebuild the expression evaluator when variables or locals changed; returns whether it did"""
+        signature = self._scope_signature()
+        if signature == self.scope_signature and self.parser.evaluator is not None:
+            return False
+        self.scope_signature = signature
+        self.parser.variables = {}
+        self.parser.locals = {}
+        for result in self.file_results.values():
+            self.parser.variables.update(result['variables'])
+            self.parser.locals.update(result['locals'])
+        self.parser.evaluator = self.parser.build_evaluator()
+        return True
+
+    def _price_all(self) -> Set[ModuleKey]:
+        """Re-resolve counts and re-price every file and module (variables or tfvars changed)"""
+        for file_path in list(self.file_costs):
+            if file_path not in self.file_results:
+                self._price_file(file_path)
+        for file_path in self.file_results:
+            self._price_file(file_path)
+        refreshed = set()
+        for file_path, result in self.file_results.items():
+            for module_name in result['modules']:
+                self._load_module((file_path, module_name))
+                refreshed.add((file_path, module_name))
+        for key in list(self.module_costs):
+            if key not in refreshed:
+                self._load_module(key)
+                refreshed.add(key)
+        return refreshed
+
+    def _price_file(self, file_path: str):
+        """Price the resources of one parsed file"""
+        result = self.file_results.get(file_path)
+        if result is None:
+            self.file_costs.pop(file_path, None)
+            self.file_resource_counts.pop(file_path, None)
+            return
+        for provider_resources in result['resources'].values():
+            self.parser.resolve_instance_counts(provider_resources)
+        self.file_costs[file_path] = self._price(result['resources'])
+        self.file_resource_counts[file_path] = self._count(result['resources'])
+
+    def _load_module(self, key: ModuleKey):
+        """Expand a local module declared in a workspace file"""
+        file_path, module_name = key
+        self.module_costs.pop(key, None)
+        self.module_paths.pop(key, None)
+        self.module_files.pop(key, None)
+        self.module_resource_counts.pop(key, None)
+
+        result = self.file_results.get(file_path)
+        module_info = result['modules'].get(module_name) if result else None
+        if module_info is None:
+            return
+        source = module_info['source']
+        if not (source.startswith('./') or source.startswith('../')):
+            return
+        # Local sources are relative to the workspace root, as in TerraformFileParser
+        module_path = os.path.normpath(os.path.join(self.working_dir, source))
+        self.module_paths[key] = module_path
+        if not os.path.isdir(module_path):
+            return
+
+        try:
+            module_result, module_count = self.parser.expand_module(module_name, module_info)
+        except Exception as e:
+            print(f"   ⚠️  Warning: Could not parse module {source}: {e}")
+            return
+
+        resources = {}
+        for provider, provider_resources in module_result['resources'].items():
+            resources[provider] = {}
+            for resource_type, resource_list in provider_resources.items():
+                resources[provider][resource_type] = [resource.in_module(module_name, module_count)
+                                                      for resource in resource_list]
+
+        self.module_costs[key] = self._price(resources)
+        self.module_files[key] = WorkspaceDiscovery(module_path, **self.parser.module_discovery_options()).discover()
+        self.module_resource_counts[key] = self._count(resources)
+
+    def _is_tfvars(self, path: str) -> bool:
+        """Variable files that feed the root module"""
+        if path in self.var_files:
+            return True
+        return os.path.dirname(path) == self.working_dir and path.endswith(('.tfvars', '.tfvars.json'))
+
+    @staticmethod
+    def _count(resources: Dict[str, Dict[str, list]]) -> int:
+        return sum(
+            len(resource_list) for provider, provider_resources in resources.items()
+            if provider != 'other' for resource_list in provider_resources.values()
+        )
+
+    def _price(self, resources: Dict[str, Dict[str, list]]) -> Dict[str, float]:
+        """Price parsed resources with the long-lived cost engine"""
+        return self.engine.price(resources).costs
+
+    def apply_changes(self, changed_paths: Set[str], rescan: bool = False) -> Dict[str, Any]:
+        """
+        Re-parse and re-price only what the changed paths affect.
+        Returns the cost delta for the change set.
+        """
+        start = time.perf_counter()
+        before = self.costs
+        module_paths = set(self.module_paths.values())
+        changed_paths = {os.path.abspath(path) for path in changed_paths}
+
+        # New, deleted or renamed files (and ignore-file edits) change the file list
+        known = set(self.files)
+        if rescan or any(self._needs_rescan(path) for path in changed_paths - known):
+            discovered = self.discover()
+            added = set(discovered) - known
+            removed = known - set(discovered)
+            self.files = discovered
+            files_to_load = (changed_paths & set(discovered)) | added | removed
+        else:
+            added = removed = set()
+            files_to_load = changed_paths & known
+
+        previous_modules = {path: self.file_results[path]['modules']
+                            for path in files_to_load if path in self.file_results}
+        for file_path in sorted(files_to_load):
+            self._parse_file(file_path)
+
+        # Changed variables, locals or tfvars can change any count, so everything is re-priced
+        variable_files = sorted(path for path in changed_paths if self._is_tfvars(path))
+        if variable_files:
+            self.scope_signature = None
+        scope_changed = self._update_scope()
+        if scope_changed:
+            refreshed_modules = self._price_all()
+        else:
+            refreshed_modules = set()
+            for file_path in sorted(files_to_load):
+                self._price_file(file_path)
+                modules = self.file_results[file_path]['modules'] if file_path in self.file_results else {}
+                before_modules = previous_modules.get(file_path, {})
+                for module_name in set(before_modules) | set(modules):
+                    old_module = before_modules.get(module_name)
+                    new_module = modules.get(module_name)
+                    if old_module is None or new_module is None or old_module['arguments'] != new_module['arguments']:
+                        self._load_module((file_path, module_name))
+                        refreshed_modules.add((file_path, module_name))
+
+        # Files inside a local module invalidate every expansion of that module
+        for key, module_path in list(self.module_paths.items()):
+            if key in refreshed_modules:
+                continue
+            if any(_is_within(path, module_path) for path in changed_paths):
+                self._load_module(key)
+                refreshed_modules.add(key)
+
+        directories_changed = self._directories_changed(changed_paths, bool(added or removed), module_paths)
+        if directories_changed:
+            self._directories = None
+
+        after = self.costs
+        resource_changes = {}
+        for name in set(before) | set(after):
+            old_cost = before.get(name, 0.0)
+            new_cost = after.get(name, 0.0)
+            if name not in before or name not in after or abs(new_cost - old_cost) > 1e-9:
+                resource_changes[name] = (old_cost, new_cost)
+
+        return {
+            'files': sorted(files_to_load),
+            'added_files': sorted(added),
+            'removed_files': sorted(removed),
+            'modules': sorted(module_name for _, module_name in refreshed_modules),
+            'variable_files': variable_files,
+            'scope_changed': scope_changed,
+            'directories_changed': directories_changed,
+            'resource_changes': resource_changes,
+            'previous_total': sum(before.values()),
+            'total': sum(after.values()),
+            'delta': sum(after.values()) - sum(before.values()),
+            'elapsed': time.perf_counter() - start
+        }
@@ -0,0 +1,314 @@
+import os
+import re
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Any, List, Optional, Tuple
+
+IGNORE_FILES = ('.gitignore', '.terracostignore')
+
+# Directories that never contain Terraform sources we want to price
+DEFAULT_PRUNED_DIRS = {'.git', '.terraform', 'node_modules', '__pycache__'}
+
+DEFAULT_INCLUDE = ['*.tf', '*.tf.json']
+
+
+def _glob_to_regex(pattern: str) -> str:
+    """Translate a gitignore-style glob into a regular expression body"""
+    result = []
+    i = 0
+    n = len(pattern)
+    while i < n:
+        char = pattern[i]
+        if char == '*':
+            if pattern[i:i + 3] == '**/':
+                result.append('(?:.*/)?')
+                i += 3
+                continue
+            if pattern[i:i + 2] == '**':
+                result.append('.*')
+                i += 2
+                continue
+            result.append('[^/]*')
+        elif char == '?':
+            result.append('[^/]')
+        elif char == '[':
+            end = pattern.find(']', i + 1)
+            if end == -1:
+                result.append('\\[')
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                result.append(f'[{body}]')
+                i = end
+        else:
+            result.append(re.escape(char))
+        i += 1
+    return ''.join(result)
+
+
+class IgnoreRule:
+    """A single pattern from a .gitignore/.terracostignore file or an --exclude glob"""
+
+    __slots__ = ('base', 'negate', 'dir_only', 'anchored', 'regex')
+
+    def __init__(self, pattern: str, base: str = ''):
+        self.base = base
+        self.negate = pattern.startswith('!')
+        if self.negate:
+            pattern = pattern[1:]
+        self.dir_only = pattern.endswith('/')
+        pattern = pattern.rstrip('/')
+        # A slash anywhere but the end anchors the pattern to its ignore file's directory
+        self.anchored = '/' in pattern
+        pattern = pattern.lstrip('/')
+        self.regex = re.compile(f'^{_glob_to_regex(pattern)}$')
+
+    def matches(self, rel_path: str, is_dir: bool) -> bool:
+        """Check whether a path (relative to the discovery root) matches this rule"""
+        if self.dir_only and not is_dir:
+            return False
+        if self.base:
+            if not rel_path.startswith(self.base + '/'):
+                return False
+            rel_path = rel_path[len(self.base) + 1:]
+        if self.anchored:
+            return bool(self.regex.match(rel_path))
+        return bool(self.regex.match(rel_path.rsplit('/', 1)[-1]))
+
+
+def parse_ignore_file(file_path: str, base: str = '') -> List[IgnoreRule]:
+    """Read ignore rules from a .gitignore-style file"""
+    rules = []
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.rstrip('\n').rstrip()
+                if not line or line.startswith('#'):
+                    continue
+                if line.startswith('\\'):
+                    line = line[1:]
+                rules.append(IgnoreRule(line, base))
+    except (OSError, UnicodeDecodeError) as e:
+        print(f"   ⚠️  Warning: Could not read ignore file {file_path}: {e}")
+    return rules
+
+
+class _NestedRule:
+    """An ignore rule from an enclosing directory, applied below a nested discovery root"""
+
+    __slots__ = ('rule', 'prefix', 'negate')
+
+    def __init__(self, rule: IgnoreRule, prefix: str):
+        self.rule = rule
+        self.prefix = prefix
+        self.negate = rule.negate
+
+    def matches(self, rel_path: str, is_dir: bool) -> bool:
+        return self.rule.matches(f"{self.prefix}/{rel_path}", is_dir)
+
+
+def inherited_ignore_rules(root: str, directory: str, names: Tuple[str, ...] = IGNORE_FILES) -> List[Any]:
+    """
+    Rules from the ignore files of root and the directories between it and
+    directory, for a discovery rooted at directory (a local module inside
+    the workspace), so that it ignores what a discovery of root would
+    """
+    rel_path = os.path.relpath(directory, root)
+    if rel_path == '.' or rel_path == os.pardir or rel_path.startswith(os.pardir + os.sep):
+        return []
+    parts = rel_path.split(os.sep)
+    rules = []
+    for depth in range(len(parts)):
+        for name in names:
+            ignore_path = os.path.join(root, *parts[:depth], name)
+            if os.path.isfile(ignore_path):
+                rules.extend(parse_ignore_file(ignore_path, '/'.join(parts[:depth])))
+    prefix = '/'.join(parts)
+    return [_NestedRule(rule, prefix) for rule in rules]
+
+
+def is_ignored(rules: List[IgnoreRule], rel_path: str, is_dir: bool) -> bool:
+    """Apply ignore rules in order; the last matching rule wins"""
+    ignored = False
+    for rule in rules:
+        if rule.matches(rel_path, is_dir):
+            ignored = not rule.negate
+    return ignored
+
+
+class WorkspaceDiscovery:
+    """
+    Finds Terraform files in a workspace using concurrent os.scandir or git
+    ls-files. With ignore_root (the workspace a local module belongs to),
+    the ignore files of ignore_root and the directories down to working_dir
+    apply as well.
+    """
+
+    def __init__(self, working_dir: str, include: Optional[List[str]] = None,
+                 exclude: Optional[List[str]] = None, use_git: bool = False,
+                 max_workers: Optional[int] = None, ignore_root: Optional[str] = None):
+        self.working_dir = working_dir
+        self.ignore_root = ignore_root
+        self.include = [IgnoreRule(p) for p in (include or DEFAULT_INCLUDE)]
+        self.exclude = [IgnoreRule(p) for p in (exclude or [])]
+        self.use_git = use_git
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) * 4)
+        self.stats = {
+            'files_count': 0,
+            'directories_scanned': 0,
+            'discovery_time': 0.0,
+            'method': 'scandir'
+        }
+        self.directories: List[str] = []
+
+    def discover(self) -> List[str]:
+        """Return the sorted list of Terraform files under the working directory"""
+        start = time.perf_counter()
+        files = None
+        if self.use_git:
+            files = self._discover_with_git()
+        if files is None:
+            files = self._discover_with_scandir()
+
+        files.sort()
+        self.stats['files_count'] = len(files)
+        self.stats['discovery_time'] = time.perf_counter() - start
+        return files
+
+    def list_directories(self) -> List[str]:
+        """Return every directory a scan descends into (all but pruned and ignored ones)"""
+        self._discover_with_scandir()
+        return sorted(self.directories)
+
+    def _is_included(self, rel_path: str) -> bool:
+        """Check a file against the include globs"""
+        return any(rule.matches(rel_path, False) for rule in self.include)
+
+    def is_candidate(self, path: str) -> bool:
+        """Check whether a path could change the discovery result (an included file or an ignore file)"""
+        rel_path = os.path.relpath(path, self.working_dir).replace(os.sep, '/')
+        if rel_path.startswith('../'):
+            return False
+        return os.path.basename(path) in IGNORE_FILES or self._is_included(rel_path)
+
+    def _is_ignored(self, rules: List[IgnoreRule], rel_path: str, is_dir: bool) -> bool:
+        """Check a path against ignore-file rules, then the --exclude globs"""
+        return is_ignored(rules, rel_path, is_dir) or is_ignored(self.exclude, rel_path, is_dir)
+
+    def _discover_with_scandir(self) -> List[str]:
+        """Enumerate directories concurrently, pruning ignored subtrees as we go"""
+        self.stats['method'] = 'scandir'
+        self.directories = [self.working_dir]
+        files = []
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            rules = inherited_ignore_rules(self.ignore_root, self.working_dir) if self.ignore_root else []
+            pending = {executor.submit(self._scan_directory, self.working_dir, '', rules)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    dir_files, subdirs = future.result()
+                    self.stats['directories_scanned'] += 1
+                    files.extend(dir_files)
+                    for sub_path, sub_rel, sub_rules in subdirs:
+                        self.directories.append(sub_path)
+                        pending.add(executor.submit(self._scan_directory, sub_path, sub_rel, sub_rules))
+
+        return files
+
+    def _scan_directory(self, directory: str, rel_dir: str,
+                        rules: List[IgnoreRule]) -> Tuple[List[str], List[Tuple[str, str, List[IgnoreRule]]]]:
+        """Scan a single directory, returning matching files and subdirectories to descend into"""
+        files = []
+        subdirs = []
+
+        try:
+            with os.scandir(directory) as it:
+                entries = list(it)
+        except OSError as e:
+            print(f"   ⚠️  Warning: Could not scan {directory}: {e}")
+            return files, subdirs
+
+        # Ignore files in this directory apply to everything below it
+        local_rules = None
+        for entry in entries:
+            if entry.name in IGNORE_FILES and entry.is_file():
+                if local_rules is None:
+                    local_rules = list(rules)
+                local_rules.extend(parse_ignore_file(entry.path, rel_dir))
+        if local_rules is not None:
+            rules = local_rules
+
+        for entry in entries:
+            rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name in DEFAULT_PRUNED_DIRS or self._is_ignored(rules, rel_path, True):
+                        continue
+                    subdirs.append((entry.path, rel_path, rules))
+                elif entry.is_file():
+                    if self._is_included(rel_path) and not self._is_ignored(rules, rel_path, False):
+                        files.append(entry.path)
+            except OSError:
+                continue
+
+        return files, subdirs
+
+    def _discover_with_git(self) -> Optional[List[str]]:
+        """Read the file list from git ls-files; returns None when git is unavailable"""
+        try:
+            result = subprocess.run(
+                ['git', 'ls-files', '-z', '--cached', '--others', '--exclude-standard'],
+                cwd=self.working_dir, capture_output=True, timeout=60
+            )
+        except (OSError, subprocess.SubprocessError) as e:
+            print(f"   ⚠️  Warning: git ls-files failed ({e}), falling back to directory scan")
+            return None
+
+        if result.returncode != 0:
+            print("   ⚠️  Warning: Not a git repository, falling back to directory scan")
+            return None
+
+        self.stats['method'] = 'git'
+        # git already applies .gitignore; .terracostignore and --exclude still need applying
+        terracost_rules = {}
+        files = []
+        for rel_path in result.stdout.decode('utf-8', errors='replace').split('\0'):
+            if not rel_path or not self._is_included(rel_path):
+                continue
+            parts = rel_path.split('/')
+            if any(part in DEFAULT_PRUNED_DIRS for part in parts[:-1]):
+                continue
+            rules = self._git_path_rules(parts[:-1], terracost_rules)
+            if any(self._is_ignored(rules, '/'.join(parts[:i + 1]), True) for i in range(len(parts) - 1)):
+                continue
+            if self._is_ignored(rules, rel_path, False):
+                continue
+            full_path = os.path.join(self.working_dir, *parts)
+            if os.path.isfile(full_path):
+                files.append(full_path)
+        return files
+
+    def _git_path_rules(self, dir_parts: List[str], cache: Dict[str, List[IgnoreRule]]) -> List[IgnoreRule]:
+        """Collect .terracostignore rules that apply to a directory (cached per directory)"""
+        rel_dir = '/'.join(dir_parts)
+        if rel_dir in cache:
+            return cache[rel_dir]
+
+        if dir_parts:
+            rules = list(self._git_path_rules(dir_parts[:-1], cache))
+        elif self.ignore_root:
+            rules = inherited_ignore_rules(self.ignore_root, self.working_dir, ('.terracostignore',))
+        else:
+            rules = []
+        ignore_path = os.path.join(self.working_dir, *dir_parts, '.terracostignore')
+        if os.path.isfile(ignore_path):
+            rules.extend(parse_ignore_file(ignore_path, rel_dir))
+        cache[rel_dir] = rules
+        return rules
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return statistics for the last discovery run"""
+        return dict(self.stats)
@@ -1,14 +1,38 @@
 import * as vscode from 'vscode';
+import * as fs from 'fs';
 import { TerraCostViewProvider } from './webview/viewProvider';
+import { TerraCostClientPool } from './terracostClient';
 
 export function activate(context: vscode.ExtensionContext) {
-    const provider = new TerraCostViewProvider(context.extensionUri);
+    const output = vscode.window.createOutputChannel('TerraCost');
+    const executable = getTerracostExecutable(context.extensionUri);
+    const clients = new TerraCostClientPool(executable, output);
+    const provider = new TerraCostViewProvider(context.extensionUri, clients);
     
     context.subscriptions.push(
-        vscode.window.registerWebviewViewProvider(TerraCostViewProvider.viewType, provider)
+        output,
+        clients,
+        vscode.window.registerWebviewViewProvider(TerraCostViewProvider.viewType, provider),
+        vscode.workspace.onDidSaveTextDocument(document => {
+            if (/\.(tf|tfvars)(\.json)?$/.test(document.uri.fsPath)) {
+                clients.invalidate(document.uri);
+            }
+        }),
+        vscode.workspace.onDidChangeWorkspaceFolders(event => {
+            event.removed.forEach(folder => clients.remove(folder));
+        })
     );
 }
 
 
 
-export function deactivate() {}
\ No newline at end of file
+export function deactivate() {}
+
+function getTerracostExecutable(extensionUri: vscode.Uri): string {
+    // The fast-start onedir build starts without unpacking itself; fall back to the single-file build
+    const onedir = vscode.Uri.joinPath(extensionUri, 'python', 'windows', 'onedir', 'terracost', 'terracost.exe').fsPath;
+    if (fs.existsSync(onedir)) {
+        return onedir;
+    }
+    return vscode.Uri.joinPath(extensionUri, 'python', 'windows', 'terracost.exe').fsPath;
+}
@@ -0,0 +1,150 @@
+import * as vscode from 'vscode';
+import { ChildProcessWithoutNullStreams, spawn } from 'child_process';
+import * as readline from 'readline';
+
+interface PendingRequest {
+    resolve: (result: any) => void;
+    reject: (error: Error) => void;
+}
+
+/**
+ * One long-lived `terracost rpc --stdio` process. Requests are line-delimited
+ * JSON-RPC 2.0; the process keeps the workspace parsed and priced between
+ * calls, so repeated estimates come back in milliseconds.
+ */
+export class TerraCostClient implements vscode.Disposable {
+    private _process?: ChildProcessWithoutNullStreams;
+    private _nextId = 1;
+    private readonly _pending = new Map<number, PendingRequest>();
+
+    constructor(
+        private readonly _executable: string,
+        private readonly _cwd: string,
+        private readonly _output: vscode.OutputChannel
+    ) {
+    }
+
+    public request<T = any>(method: string, params: object = {}): Promise<T> {
+        const child = this._ensureProcess();
+        const id = this._nextId++;
+        return new Promise<T>((resolve, reject) => {
+            this._pending.set(id, { resolve, reject });
+            child.stdin.write(JSON.stringify({ jsonrpc: '2.0', id, method, params }) + '\n');
+        });
+    }
+
+    public notify(method: string, params: object = {}) {
+        if (this._process) {
+            this._process.stdin.write(JSON.stringify({ jsonrpc: '2.0', method, params }) + '\n');
+        }
+    }
+
+    public dispose() {
+        if (this._process) {
+            this.notify('shutdown');
+            this._process.stdin.end();
+            this._process = undefined;
+        }
+        this._rejectPending(new Error('TerraCost process stopped'));
+    }
+
+    private _ensureProcess(): ChildProcessWithoutNullStreams {
+        if (this._process) {
+            return this._process;
+        }
+        const child = spawn(this._executable, ['rpc', '--stdio'], {
+            cwd: this._cwd,
+            env: { ...process.env, PYTHONIOENCODING: 'utf-8' }
+        });
+        this._process = child;
+
+        readline.createInterface({ input: child.stdout }).on('line', line => this._onLine(line));
+        // Progress output and warnings are written to stderr
+        child.stderr.on('data', data => this._output.append(data.toString()));
+        child.on('error', error => {
+            this._output.appendLine(`TerraCost process error: ${error.message}`);
+            this._onExit(child, error);
+        });
+        child.on('exit', code => this._onExit(child, new Error(`TerraCost process exited with code ${code}`)));
+        return child;
+    }
+
+    private _onLine(line: string) {
+        let message: any;
+        try {
+            message = JSON.parse(line);
+        } catch {
+            this._output.appendLine(line);
+            return;
+        }
+        const pending = this._pending.get(message.id);
+        if (!pending) {
+            return;
+        }
+        this._pending.delete(message.id);
+        if (message.error) {
+            pending.reject(new Error(message.error.message));
+        } else {
+            pending.resolve(message.result);
+        }
+    }
+
+    private _onExit(child: ChildProcessWithoutNullStreams, error: Error) {
+        if (this._process !== child) {
+            return;
+        }
+        // The next request starts a fresh process
+        this._process = undefined;
+        this._rejectPending(error);
+    }
+
+    private _rejectPending(error: Error) {
+        for (const pending of this._pending.values()) {
+            pending.reject(error);
+        }
+        this._pending.clear();
+    }
+}
+
+/**
+ * Keeps one TerraCost process per workspace folder.
+ */
+export class TerraCostClientPool implements vscode.Disposable {
+    private readonly _clients = new Map<string, TerraCostClient>();
+
+    constructor(
+        private readonly _executable: string,
+        private readonly _output: vscode.OutputChannel
+    ) {
+    }
+
+    public get(workspaceFolder: vscode.WorkspaceFolder): TerraCostClient {
+        const key = workspaceFolder.uri.toString();
+        let client = this._clients.get(key);
+        if (!client) {
+            client = new TerraCostClient(this._executable, workspaceFolder.uri.fsPath, this._output);
+            this._clients.set(key, client);
+        }
+        return client;
+    }
+
+    public remove(workspaceFolder: vscode.WorkspaceFolder) {
+        const key = workspaceFolder.uri.toString();
+        this._clients.get(key)?.dispose();
+        this._clients.delete(key);
+    }
+
+    public invalidate(uri: vscode.Uri) {
+        const workspaceFolder = vscode.workspace.getWorkspaceFolder(uri);
+        if (workspaceFolder) {
+            this._clients.get(workspaceFolder.uri.toString())?.notify('invalidate', { file: uri.fsPath });
+        }
+    }
+
+    public dispose() {
+        for (const client of this._clients.values()) {
+            client.dispose();
+        }
+        this._clients.clear();
+    }
+}
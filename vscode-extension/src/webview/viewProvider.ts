@@ -1,10 +1,14 @@
 import * as vscode from 'vscode';
+import { TerraCostClientPool } from '../terracostClient';
+
+// Months per timeframe option
+const TIMEFRAME_MONTHS: { [timeframe: string]: number } = { '1m': 1, '3m': 3, '6m': 6, '1y': 12, '2y': 24 };
 
 export class TerraCostViewProvider implements vscode.WebviewViewProvider {
     public static readonly viewType = 'terracostPanel';
     private _webviewView?: vscode.WebviewView;
 
-    constructor(private readonly _extensionUri: vscode.Uri) {
+    constructor(private readonly _extensionUri: vscode.Uri, private readonly _clients: TerraCostClientPool) {
     }
 
     public resolveWebviewView(
@@ -28,7 +32,7 @@ export class TerraCostViewProvider implements vscode.WebviewViewProvider {
                             this._handleCalculateCosts(message.timeframe);
                             return;
                         case 'getSuggestions':
-                            this._handleGetSuggestions(message.suggestionType, message.apiKey);
+                            this._handleGetSuggestions(message.suggestionType, message.budget, message.apiKey);
                             return;
                     }
                 } catch (error) {
@@ -60,6 +64,12 @@ export class TerraCostViewProvider implements vscode.WebviewViewProvider {
         .btn { padding: 8px 16px; margin: 3px; border: none; border-radius: 4px; cursor: pointer; font-size: 12px; }
         .btn-primary { background: var(--vscode-button-background); color: var(--vscode-button-foreground); }
         .content-area { min-height: 100px; border: 1px solid var(--vscode-panel-border); padding: 10px; background: var(--vscode-editor-background); }
+        .cost-row { display: flex; justify-content: space-between; gap: 8px; font-size: 12px; padding: 2px 0; }
+        .cost-row span:first-child { overflow: hidden; text-overflow: ellipsis; white-space: nowrap; }
+        .cost-total { font-weight: bold; border-top: 1px solid var(--vscode-panel-border); margin-top: 6px; padding-top: 6px; }
+        .muted { color: var(--vscode-descriptionForeground); font-size: 11px; }
+        .error { color: var(--vscode-errorForeground); }
+        pre { white-space: pre-wrap; font-size: 11px; }
     </style>
 </head>
 <body>
@@ -89,6 +99,11 @@ export class TerraCostViewProvider implements vscode.WebviewViewProvider {
                 <div class="actions">
                     <button id="calculate-btn" class="btn btn-primary" style="width: 100%;">Calculate</button>
                 </div>
+                <div id="costs-content" class="content-area">
+                    <div style="text-align: center; color: #666;">
+                        <p>Select a timeframe and click Calculate.</p>
+                    </div>
+                </div>
 
             </div>
 
@@ -104,9 +119,9 @@ export class TerraCostViewProvider implements vscode.WebviewViewProvider {
                         <label for="suggestion-type" style="white-space: nowrap;">Suggestion Type:</label>
                     </div>
                     <select id="suggestion-type" style="flex: 1; padding: 6px; background: var(--vscode-input-background); color: var(--vscode-input-foreground); border: 1px solid var(--vscode-input-border);">
-                        <option value="--savings">💰 Cost Savings Opportunities</option>
-                        <option value="--bestvalue">🎯 Best Value Configuration</option>
-                        <option value="--budget">💵 Budget Optimization</option>
+                        <option value="savings">💰 Cost Savings Opportunities</option>
+                        <option value="bestvalue">🎯 Best Value Configuration</option>
+                        <option value="budget">💵 Budget Optimization</option>
                     </select>
                 </div>
                 <div class="budget-input" id="budget-input" style="display: none; margin-bottom: 15px;">
@@ -167,14 +182,85 @@ export class TerraCostViewProvider implements vscode.WebviewViewProvider {
 
         document.getElementById('calculate-btn').addEventListener('click', () => {
             const timeframe = document.getElementById('timeframe').value;
+            setMessage('costs-content', 'Calculating...');
             vscode.postMessage({ command: 'calculateCosts', timeframe: timeframe });
         });
 
+        function setMessage(targetId, text, className) {
+            const target = document.getElementById(targetId);
+            target.replaceChildren();
+            const p = document.createElement('p');
+            p.textContent = text;
+            if (className) {
+                p.className = className;
+            }
+            target.appendChild(p);
+        }
+
+        function addRow(target, label, value, className) {
+            const row = document.createElement('div');
+            row.className = 'cost-row' + (className ? ' ' + className : '');
+            const name = document.createElement('span');
+            name.textContent = label;
+            name.title = label;
+            const amount = document.createElement('span');
+            amount.textContent = value;
+            row.append(name, amount);
+            target.appendChild(row);
+        }
+
+        function renderCosts(result) {
+            const target = document.getElementById('costs-content');
+            target.replaceChildren();
+            const months = result.timeframe_months;
+            Object.entries(result.breakdown)
+                .sort((a, b) => b[1] - a[1])
+                .forEach(([name, cost]) => addRow(target, name, '$' + (cost * months).toFixed(2)));
+            addRow(target, 'Total (' + months + ' month' + (months === 1 ? '' : 's') + ')',
+                   '$' + result.total_cost.toFixed(2), 'cost-total');
+            const range = result.uncertainty_analysis;
+            if (range && range.confidence_95_lower !== undefined) {
+                addRow(target, '95% range', '$' + range.confidence_95_lower.toFixed(2) + ' - $' +
+                       range.confidence_95_upper.toFixed(2), 'muted');
+            }
+            const info = document.createElement('p');
+            info.className = 'muted';
+            info.textContent = result.resources + ' resources in ' + result.files + ' files (' +
+                               Math.round(result.elapsed_ms) + ' ms)';
+            target.appendChild(info);
+        }
+
+        function renderSuggestions(result) {
+            const target = document.getElementById('suggestions-content');
+            target.replaceChildren();
+            const current = document.createElement('p');
+            current.textContent = 'Current monthly cost: $' + result.current_monthly_cost.toFixed(2);
+            target.appendChild(current);
+            const body = document.createElement('pre');
+            body.textContent = result.suggestions ? JSON.stringify(result.suggestions, null, 2) : result.response;
+            target.appendChild(body);
+        }
+
+        window.addEventListener('message', event => {
+            const message = event.data;
+            switch (message.command) {
+                case 'costResults':
+                    renderCosts(message.result);
+                    break;
+                case 'suggestionResults':
+                    renderSuggestions(message.result);
+                    break;
+                case 'error':
+                    setMessage(message.target, message.message, 'error');
+                    break;
+            }
+        });
+
         // Handle suggestion type change to show/hide budget input
         document.getElementById('suggestion-type').addEventListener('change', () => {
             const suggestionType = document.getElementById('suggestion-type').value;
             const budgetInput = document.getElementById('budget-input');
-            if (suggestionType === '--budget') {
+            if (suggestionType === 'budget') {
                 budgetInput.style.display = 'block';
             } else {
                 budgetInput.style.display = 'none';
@@ -189,18 +275,17 @@ export class TerraCostViewProvider implements vscode.WebviewViewProvider {
             }
             
             const suggestionType = document.getElementById('suggestion-type').value;
-            let args = suggestionType;
-            
-            if (suggestionType === '--budget') {
-                const budgetAmount = document.getElementById('budget-amount').value;
-                if (budgetAmount) {
-                    args = suggestionType + ' ' + budgetAmount;
-                }
+            const budgetAmount = document.getElementById('budget-amount').value;
+            if (suggestionType === 'budget' && !budgetAmount) {
+                alert('Please enter a monthly budget');
+                return;
             }
             
+            setMessage('suggestions-content', 'Generating suggestions...');
             vscode.postMessage({ 
                 command: 'getSuggestions', 
-                suggestionType: args,
+                suggestionType: suggestionType,
+                budget: budgetAmount ? parseFloat(budgetAmount) : undefined,
                 apiKey: apiKey
             });
         });
@@ -216,38 +301,43 @@ export class TerraCostViewProvider implements vscode.WebviewViewProvider {
             const workspaceFolder = this.getWorkspaceFolder();
             const sanitizedTimeframe = this.sanitizeTimeframe(timeframe);
             const terraformDir = this.getTerraformDir(workspaceFolder);
-            const terracostPath = this.getTerracostExecutable();
 
-            const terminal = vscode.window.createTerminal('TerraCost Terminal');
-            terminal.show();
-            terminal.sendText(`chcp 65001; & "${terracostPath}" plan -t ${sanitizedTimeframe} -f .`);
+            const result = await this._clients.get(workspaceFolder).request('estimate', {
+                path: terraformDir,
+                months: TIMEFRAME_MONTHS[sanitizedTimeframe]
+            });
+            this._postMessage({ command: 'costResults', result });
         } catch (error) {
             const errorMsg = `Failed to calculate costs: ${error instanceof Error ? error.message : 'Unknown error'}`;
+            this._postMessage({ command: 'error', target: 'costs-content', message: errorMsg });
             vscode.window.showErrorMessage(errorMsg);
         }
     }
 
-    private async _handleGetSuggestions(suggestionType: string = '--savings', apiKey?: string) {
+    private async _handleGetSuggestions(suggestionType: string = 'savings', budget?: number, apiKey?: string) {
         try {
             const workspaceFolder = this.getWorkspaceFolder();
             const terraformDir = this.getTerraformDir(workspaceFolder);
-            const terracostPath = this.getTerracostExecutable();
 
-            const terminal = vscode.window.createTerminal('TerraCost Terminal');
-            terminal.show();
-            
-            // Set the API key and run the command in a single session
-            if (apiKey) {
-                terminal.sendText(`chcp 65001; $env:OPENAI_API_KEY = "${apiKey}"; echo "API key set successfully"; & "${terracostPath}" suggest ${suggestionType}`);
-            } else {
-                terminal.sendText(`chcp 65001; echo "No API key provided"; & "${terracostPath}" suggest ${suggestionType}`);
-            }
+            // The API key is passed with the request only and never stored
+            const result = await this._clients.get(workspaceFolder).request('suggest', {
+                path: terraformDir,
+                type: suggestionType,
+                budget,
+                api_key: apiKey
+            });
+            this._postMessage({ command: 'suggestionResults', result });
         } catch (error) {
             const errorMsg = `Failed to get suggestions: ${error instanceof Error ? error.message : 'Unknown error'}`;
+            this._postMessage({ command: 'error', target: 'suggestions-content', message: errorMsg });
             vscode.window.showErrorMessage(errorMsg);
         }
     }
 
+    private _postMessage(message: object) {
+        this._webviewView?.webview.postMessage(message);
+    }
+
     private getWorkspaceFolder(): vscode.WorkspaceFolder {
         const workspaceFolder = vscode.workspace.workspaceFolders?.[0];
         if (!workspaceFolder) {
@@ -268,9 +358,5 @@ export class TerraCostViewProvider implements vscode.WebviewViewProvider {
         return workspaceFolder.uri.fsPath;
     }
 
-    private getTerracostExecutable(): string {
-        return vscode.Uri.joinPath(this._extensionUri, 'python', 'windows', 'terracost.exe').fsPath;
-    }
-
 
 }
\ No newline at end of file